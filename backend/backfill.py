@@ -0,0 +1,304 @@
+"""
+Historical backfill
+===================
+Loads archived ARSO XML snapshots (plain, .gz, .bz2 or .xz) from a directory
+into the database.
+
+Files are parsed in a process pool with the regular single-pass parser,
+parsed batches are combined, overlapping hours are deduplicated and every
+batch of about batch_size rows is stored with one bulk insert while the
+workers keep parsing. Files are recorded in a checkpoint file only after
+their rows were stored, so an interrupted run resumes where it stopped.
+
+Run with:
+    python -m backend.backfill /path/to/archive --workers 8
+"""
+import argparse
+import bz2
+import gzip
+import json
+import logging
+import lzma
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.feed_router import combine_feeds
+from backend.parsers.models.feed_model import ParsedFeedModel
+from backend.parsers.models.measurement_batch import MeasurementBatch
+from backend.parsers.models.station_models import ParsedStationModel
+
+
+BACKFILL_BATCH_SIZE = 50_000        # measurement rows per bulk insert
+BACKFILL_CHECKPOINT_NAME = ".backfill_checkpoint.json"
+
+OPENERS: Dict[str, Callable[[str], IO[bytes]]] = {
+    ".xml": lambda path: open(path, "rb"),
+    ".gz": lambda path: gzip.open(path, "rb"),
+    ".bz2": lambda path: bz2.open(path, "rb"),
+    ".xz": lambda path: lzma.open(path, "rb"),
+}
+
+# stores stations and a batch, returns True when committed
+BatchLoader = Callable[[List[ParsedStationModel], MeasurementBatch], bool]
+
+
+#=================================================================================
+# ARCHIVE FILES
+# ================================================================================
+
+def is_archive_file(path: Path) -> bool:
+    """snapshot.xml, snapshot.xml.gz, ..."""
+    suffixes = path.suffixes
+    if not suffixes or suffixes[-1] not in OPENERS:
+        return False
+    return suffixes[-1] == ".xml" or (len(suffixes) > 1 and suffixes[-2] == ".xml")
+
+
+def scan_archive(directory: Path) -> List[Path]:
+    """All archive files below directory, sorted so the oldest snapshot names come first"""
+    return sorted(path for path in directory.rglob("*") if path.is_file() and is_archive_file(path))
+
+
+def read_archive_file(path: Path) -> str:
+    with OPENERS[path.suffix](str(path)) as archive_file:
+        return archive_file.read().decode("utf-8")
+
+
+def parse_archive_file(path: Path) -> Tuple[Path, Optional[ParsedFeedModel], Optional[str]]:
+    """
+    Runs in a worker process
+
+    Returns:
+        Tuple[path, parsed feed with a MeasurementBatch or None, error message]
+    """
+    try:
+        logging.disable(logging.WARNING)  # skipped elements of old snapshots would flood the log
+        result = parse_arso_xml(read_archive_file(path), columnar=True)
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+    if not result.success:
+        return path, None, result.error_message
+    return path, result.data, None
+
+
+#=================================================================================
+# CHECKPOINT
+# ================================================================================
+
+@dataclass
+class BackfillCheckpoint:
+    """Files whose rows are stored, keyed by path with size and mtime to notice replaced files"""
+    path: Path
+    done: Dict[str, Tuple[int, float]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "BackfillCheckpoint":
+        if not path.exists():
+            return cls(path=path)
+        with open(path, encoding="utf-8") as checkpoint_file:
+            done = json.load(checkpoint_file).get("done", {})
+        return cls(path=path, done={name: (int(size), float(mtime)) for name, (size, mtime) in done.items()})
+
+    @staticmethod
+    def _signature(archive_path: Path) -> Tuple[int, float]:
+        stat = archive_path.stat()
+        return stat.st_size, stat.st_mtime
+
+    def is_done(self, archive_path: Path) -> bool:
+        return self.done.get(str(archive_path)) == self._signature(archive_path)
+
+    def mark_done(self, archive_paths: List[Path]) -> None:
+        for archive_path in archive_paths:
+            self.done[str(archive_path)] = self._signature(archive_path)
+
+    def save(self) -> None:
+        """Write to a temporary file and rename, a crash never leaves a half written checkpoint"""
+        temporary_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temporary_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"done": self.done}, checkpoint_file)
+        os.replace(temporary_path, self.path)
+
+
+#=================================================================================
+# BACKFILL
+# ================================================================================
+
+@dataclass
+class BackfillStats:
+    files_total: int = 0
+    files_skipped: int = 0      # already in the checkpoint
+    files_loaded: int = 0
+    files_failed: int = 0
+    rows_parsed: int = 0
+    rows_loaded: int = 0        # after deduplication
+    batches: int = 0
+
+
+def store_batch(stations: List[ParsedStationModel], batch: MeasurementBatch) -> bool:
+    # imported here, worker processes never open a database connection
+    from backend.parsers.insert_data import insert_measurement_batch
+    return insert_measurement_batch(stations, batch) is not None
+
+
+def publish_stored_rows() -> None:
+    """
+    Publish a new generation from a CLI run, so cached statistics are revalidated.
+    Reaches the web processes only through Redis, each process has its own SimpleCache
+    """
+    # imported here, parser processes never touch the cache
+    from flask import Flask
+    from backend.cache import cache, configure_cache, get_redis_client
+    from backend.utils.latest_readings import publish_stored_data_change
+
+    app = Flask(__name__)
+    configure_cache(app)
+    with app.app_context():
+        generation = publish_stored_data_change(cache, get_redis_client())
+    if generation is not None:
+        logging.info(f"Published generation {generation.number} for the stored rows")
+
+
+def run_backfill(
+        directory: Path,
+        workers: Optional[int] = None,
+        batch_size: int = BACKFILL_BATCH_SIZE,
+        checkpoint_path: Optional[Path] = None,
+        loader: Optional[BatchLoader] = None
+) -> BackfillStats:
+    """
+    Parse and store all archive files below directory
+
+    Args:
+        workers: parser processes, defaults to the number of CPUs
+        batch_size: measurement rows collected before one bulk insert
+        checkpoint_path: defaults to BACKFILL_CHECKPOINT_NAME inside directory
+        loader: stores one batch, defaults to insert_measurement_batch()
+    """
+    checkpoint = BackfillCheckpoint.load(checkpoint_path or directory / BACKFILL_CHECKPOINT_NAME)
+    stats = BackfillStats()
+
+    files = scan_archive(directory)
+    stats.files_total = len(files)
+    pending_files = [path for path in files if not checkpoint.is_done(path)]
+    stats.files_skipped = stats.files_total - len(pending_files)
+    logging.info(f"Backfill of {stats.files_total} files, {stats.files_skipped} already done")
+
+    return load_archive_files(pending_files, workers, batch_size, checkpoint, loader, stats)
+
+
+def _parse_in_order(files: List[Path], workers: Optional[int]
+                    ) -> Iterator[Tuple[Path, Optional[ParsedFeedModel], Optional[str]]]:
+    """parse_archive_file() results in file order"""
+    if workers == 0:
+        yield from map(parse_archive_file, files)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    # keep a bounded number of parsed files in flight, results are consumed in file order
+    window = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        queue = iter(files)
+        in_flight: List["Future[Tuple[Path, Optional[ParsedFeedModel], Optional[str]]]"] = []
+
+        def submit_next() -> None:
+            archive_path = next(queue, None)
+            if archive_path is not None:
+                in_flight.append(executor.submit(parse_archive_file, archive_path))
+
+        for _ in range(window):
+            submit_next()
+
+        while in_flight:
+            # the oldest file first, later files keep parsing meanwhile
+            result = in_flight.pop(0).result()
+            submit_next()
+            yield result
+
+
+def load_archive_files(
+        files: List[Path],
+        workers: Optional[int] = None,
+        batch_size: int = BACKFILL_BATCH_SIZE,
+        checkpoint: Optional[BackfillCheckpoint] = None,
+        loader: Optional[BatchLoader] = None,
+        stats: Optional[BackfillStats] = None
+) -> BackfillStats:
+    """
+    Parse and store the given archive files in order,
+    stored files are recorded in checkpoint when one is given
+
+    Args:
+        workers: parser processes, defaults to the number of CPUs,
+                 0 parses in the calling process
+    """
+    loader = loader or store_batch
+    stats = stats or BackfillStats(files_total=len(files))
+
+    start_time = time.perf_counter()
+    feeds: List[ParsedFeedModel] = []
+    feed_files: List[Path] = []
+    feed_rows = 0
+
+    def flush() -> None:
+        nonlocal feeds, feed_files, feed_rows
+        if not feed_files:
+            return
+        stations, batch = combine_feeds(feeds)
+        batch = batch.deduplicate()
+        if len(batch) and not loader(stations, batch):
+            raise RuntimeError(f"Storing batch of {len(batch)} rows failed, rerun to resume")
+
+        if checkpoint is not None:
+            checkpoint.mark_done(feed_files)
+            checkpoint.save()
+        stats.rows_loaded += len(batch)
+        stats.files_loaded += len(feed_files)
+        stats.batches += 1
+        elapsed = time.perf_counter() - start_time
+        logging.info(
+            f"Backfill {stats.files_skipped + stats.files_loaded + stats.files_failed}/{stats.files_total} files, "
+            f"{stats.rows_loaded} rows stored, {stats.rows_loaded / elapsed:.0f} rows/s"
+        )
+        feeds, feed_files, feed_rows = [], [], 0
+
+    for archive_path, feed, error in _parse_in_order(files, workers):
+        if feed is None:
+            stats.files_failed += 1
+            logging.error(f"Skipping {archive_path}: {error}")
+            continue
+
+        feeds.append(feed)
+        feed_files.append(archive_path)
+        feed_rows += len(feed.measurements)
+        stats.rows_parsed += len(feed.measurements)
+        if feed_rows >= batch_size:
+            flush()
+
+    flush()
+    return stats
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Load archived ARSO XML snapshots into the database")
+    parser.add_argument("directory", type=Path, help="directory with .xml, .xml.gz, .xml.bz2 or .xml.xz files")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes, default: number of CPUs")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="measurement rows per bulk insert")
+    parser.add_argument("--checkpoint", type=Path, default=None, help=f"default: <directory>/{BACKFILL_CHECKPOINT_NAME}")
+    args = parser.parse_args()
+
+    stats = run_backfill(args.directory, workers=args.workers, batch_size=args.batch_size, checkpoint_path=args.checkpoint)
+    logging.info(f"Backfill finished: {stats}")
+    if stats.rows_loaded:
+        publish_stored_rows()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 """
-Measurements parser module
-==========================
+Measurements parser module (benchmark baseline)
+===============================================
 Parses measurements data from ARSO XML and converts
-them to Measurement dataclass instances 
+them to Measurement dataclass instances
+
+Frozen copy of the old two-pass path, ingest uses backend.parsers.arso_parser.
+Kept only as the baseline of bench_single_pass_parser.
 """
 from xml.etree import ElementTree as ET
 from typing import List, cast, Any
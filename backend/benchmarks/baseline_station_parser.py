@@ -1,8 +1,11 @@
 """
-Station Parser Module
-=====================
+Station Parser Module (benchmark baseline)
+==========================================
 Parses only station informations from ARSO XML
 and converts them into StationInfo dataclass instances
+
+Frozen copy of the old two-pass path, ingest uses backend.parsers.arso_parser.
+Kept only as the baseline of bench_single_pass_parser.
 """
 
 from xml.etree import ElementTree as ET
@@ -0,0 +1,55 @@
+"""
+Benchmark: cold start of the web app
+====================================
+Imports backend.app in a fresh interpreter several times and compares the
+median with COLD_START_BUDGET_SECONDS. The import creates the Flask app,
+it must not connect to the database or Redis, and the scheduler is
+disabled so only startup itself is measured.
+
+Run with:
+    python -m backend.benchmarks.bench_cold_start
+Exits with status 1 when the budget is exceeded.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+
+COLD_START_BUDGET_SECONDS = 1.5
+RUNS = 5
+
+IMPORT_SNIPPET = (
+    "import backend.app\n"
+    "from backend.database.session import engine_created\n"
+    "assert not engine_created(), 'database engine created during import'\n"
+)
+
+
+def cold_start_seconds() -> float:
+    # no database configured: any connection attempt during import fails the run
+    environment = {key: value for key, value in os.environ.items() if not key.startswith("DB_")}
+    environment.update({"RUN_SCHEDULER": "0", "PYTHONDONTWRITEBYTECODE": "1"})
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=environment, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    timings: List[float] = [cold_start_seconds() for _ in range(RUNS)]
+    median = statistics.median(timings)
+
+    print(f"import backend.app over {RUNS} runs:")
+    print(f"  median {median * 1000:8.1f} ms   best {min(timings) * 1000:8.1f} ms   budget {COLD_START_BUDGET_SECONDS * 1000:8.1f} ms")
+
+    if median > COLD_START_BUDGET_SECONDS:
+        print("  cold start budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: per-field value conversion vs cached/bulk conversion
+===============================================================
+legacy:    the previous from_xml_element body, strptime twice per element
+           and _to_int/_to_float closures for every pollutant
+models:    ParsedMeasurementModel.from_xml_element with memoized timestamps
+columnar:  MeasurementBatchBuilder, pollutant texts converted per column in build()
+
+The XML tree is built once outside of the timing, only conversion is measured.
+
+Run with:
+    python -m backend.benchmarks.bench_conversion
+"""
+import logging
+from datetime import datetime
+from typing import Optional
+from xml.etree import ElementTree as ET
+
+from backend.benchmarks.bench_utils import measure, print_row
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+from backend.parsers.models.measurement_batch import MeasurementBatchBuilder
+from backend.parsers.models.measurement_model import ParsedMeasurementModel
+
+
+def legacy_from_xml_element(element: ET.Element) -> ParsedMeasurementModel:
+    def _to_int(text: Optional[str]) -> Optional[int]:
+        if not text:
+            return None
+        try:
+            if text.strip().startswith("<"):
+                return int(float(text.strip()[1:]))
+            return int(text)
+        except ValueError:
+            return None
+
+    def _to_float(text: Optional[str]) -> Optional[float]:
+        if not text:
+            return None
+        try:
+            if text.strip().startswith("<"):
+                return float(text.strip()[:1])
+            return float(text)
+        except ValueError:
+            return None
+
+    time_from_text = element.findtext("datum_od")
+    time_to_text = element.findtext("datum_do")
+    return ParsedMeasurementModel(
+        station_id=element.get("sifra") or "",
+        station_name=element.findtext("merilno_mesto") or "",
+        time_from=datetime.strptime(time_from_text, "%Y-%m-%d %H:%M") if time_from_text else None,
+        time_to=datetime.strptime(time_to_text, "%Y-%m-%d %H:%M") if time_to_text else None,
+        co=_to_float(element.findtext("co")),
+        o3=_to_int(element.findtext("o3")),
+        no2=_to_int(element.findtext("no2")),
+        so2=_to_int(element.findtext("so2")),
+        pm25=_to_int(element.findtext("pm2.5")),
+        pm10=_to_int(element.findtext("pm10")),
+        benzen=_to_float(element.findtext("benzen")),
+        nox=_to_int(element.findtext("nox")),
+    )
+
+
+def _columnar(elements: list) -> None:
+    builder = MeasurementBatchBuilder()
+    for element in elements:
+        builder.append_element(element)
+    builder.build()
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+
+    for station_count, hours in [(50, 24), (50, 24 * 7), (50, 24 * 30)]:
+        elements = ET.fromstring(generate_arso_xml(station_count, hours=hours).encode("utf-8")).findall("postaja")
+        print(f"{len(elements)} <postaja> elements:")
+
+        for label, func in [
+            ("legacy per-field", lambda: [legacy_from_xml_element(element) for element in elements]),
+            ("models, cached timestamps", lambda: [ParsedMeasurementModel.from_xml_element(element) for element in elements]),
+            ("columnar bulk", lambda: _columnar(elements)),
+        ]:
+            seconds, peak = measure(func, repeat=3)
+            print_row(label, seconds, peak)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Microbenchmark: decode_unicode_escapes before and after memoization
+===================================================================
+The legacy function is copied here as it was: debug prints with repr()
+on every call and codecs.decode before the regex fallback.
+Input is the list of station names a backfill would decode,
+a few dozen distinct names repeated for every hour.
+
+Run with:
+    python -m backend.benchmarks.bench_decode_unicode
+"""
+import codecs
+import re
+
+from backend.benchmarks.bench_utils import measure
+from backend.benchmarks.synthetic_feed import STATION_NAMES
+from backend.parsers.xml_utils import decode_unicode_escapes
+
+
+def legacy_decode_unicode_escapes(text: str) -> str:
+    if not text:
+        return text
+    try:
+        print(f"DEBUG: Input: {repr(text)}")
+        if '\\u' in text:
+            try:
+                decoded = codecs.decode(text, 'unicode_escape')
+                print(f"DEBUG: Codecs decode result: {repr(decoded)}")
+                return decoded
+            except Exception as e:
+                print(f"DEBUG: Codecs decode failed: {e}")
+
+                def replace_unicode(match):
+                    return chr(int(match.group(1), 16))
+
+                decoded = re.sub(r'\\u([0-9a-fA-F]{4})', replace_unicode, text)
+                print(f"DEBUG: Regex decode result: {repr(decoded)}")
+                return decoded
+        print(f"DEBUG: No escapes found: {repr(text)}")
+        return text
+    except Exception:
+        return text
+
+
+def main() -> None:
+    # 50 stations for 30 days of hourly data, station and measurement model each decode the name
+    names = [f"{STATION_NAMES[index % len(STATION_NAMES)]} {index}" for index in range(50)] * 24 * 30 * 2
+    print(f"{len(names)} station names, {len(set(names))} distinct:")
+
+    for label, decode in [("legacy", legacy_decode_unicode_escapes), ("memoized", decode_unicode_escapes)]:
+        seconds, _peak = measure(lambda: [decode(name) for name in names], repeat=3)
+        print(f"  {label:<10} {seconds * 1000:8.1f} ms  {len(names) / seconds / 1e6:6.2f} M names/s")
+
+
+if __name__ == "__main__":
+    main()
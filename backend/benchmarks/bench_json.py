@@ -0,0 +1,73 @@
+"""
+Benchmark: JSON serialization of response payloads
+==================================================
+legacy:   stdlib encoder with indent=2, what every response used before
+stdlib:   stdlib encoder, compact (the fallback without orjson)
+orjson:   dumps_bytes() with orjson, compact (skipped when not installed)
+
+Payloads are realistic response documents:
+latest readings of 60 stations x 24 hours from the synthetic feed, and
+a year of daily statistics for 10 stations x 8 pollutants.
+
+Run with:
+    python -m backend.benchmarks.bench_json
+"""
+import json
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List
+
+from backend.benchmarks.bench_utils import measure, print_row
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.models.measurement_model import POLLUTANT_FIELDS
+from backend.parsers.stations_and_measurments_merger import merge_stations_and_measurements
+from backend.utils import json_provider
+from backend.utils.latest_readings import station_document
+
+
+def readings_payload(station_count: int = 60, hours: int = 24) -> Dict[str, Any]:
+    feed = parse_arso_xml(generate_arso_xml(station_count, hours), columnar=True).data
+    merged_data = merge_stations_and_measurements(feed.stations, feed.measurements)
+    return {
+        "generation": 1,
+        "stations": [station_document(entry["info"], entry["measurements_list"]) for entry in merged_data.values()],
+    }
+
+
+def stats_payload(station_count: int = 10, days: int = 365) -> List[Dict[str, Any]]:
+    first_day = date(2025, 1, 1)
+    return [
+        {
+            "station": f"E{station:04d}",
+            "pollutant": pollutant,
+            "stats": [
+                {"period": first_day + timedelta(days=day), "count": 24, "mean": 21.5 + day % 7,
+                 "min": 3.0, "max": 60.0, "stddev": 8.25}
+                for day in range(days)
+            ],
+        }
+        for station in range(station_count)
+        for pollutant in POLLUTANT_FIELDS
+    ]
+
+
+def main() -> None:
+    encoders: Dict[str, Callable[[Any], bytes]] = {
+        "legacy indent=2": lambda obj: json.dumps(obj, ensure_ascii=False, indent=2, default=json_provider._default).encode("utf-8"),
+        "stdlib compact": lambda obj: json_provider._dumps_stdlib(obj, pretty=False),
+    }
+    if json_provider.orjson is not None:
+        encoders["orjson compact"] = lambda obj: json_provider._dumps_orjson(obj, pretty=False)
+    else:
+        print("orjson is not installed, only the stdlib encoders are measured")
+
+    for name, payload in (("latest readings", readings_payload()), ("daily stats", stats_payload())):
+        print(f"{name}:")
+        for label, encode in encoders.items():
+            size = len(encode(payload))
+            seconds, peak = measure(lambda: encode(payload))
+            print_row(f"{label} ({size / 1024:.0f} KiB)", seconds, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark: two-pass vs single-pass ARSO XML parsing
+===================================================
+Compares the old path (parse_stations_from_xml + parse_measurements_from_xml,
+two trees and two walks, frozen in baseline_*_parser) with parse_arso_xml (one tree, one walk)
+on synthetic feeds of growing size.
+
+Run with:
+    python -m backend.benchmarks.bench_single_pass_parser
+"""
+import logging
+
+from backend.benchmarks.baseline_measurements_parser import parse_measurements_from_xml
+from backend.benchmarks.baseline_station_parser import parse_stations_from_xml
+from backend.benchmarks.bench_utils import measure, print_row
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+from backend.parsers.arso_parser import parse_arso_xml
+
+
+def _two_pass(xml_content: str) -> None:
+    parse_stations_from_xml(xml_content)
+    parse_measurements_from_xml(xml_content)
+
+
+def main() -> None:
+    logging.disable(logging.CRITICAL)
+
+    for station_count, hours in [(50, 1), (50, 24), (50, 24 * 7)]:
+        xml_content = generate_arso_xml(station_count, hours=hours)
+        print(f"{station_count} stations x {hours} hours ({len(xml_content) / 1024:.0f} KiB):")
+
+        two_pass_time, two_pass_peak = measure(lambda: _two_pass(xml_content))
+        single_pass_time, single_pass_peak = measure(lambda: parse_arso_xml(xml_content))
+
+        print_row("two-pass (old)", two_pass_time, two_pass_peak)
+        print_row("single-pass", single_pass_time, single_pass_peak)
+        print(f"  speedup {two_pass_time / single_pass_time:.2f}x, "
+              f"peak memory {single_pass_peak / two_pass_peak:.0%} of old path\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Helpers shared by the benchmark scripts
+"""
+import contextlib
+import gc
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> Tuple[float, int]:
+    """
+    Run func several times and measure it
+
+    Returns:
+        Tuple[best wall time in seconds, peak traced memory in bytes]
+    """
+    best_time = float("inf")
+
+    # stdout is silenced, older code paths print debug lines for every element
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            best_time = min(best_time, time.perf_counter() - start)
+
+        # Peak memory is measured in a separate run, tracing slows code down
+        gc.collect()
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return best_time, peak
+
+
+def print_row(label: str, seconds: float, peak_bytes: int) -> None:
+    print(f"  {label:<28} {seconds * 1000:10.1f} ms {peak_bytes / 1024 / 1024:10.2f} MiB")
@@ -0,0 +1,80 @@
+"""
+Synthetic ARSO feed generator
+=============================
+Builds ARSO-shaped XML documents of any size for benchmarks and tests,
+so parser performance can be measured without hitting the ARSO server.
+"""
+from datetime import datetime, timedelta
+import random
+from typing import Iterator, Optional
+
+
+# Station names with escapes and non-ASCII characters like in the real feed
+STATION_NAMES = [
+    "LJ Be\\u017eigrad", "Maribor center", "Celje", "Koper", "Nova Gorica",
+    "Trbovlje", "Zagorje", "Murska Sobota Rakičan", "Kranj", "Novo mesto",
+]
+
+
+def iter_arso_xml_lines(
+        station_count: int,
+        hours: int = 1,
+        start_time: Optional[datetime] = None,
+        seed: int = 42
+) -> Iterator[str]:
+    """
+    Generate an ARSO XML document line by line, without keeping it in memory
+
+    Args:
+        station_count: number of distinct stations (sifra values)
+        hours: number of hourly <postaja> blocks per station,
+               hours > 1 simulates multi-day or archive feeds
+        start_time: datum_od of the first hour
+        seed: random seed so runs are reproducible
+
+    Yields:
+        str: lines of the XML document
+    """
+    rng = random.Random(seed)
+    start_time = start_time or datetime(2025, 1, 1, 0, 0)
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield '<arsopodatki verzija="1.4">'
+    yield '<vir>Agencija RS za okolje</vir>'
+    yield '<predlagan_zajem>5 minut \\u010dez polno uro</predlagan_zajem>'
+    yield '<predlagan_zajem_perioda>60 min</predlagan_zajem_perioda>'
+    yield f'<datum_priprave>{(start_time + timedelta(hours=hours)).strftime("%d-%m-%Y @ %H:%M")}</datum_priprave>'
+
+    for hour in range(hours):
+        time_from = (start_time + timedelta(hours=hour)).strftime("%Y-%m-%d %H:%M")
+        time_to = (start_time + timedelta(hours=hour + 1)).strftime("%Y-%m-%d %H:%M")
+
+        for index in range(station_count):
+            name = f"{STATION_NAMES[index % len(STATION_NAMES)]} {index}"
+            yield (
+                f'<postaja sifra="E{index:04d}" wgs84_sirina="{45.5 + rng.random():.4f}" '
+                f'wgs84_dolzina="{13.5 + 3 * rng.random():.4f}" d96_e="{370000 + rng.randint(0, 250000)}" '
+                f'd96_n="{30000 + rng.randint(0, 160000)}" nadm_visina="{rng.randint(50, 900)}">'
+            )
+            yield f'<merilno_mesto>{name}</merilno_mesto>'
+            yield f'<datum_od>{time_from}</datum_od>'
+            yield f'<datum_do>{time_to}</datum_do>'
+            yield f'<co>{rng.uniform(0.1, 1.5):.1f}</co>'
+            yield f'<o3>{rng.randint(5, 120)}</o3>'
+            yield f'<no2>{rng.randint(2, 80)}</no2>'
+            # values below the detection limit are reported as "<N" (escaped in XML)
+            yield f'<so2>{"&lt;3" if rng.random() < 0.3 else rng.randint(3, 20)}</so2>'
+            yield f'<pm10>{rng.randint(5, 90)}</pm10>'
+            yield f'<pm2.5>{rng.randint(3, 70)}</pm2.5>'
+            yield f'<nox>{rng.randint(5, 150)}</nox>'
+            yield f'<benzen>{"&lt;0.1" if rng.random() < 0.3 else f"{rng.uniform(0.1, 3):.1f}"}</benzen>'
+            yield '</postaja>'
+
+    yield '</arsopodatki>'
+
+
+def generate_arso_xml(station_count: int, hours: int = 1, start_time: Optional[datetime] = None, seed: int = 42) -> str:
+    """
+    Generate a whole ARSO XML document as one string, see iter_arso_xml_lines()
+    """
+    return "\n".join(iter_arso_xml_lines(station_count, hours, start_time, seed))
@@ -0,0 +1,78 @@
+import logging
+import os
+import threading
+from typing import Any, Optional
+from flask import Flask
+from flask_caching import Cache
+from backend.utils.generation import LATEST_GENERATION_KEY
+from backend.utils.latest_readings import LATEST_MERGED_DATA_KEY
+from backend.utils.near_cache import TieredCache
+
+
+"""
+Cache shared by the web processes and the ingestion worker.
+Redis connects lazily on first use, nothing is pinged at startup.
+Without REDIS_URL every process gets its own SimpleCache, which only
+works when ingest and web run in the same process.
+
+Request handlers read through tiered_cache: with Redis an in-process near
+cache answers repeated reads, invalidated over pub/sub on every new
+generation (backend.utils.near_cache).
+"""
+
+# Initialize cache instance
+cache = Cache()
+
+NEAR_CACHE_MAXSIZE = 256        # entries, rendered bodies are the largest at a few hundred KiB
+NEAR_CACHE_TTL = 3600           # seconds, pub/sub invalidation usually drops entries sooner
+GENERATION_MARKER_TTL = 5       # seconds the marker may be stale when a pub/sub message is lost
+
+
+def configure_cache(app: Flask) -> None:
+    # if REDIS_URL is not set use SimpleCache
+    redis_url = os.environ.get('REDIS_URL')
+
+    if redis_url:
+        app.config['CACHE_TYPE'] = 'RedisCache'
+        app.config['CACHE_REDIS_URL'] = redis_url
+        logging.info(f"Using Redis cache at {redis_url}")
+        tiered_cache.enable_near_cache(NEAR_CACHE_MAXSIZE, NEAR_CACHE_TTL)
+    else:
+        app.config['CACHE_TYPE'] = "SimpleCache"
+        logging.info(f"Using SimpleCache ")
+        tiered_cache.disable_near_cache()
+
+    app.config['CACHE_DEFAULT_TIMEOUT'] = 3600
+
+    # Initialize cache instance with app
+    cache.init_app(app)  # type: ignore
+
+
+_redis_client: Optional[Any] = None
+_redis_lock = threading.Lock()
+
+
+def get_redis_client() -> Optional[Any]:
+    """Plain Redis client for locks and pub/sub, None when REDIS_URL is not set"""
+    global _redis_client
+    redis_url = os.environ.get('REDIS_URL')
+    if not redis_url:
+        return None
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                from redis import Redis
+                _redis_client = Redis.from_url(redis_url, socket_timeout=5, socket_connect_timeout=5)
+    return _redis_client
+
+
+# Read path of request handlers, writes go to cache directly
+tiered_cache = TieredCache(
+    cache,
+    near_ttls={
+        LATEST_GENERATION_KEY: GENERATION_MARKER_TTL,
+        # rewritten in place every ingest, read only to render missing bytes
+        LATEST_MERGED_DATA_KEY: 0,
+    },
+    redis_client_factory=get_redis_client,
+)
@@ -0,0 +1,115 @@
+"""
+Bulk measurement writer
+=======================
+Writes many measurement rows in as few round trips as possible and
+reports how many were new and how many already existed.
+
+- small writes (the hourly feed): one multi-row INSERT ... ON CONFLICT DO NOTHING
+  RETURNING, SQLAlchemy sends the rows as pages of multi-row VALUES
+- large writes (backfills): COPY into a temporary staging table and one
+  INSERT ... SELECT ... ON CONFLICT DO NOTHING merge into measurements
+"""
+import csv
+import io
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.database.db_models import DbModelMeasurement, DbModelReportedHour
+
+
+# Rows from which COPY into the staging table beats multi-row INSERT
+BULK_COPY_THRESHOLD = 10_000
+
+STAGING_TABLE = "measurements_staging"
+
+# (station pk, pollutant pk, value, measured_at)
+MeasurementRow = Tuple[int, int, float, datetime]
+# (station pk, measured_at)
+ReportedHourRow = Tuple[int, datetime]
+
+
+@dataclass
+class BulkWriteResult:
+    inserted: int = 0   # new rows
+    skipped: int = 0    # rows already stored for the same station, pollutant and hour
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.skipped
+
+
+def write_measurements(db: Session, rows: List[MeasurementRow]) -> BulkWriteResult:
+    """
+    Insert measurement rows, existing (station_id, pollutant_id, measured_at) rows are kept.
+    Nothing is committed, the caller owns the transaction
+    """
+    if not rows:
+        return BulkWriteResult()
+
+    if len(rows) >= BULK_COPY_THRESHOLD:
+        inserted = _copy_and_merge(db, rows)
+    else:
+        inserted = _insert_values(db, rows)
+
+    result = BulkWriteResult(inserted=inserted, skipped=len(rows) - inserted)
+    logging.info(f"Bulk write of {len(rows)} measurements: {result.inserted} inserted, {result.skipped} already stored")
+    return result
+
+
+def write_reported_hours(db: Session, rows: List[ReportedHourRow]) -> None:
+    """Record the hours stations published, already recorded ones are kept. Nothing is committed"""
+    if not rows:
+        return
+    statement = insert(DbModelReportedHour).on_conflict_do_nothing(index_elements=['station_id', 'measured_at'])
+    db.execute(statement, [{"station_id": station_pk, "measured_at": measured_at} for station_pk, measured_at in rows])
+
+
+def _insert_values(db: Session, rows: List[MeasurementRow]) -> int:
+    statement = insert(DbModelMeasurement).on_conflict_do_nothing(
+        index_elements=['station_id', 'pollutant_id', 'measured_at']
+    ).returning(DbModelMeasurement.id)
+
+    result = db.execute(statement, [
+        {"station_id": station_pk, "pollutant_id": pollutant_pk, "value": value, "measured_at": measured_at}
+        for station_pk, pollutant_pk, value, measured_at in rows
+    ])
+    # RETURNING only yields rows that were inserted
+    return len(result.all())
+
+
+def _copy_and_merge(db: Session, rows: List[MeasurementRow]) -> int:
+    db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ("
+        "station_id integer NOT NULL, pollutant_id integer NOT NULL, "
+        "value double precision, measured_at timestamp NOT NULL"
+        ") ON COMMIT DELETE ROWS"
+    ))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for station_pk, pollutant_pk, value, measured_at in rows:
+        writer.writerow((station_pk, pollutant_pk, repr(value), measured_at.isoformat(sep=" ")))
+    buffer.seek(0)
+
+    # COPY goes through the psycopg2 connection of the session's transaction
+    driver_connection = db.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:  # type: ignore[union-attr]
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} (station_id, pollutant_id, value, measured_at) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+    merged = db.execute(text(
+        "INSERT INTO measurements (station_id, pollutant_id, value, measured_at) "
+        f"SELECT station_id, pollutant_id, value, measured_at FROM {STAGING_TABLE} "
+        "ON CONFLICT (station_id, pollutant_id, measured_at) DO NOTHING"
+    ))
+    # the staging table is reused by further writes in the same transaction
+    db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+    return merged.rowcount  # type: ignore[attr-defined]
@@ -1,7 +1,7 @@
 from typing import Optional, List
-from sqlalchemy import Integer, String, Float,DateTime, ForeignKey
+from sqlalchemy import BigInteger, Integer, String, Float,DateTime, Date, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
-from datetime import datetime
+from datetime import date, datetime
 
 
 Base = declarative_base()
@@ -10,7 +10,8 @@ Base = declarative_base()
 class DbModelStation(Base):
     __tablename__ = 'stations'
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    station_id: Mapped[str] = mapped_column(String(50), nullable=False)
+    # unique, on_conflict_do_update(index_elements=['station_id']) relies on it
+    station_id: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
     station_name: Mapped[str] = mapped_column(String(255), nullable=False)
     latitude: Mapped[Optional[float]] = mapped_column(Float)
     longitude: Mapped[Optional[float]] = mapped_column(Float)
@@ -31,32 +32,69 @@ class DbModelPollutant(Base):
 
 
 # Each measurement object represents one value for one pollutant, one station and one time
+# The table is range partitioned by month on measured_at, see backend/database/schema.py.
+# Unique constraints of a partitioned table must contain the partition key,
+# so measured_at is part of the primary key.
 class DbModelMeasurement(Base):
     __tablename__ = 'measurements'
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    __table_args__ = (
+        # on_conflict_do_nothing(index_elements=[...]) relies on it, its index serves
+        # the (station, pollutant, time range) queries
+        UniqueConstraint('station_id', 'pollutant_id', 'measured_at', name='uq_measurements_station_pollutant_time'),
+        # time range queries over all stations
+        Index('ix_measurements_measured_at', 'measured_at'),
+        {'postgresql_partition_by': 'RANGE (measured_at)'},
+    )
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     station_id: Mapped[int] = mapped_column(Integer, ForeignKey('stations.id', ondelete="CASCADE"))
     pollutant_id: Mapped[int] = mapped_column(Integer, ForeignKey('pollutants.id', ondelete="CASCADE"))
     # float is a python object type in the model, Float is the SQLAlchemy database column type
     value: Mapped[float] = mapped_column(Float, nullable = True)
     # datetime is python object in my model, DateTime is the SQLAlchemy database column type
-    measured_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    measured_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, nullable=False)
 
     station: Mapped[DbModelStation] = relationship("DbModelStation", back_populates = "station_measurements")
     pollutant: Mapped[DbModelPollutant] = relationship("DbModelPollutant", back_populates="pollutant_measurements")
 
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+# Hours a station published a <postaja> block for, stored with its measurements.
+# A pollutant without a row in such an hour was published empty by ARSO, not lost
+# (backend/database/gaps.py).
+class DbModelReportedHour(Base):
+    __tablename__ = 'station_reported_hours'
+    station_id: Mapped[int] = mapped_column(Integer, ForeignKey('stations.id', ondelete="CASCADE"), primary_key=True)
+    measured_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+
+# Rollups: count, sum, min, max and sum of squares of all hourly values of one
+# station and pollutant per day and per month, maintained by backend/database/rollups.py.
+# mean = sum / count, variance = (sum_squares - sum * sum / count) / (count - 1)
+class DbModelDailyRollup(Base):
+    __tablename__ = 'measurement_rollups_daily'
+    station_id: Mapped[int] = mapped_column(Integer, ForeignKey('stations.id', ondelete="CASCADE"), primary_key=True)
+    pollutant_id: Mapped[int] = mapped_column(Integer, ForeignKey('pollutants.id', ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    sum: Mapped[float] = mapped_column(Float, nullable=False)
+    min: Mapped[float] = mapped_column(Float, nullable=False)
+    max: Mapped[float] = mapped_column(Float, nullable=False)
+    sum_squares: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class DbModelMonthlyRollup(Base):
+    __tablename__ = 'measurement_rollups_monthly'
+    station_id: Mapped[int] = mapped_column(Integer, ForeignKey('stations.id', ondelete="CASCADE"), primary_key=True)
+    pollutant_id: Mapped[int] = mapped_column(Integer, ForeignKey('pollutants.id', ondelete="CASCADE"), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)   # first day of the month
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    sum: Mapped[float] = mapped_column(Float, nullable=False)
+    min: Mapped[float] = mapped_column(Float, nullable=False)
+    max: Mapped[float] = mapped_column(Float, nullable=False)
+    sum_squares: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+# Newest fencing token of every distributed job, see backend/database/fencing.py
+class DbModelJobFence(Base):
+    __tablename__ = 'job_fences'
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    token: Mapped[int] = mapped_column(BigInteger, nullable=False)
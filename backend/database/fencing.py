@@ -0,0 +1,35 @@
+"""
+Fencing tokens
+Every holder of a distributed lock gets an increasing fencing token. A job
+that lost its lease (paused, slow, partitioned from Redis) may still try to
+write after a newer holder did; check_fencing_token() runs inside the
+write transaction and rejects it, so stale writers can never overwrite
+newer data.
+"""
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.database.db_models import DbModelJobFence
+
+
+class StaleFencingTokenError(RuntimeError):
+    """A newer lock holder has already written"""
+
+
+def check_fencing_token(db: Session, name: str, token: int) -> None:
+    """
+    Record token as the newest one of job name, in the caller's transaction.
+    The row stays locked until commit, so concurrent writers are serialized
+
+    Raises:
+        StaleFencingTokenError: a newer token was already recorded
+    """
+    statement = insert(DbModelJobFence).values(name=name, token=token)
+    statement = statement.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'token': statement.excluded.token},
+        where=DbModelJobFence.token <= statement.excluded.token
+    ).returning(DbModelJobFence.token)
+
+    if db.execute(statement).first() is None:
+        raise StaleFencingTokenError(f"Fencing token {token} of {name} is older than the newest recorded one")
@@ -0,0 +1,88 @@
+"""
+Measurement gaps
+================
+Finds missing (station, pollutant, hour) ranges with one set-based query:
+
+- every station and pollutant pair with data in the window is expected
+  to have a row for every hour of it (generate_series)
+- the expected hours are anti-joined against measurements through the
+  (station_id, pollutant_id, measured_at) unique index, and against the
+  hours the station published, where a missing row means ARSO published
+  the pollutant empty (station_reported_hours, stored with the rows)
+- consecutive missing hours are collapsed into ranges with the gaps and
+  islands trick: hour minus its row number is constant within a range
+
+Pairs without any row in the window (a station that was switched off)
+are not reported. Hours are measured_at values, the end of the measurement hour.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.database.db_models import DbModelMeasurement, DbModelPollutant, DbModelReportedHour, DbModelStation
+
+
+@dataclass(frozen=True)
+class MeasurementGap:
+    station_id: str         # ARSO sifra
+    pollutant: str
+    start: datetime         # first missing hour
+    end: datetime           # last missing hour, inclusive
+    hours: int
+
+
+_GAPS_QUERY = text(f"""
+    WITH pairs AS (
+        SELECT DISTINCT station_id, pollutant_id
+        FROM {DbModelMeasurement.__tablename__}
+        WHERE measured_at >= :start AND measured_at < :end
+    ),
+    expected AS (
+        SELECT pairs.station_id, pairs.pollutant_id, hours.hour
+        FROM pairs
+        CROSS JOIN generate_series(CAST(:start AS timestamp), CAST(:end AS timestamp) - interval '1 hour',
+                                   interval '1 hour') AS hours(hour)
+    ),
+    missing AS (
+        SELECT expected.station_id, expected.pollutant_id, expected.hour,
+               expected.hour - row_number() OVER (
+                   PARTITION BY expected.station_id, expected.pollutant_id ORDER BY expected.hour
+               ) * interval '1 hour' AS island
+        FROM expected
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {DbModelMeasurement.__tablename__} AS m
+            WHERE m.station_id = expected.station_id
+              AND m.pollutant_id = expected.pollutant_id
+              AND m.measured_at = expected.hour
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM {DbModelReportedHour.__tablename__} AS r
+            WHERE r.station_id = expected.station_id
+              AND r.measured_at = expected.hour
+        )
+    )
+    SELECT s.station_id, p.name, min(missing.hour), max(missing.hour), count(*)
+    FROM missing
+    JOIN {DbModelStation.__tablename__} AS s ON s.id = missing.station_id
+    JOIN {DbModelPollutant.__tablename__} AS p ON p.id = missing.pollutant_id
+    GROUP BY s.station_id, p.name, missing.island
+    ORDER BY s.station_id, p.name, min(missing.hour)
+""")
+
+
+def find_gaps(db: Session, start: datetime, end: datetime) -> List[MeasurementGap]:
+    """Missing hour ranges in [start, end), start and end are full hours"""
+    rows = db.execute(_GAPS_QUERY, {"start": start, "end": end}).all()
+    return [MeasurementGap(*row) for row in rows]
+
+
+def missing_hours_by_station(gaps: Iterable[MeasurementGap]) -> Dict[str, int]:
+    """Missing (pollutant, hour) rows per station"""
+    totals: Counter = Counter()
+    for gap in gaps:
+        totals[gap.station_id] += gap.hours
+    return dict(totals)
@@ -0,0 +1,149 @@
+"""
+Identity cache
+==============
+station_id (sifra) -> stations.id and pollutant name -> pollutants.id,
+populated once per process and refreshed only on a miss or after invalidate().
+Station ids that are still unknown after a refresh (e.g. their <postaja>
+failed validation and was never synced) are remembered until invalidate(),
+so they do not reload the registry every cycle.
+
+Lookups are plain dict reads without a lock. A refresh builds a new dict
+and swaps it in under a lock, so threads and scheduler jobs can share one
+cache. Stations come from the StationRegistry, which also upserts new or
+changed stations.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.database.db_models import DbModelPollutant
+from backend.database.station_registry import StationRegistry, get_station_registry
+
+
+def pollutant_unit(name: str) -> str:
+    return "μg/m³" if name != "co" else "mg/m³"
+
+
+class IdentityCache:
+    """Primary keys of stations and pollutants shared by all ingest paths"""
+
+    def __init__(self, station_registry: Optional[StationRegistry] = None) -> None:
+        self.stations = station_registry or get_station_registry()
+        self._pollutant_ids: Dict[str, int] = {}
+        # not in the database after the last station reload
+        self._unknown_stations: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+
+    #------------------------------------------------------------
+    # Pollutants
+    #------------------------------------------------------------
+
+    def pollutant_ids(self, db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """
+        name -> primary key for all names, queries the database only when a name is not cached.
+        Unknown pollutants are added with one statement
+        """
+        names = list(dict.fromkeys(names))
+        cached = self._pollutant_ids
+        if all(name in cached for name in names):
+            return {name: cached[name] for name in names}
+
+        with self._refresh_lock:
+            # another thread may have refreshed while this one waited
+            missing = [name for name in names if name not in self._pollutant_ids]
+            if missing:
+                self._pollutant_ids = self._load_pollutants(db, missing)
+            cached = self._pollutant_ids
+        return {name: cached[name] for name in names if name in cached}
+
+    def pollutant_pk(self, db: Session, name: str) -> Optional[int]:
+        return self.pollutant_ids(db, [name]).get(name)
+
+    def _load_pollutants(self, db: Session, required: Iterable[str]) -> Dict[str, int]:
+        """All pollutants from the database, required ones are inserted when missing"""
+        pollutant_ids: Dict[str, int] = {name: pollutant_id for pollutant_id, name in db.execute(
+            select(DbModelPollutant.id, DbModelPollutant.name)
+        ).all()}
+
+        missing = [name for name in required if name not in pollutant_ids]
+        if missing:
+            new_pollutants = insert(DbModelPollutant).values([
+                {"name": name, "unit": pollutant_unit(name)} for name in missing
+            ]).on_conflict_do_nothing(
+                index_elements=['name']
+            ).returning(DbModelPollutant.id, DbModelPollutant.name)
+            pollutant_ids.update({name: pollutant_id for pollutant_id, name in db.execute(new_pollutants).all()})
+
+            # added concurrently by another process, RETURNING skips conflicting rows
+            if any(name not in pollutant_ids for name in missing):
+                pollutant_ids.update({name: pollutant_id for pollutant_id, name in db.execute(
+                    select(DbModelPollutant.id, DbModelPollutant.name).where(DbModelPollutant.name.in_(missing))
+                ).all()})
+            logging.info(f"Added pollutants {missing}")
+
+        return pollutant_ids
+
+    #------------------------------------------------------------
+    # Stations
+    #------------------------------------------------------------
+
+    def station_pks(self, db: Session, station_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        sifra -> primary key of the stored stations among station_ids.
+        The registry is reloaded at most once, only for ids not known to be missing
+        """
+        station_ids = list(dict.fromkeys(station_ids))
+        station_pks = self._resolve_stations(station_ids)
+        if all(station_id in station_pks or station_id in self._unknown_stations for station_id in station_ids):
+            return station_pks
+
+        with self._refresh_lock:
+            # another thread may have reloaded while this one waited
+            station_pks = self._resolve_stations(station_ids)
+            missing = [station_id for station_id in station_ids
+                       if station_id not in station_pks and station_id not in self._unknown_stations]
+            if missing:
+                self.stations.load(db)
+                station_pks = self._resolve_stations(station_ids)
+                unknown = [station_id for station_id in missing if station_id not in station_pks]
+                if unknown:
+                    logging.warning(f"Stations {unknown} are not stored, their measurements are skipped")
+                self._unknown_stations.update(unknown)
+        return station_pks
+
+    def station_pk(self, db: Session, station_id: str) -> Optional[int]:
+        """Primary key of a stored station, the registry is reloaded once on a miss"""
+        return self.station_pks(db, [station_id]).get(station_id)
+
+    def _resolve_stations(self, station_ids: Iterable[str]) -> Dict[str, int]:
+        station_pks: Dict[str, int] = {}
+        for station_id in station_ids:
+            station_pk = self.stations.resolve(station_id)
+            if station_pk is not None:
+                station_pks[station_id] = station_pk
+        return station_pks
+
+    #------------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """Forget all keys, e.g. after a rollback that may have undone inserted rows"""
+        with self._refresh_lock:
+            self._pollutant_ids = {}
+            self._unknown_stations = set()
+            self.stations.invalidate()
+
+
+#=================================================================================
+# SHARED INSTANCE
+# ================================================================================
+
+_identity_cache = IdentityCache()
+
+
+def get_identity_cache() -> IdentityCache:
+    """Process-wide cache"""
+    return _identity_cache
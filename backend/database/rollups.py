@@ -0,0 +1,210 @@
+"""
+Measurement rollups
+===================
+Daily and monthly count, sum, min, max and sum of squares per station and
+pollutant, so statistics never scan raw hourly rows.
+
+After every ingest only the buckets touched by the written rows are
+recomputed: days from the hourly measurements of that day (partition
+pruned by measured_at), months from their daily rollups. Recomputing a
+bucket instead of adding to it keeps rollups exact when rows were skipped
+as duplicates or written twice. rebuild_rollups() recomputes a whole
+range, e.g. after a backfill.
+
+Days are calendar days of measured_at (the end of the measurement hour).
+
+Run with:
+    python -m backend.database.rollups --from 2024-01-01 --to 2024-12-31
+"""
+import argparse
+import logging
+import math
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from backend.database.bulk_writer import MeasurementRow
+from backend.database.db_models import DbModelDailyRollup, DbModelMonthlyRollup, DbModelPollutant, DbModelStation
+
+
+# (station pk, pollutant pk, first day of the bucket)
+Bucket = Tuple[int, int, date]
+
+_ROLLUP_COLUMNS = "count, sum, min, max, sum_squares"
+_ROLLUP_UPDATE = ", ".join(f"{column} = EXCLUDED.{column}" for column in _ROLLUP_COLUMNS.split(", "))
+
+
+#=================================================================================
+# INCREMENTAL UPDATE
+# ================================================================================
+
+def touched_buckets(rows: Iterable[MeasurementRow]) -> Tuple[Set[Bucket], Set[Bucket]]:
+    """Daily and monthly buckets of written rows"""
+    days: Set[Bucket] = set()
+    for station_pk, pollutant_pk, _value, measured_at in rows:
+        days.add((station_pk, pollutant_pk, measured_at.date()))
+    months = {(station_pk, pollutant_pk, day.replace(day=1)) for station_pk, pollutant_pk, day in days}
+    return days, months
+
+
+def _unnest_params(buckets: Set[Bucket]) -> dict:
+    station_pks, pollutant_pks, days = zip(*buckets)
+    return {"station_ids": list(station_pks), "pollutant_ids": list(pollutant_pks), "days": list(days)}
+
+
+def _refresh_daily(db: Session, days: Set[Bucket]) -> None:
+    db.execute(text(
+        f"INSERT INTO {DbModelDailyRollup.__tablename__} (station_id, pollutant_id, day, {_ROLLUP_COLUMNS}) "
+        "SELECT m.station_id, m.pollutant_id, t.day, count(m.value), sum(m.value), min(m.value), max(m.value), sum(m.value * m.value) "
+        "FROM unnest(CAST(:station_ids AS integer[]), CAST(:pollutant_ids AS integer[]), CAST(:days AS date[])) "
+        "AS t(station_id, pollutant_id, day) "
+        "JOIN measurements m ON m.station_id = t.station_id AND m.pollutant_id = t.pollutant_id "
+        "AND m.measured_at >= t.day AND m.measured_at < t.day + 1 "
+        "WHERE m.value IS NOT NULL "
+        "GROUP BY m.station_id, m.pollutant_id, t.day "
+        f"ON CONFLICT (station_id, pollutant_id, day) DO UPDATE SET {_ROLLUP_UPDATE}"
+    ), _unnest_params(days))
+
+
+def _refresh_monthly(db: Session, months: Set[Bucket]) -> None:
+    db.execute(text(
+        f"INSERT INTO {DbModelMonthlyRollup.__tablename__} (station_id, pollutant_id, month, {_ROLLUP_COLUMNS}) "
+        "SELECT d.station_id, d.pollutant_id, t.month, sum(d.count), sum(d.sum), min(d.min), max(d.max), sum(d.sum_squares) "
+        "FROM unnest(CAST(:station_ids AS integer[]), CAST(:pollutant_ids AS integer[]), CAST(:days AS date[])) "
+        "AS t(station_id, pollutant_id, month) "
+        f"JOIN {DbModelDailyRollup.__tablename__} d ON d.station_id = t.station_id AND d.pollutant_id = t.pollutant_id "
+        "AND d.day >= t.month AND d.day < CAST(t.month + interval '1 month' AS date) "
+        "GROUP BY d.station_id, d.pollutant_id, t.month "
+        f"ON CONFLICT (station_id, pollutant_id, month) DO UPDATE SET {_ROLLUP_UPDATE}"
+    ), _unnest_params(months))
+
+
+def update_rollups(db: Session, rows: List[MeasurementRow]) -> int:
+    """
+    Recompute the daily and monthly buckets touched by rows, in the caller's transaction
+
+    Returns:
+        int: number of refreshed daily buckets
+    """
+    if not rows:
+        return 0
+    days, months = touched_buckets(rows)
+    _refresh_daily(db, days)
+    _refresh_monthly(db, months)
+    logging.info(f"Refreshed {len(days)} daily and {len(months)} monthly rollups")
+    return len(days)
+
+
+#=================================================================================
+# REBUILD
+# ================================================================================
+
+def rebuild_rollups(db: Session, start: date, end: date) -> None:
+    """
+    Recompute all rollups of the months from start to end (both included) from raw measurements
+    """
+    first_day = start.replace(day=1)
+    # first day of the month after end
+    after_end = (end.replace(day=1) + timedelta(days=32)).replace(day=1)
+    params = {"start": first_day, "end": after_end}
+
+    db.execute(text(f"DELETE FROM {DbModelDailyRollup.__tablename__} WHERE day >= :start AND day < :end"), params)
+    db.execute(text(f"DELETE FROM {DbModelMonthlyRollup.__tablename__} WHERE month >= :start AND month < :end"), params)
+
+    db.execute(text(
+        f"INSERT INTO {DbModelDailyRollup.__tablename__} (station_id, pollutant_id, day, {_ROLLUP_COLUMNS}) "
+        "SELECT station_id, pollutant_id, CAST(measured_at AS date), count(value), sum(value), min(value), max(value), sum(value * value) "
+        "FROM measurements WHERE measured_at >= :start AND measured_at < :end AND value IS NOT NULL "
+        "GROUP BY station_id, pollutant_id, CAST(measured_at AS date)"
+    ), params)
+    db.execute(text(
+        f"INSERT INTO {DbModelMonthlyRollup.__tablename__} (station_id, pollutant_id, month, {_ROLLUP_COLUMNS}) "
+        "SELECT station_id, pollutant_id, CAST(date_trunc('month', day) AS date), sum(count), sum(sum), min(min), max(max), sum(sum_squares) "
+        f"FROM {DbModelDailyRollup.__tablename__} WHERE day >= :start AND day < :end "
+        "GROUP BY station_id, pollutant_id, CAST(date_trunc('month', day) AS date)"
+    ), params)
+    logging.info(f"Rebuilt rollups from {first_day} to {after_end}")
+
+
+#=================================================================================
+# STATISTICS
+# ================================================================================
+
+@dataclass
+class RollupStats:
+    period: date
+    count: int
+    mean: float
+    min: float
+    max: float
+    stddev: Optional[float]     # sample standard deviation, None for a single value
+
+    @classmethod
+    def from_sums(cls, period: date, count: int, total: float, minimum: float, maximum: float, sum_squares: float) -> "RollupStats":
+        stddev = None
+        if count > 1:
+            # rounding can make a constant series slightly negative
+            variance = max((sum_squares - total * total / count) / (count - 1), 0.0)
+            stddev = math.sqrt(variance)
+        return cls(period=period, count=count, mean=total / count, min=minimum, max=maximum, stddev=stddev)
+
+    def to_dict(self) -> dict:
+        return {
+            "period": self.period.isoformat(),
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "stddev": self.stddev,
+        }
+
+
+def get_rollup_stats(db: Session, granularity: str, station_id: str, pollutant: str,
+                     start: Optional[date] = None, end: Optional[date] = None) -> List[RollupStats]:
+    """
+    Statistics of one station (sifra) and pollutant per day or month, read from the rollups only
+
+    Raises:
+        ValueError: unknown granularity
+    """
+    if granularity == "daily":
+        model, period_column = DbModelDailyRollup, DbModelDailyRollup.day
+    elif granularity == "monthly":
+        model, period_column = DbModelMonthlyRollup, DbModelMonthlyRollup.month
+    else:
+        raise ValueError(f"Unknown granularity {granularity}, expected daily or monthly")
+
+    query = (
+        select(period_column, model.count, model.sum, model.min, model.max, model.sum_squares)
+        .join(DbModelStation, DbModelStation.id == model.station_id)
+        .join(DbModelPollutant, DbModelPollutant.id == model.pollutant_id)
+        .where(DbModelStation.station_id == station_id, DbModelPollutant.name == pollutant)
+        .order_by(period_column)
+    )
+    if start is not None:
+        query = query.where(period_column >= (start.replace(day=1) if granularity == "monthly" else start))
+    if end is not None:
+        query = query.where(period_column <= end)
+
+    return [RollupStats.from_sums(*row) for row in db.execute(query).all()]
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Rebuild daily and monthly measurement rollups")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, default=datetime.now().date(), help="YYYY-MM-DD, default: today")
+    args = parser.parse_args()
+
+    from backend.database.session import SessionLocal
+    with SessionLocal() as db:
+        rebuild_rollups(db, args.start, args.end)
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Managed schema
+==============
+Creates the tables from db_models, keeps monthly partitions of the
+measurements table and drops partitions past retention.
+
+measurements is range partitioned by month on measured_at. Every month is
+its own table (measurements_y2025m01, ...), so a time range query only scans
+the partitions of that range and dropping a whole month is a DROP TABLE
+instead of a large DELETE. Partitions are created ahead of time by a daily
+job and on demand before rows of a new month are inserted.
+
+Run with:
+    python -m backend.database.schema --months-ahead 3 [--migrate] [--retention-months 36]
+"""
+import argparse
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from typing import List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from backend.database.db_models import Base, DbModelMeasurement
+
+
+MEASUREMENTS_TABLE = DbModelMeasurement.__tablename__
+PARTITION_MONTHS_AHEAD = 3     # months of empty partitions kept ready after the current one
+# months of data kept by drop_expired_partitions(), 0 keeps everything
+MEASUREMENT_RETENTION_MONTHS = int(os.environ.get("MEASUREMENT_RETENTION_MONTHS", "0"))
+PARTITION_NAME_PATTERN = re.compile(rf"^{MEASUREMENTS_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# partitions known to exist, creation is only attempted for months not in here
+_known_partitions: Set[str] = set()
+_partitions_lock = threading.Lock()
+
+
+#=================================================================================
+# MONTHS
+# ================================================================================
+
+def month_start(timestamp: datetime) -> datetime:
+    return datetime(timestamp.year, timestamp.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{MEASUREMENTS_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """measurements_y2025m01 -> 2025-01-01, None for other tables"""
+    match = PARTITION_NAME_PATTERN.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def months_between(start: datetime, end: datetime) -> List[datetime]:
+    """First days of all months from start to end, both included"""
+    months: List[datetime] = []
+    month = month_start(start)
+    while month <= end:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+#=================================================================================
+# PARTITIONS
+# ================================================================================
+
+def list_partitions(db: Session) -> List[str]:
+    rows = db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table"
+    ), {"table": MEASUREMENTS_TABLE}).scalars().all()
+    return sorted(rows)
+
+
+def create_partition(db: Session, month: datetime) -> str:
+    name = partition_name(month)
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {MEASUREMENTS_TABLE} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    ))
+    return name
+
+
+def ensure_partitions(db: Session, start: datetime, end: datetime) -> List[str]:
+    """
+    Create the missing monthly partitions for measured_at between start and end.
+    Months created before by this process cost no query. Nothing is committed
+
+    Returns:
+        List[str]: names of created partitions
+    """
+    missing = [month for month in months_between(start, end) if partition_name(month) not in _known_partitions]
+    if not missing:
+        return []
+
+    with _partitions_lock:
+        if not _known_partitions:
+            _known_partitions.update(list_partitions(db))
+
+        created: List[str] = []
+        for month in missing:
+            name = partition_name(month)
+            if name not in _known_partitions:
+                create_partition(db, month)
+                created.append(name)
+                _known_partitions.add(name)
+
+    if created:
+        logging.info(f"Created partitions {created}")
+    return created
+
+
+def ensure_future_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD,
+                             now: Optional[datetime] = None) -> List[str]:
+    """Partitions for the current month and months_ahead following ones"""
+    current = month_start(now or datetime.now())
+    return ensure_partitions(db, current, add_months(current, months_ahead))
+
+
+def drop_expired_partitions(db: Session, retention_months: int, now: Optional[datetime] = None) -> List[str]:
+    """
+    Drop partitions whose whole month is older than retention_months,
+    only the dropped months are touched, no rows are deleted one by one
+
+    Returns:
+        List[str]: names of dropped partitions
+    """
+    oldest_kept = add_months(month_start(now or datetime.now()), -retention_months)
+    dropped: List[str] = []
+
+    with _partitions_lock:
+        for name in list_partitions(db):
+            month = partition_month(name)
+            if month is not None and month < oldest_kept:
+                db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                _known_partitions.discard(name)
+                dropped.append(name)
+
+    if dropped:
+        logging.info(f"Dropped expired partitions {dropped}")
+    return dropped
+
+
+def maintain_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD,
+                        retention_months: int = MEASUREMENT_RETENTION_MONTHS) -> None:
+    """Daily job: partitions for the coming months, expired months dropped when retention is set"""
+    ensure_future_partitions(db, months_ahead)
+    if retention_months:
+        drop_expired_partitions(db, retention_months)
+
+
+def forget_known_partitions() -> None:
+    """Reload the partition list from the database on the next ensure_partitions()"""
+    with _partitions_lock:
+        _known_partitions.clear()
+
+
+#=================================================================================
+# SCHEMA
+# ================================================================================
+
+def _is_partitioned(db: Session) -> Optional[bool]:
+    """None when measurements does not exist"""
+    kind = db.execute(text(
+        "SELECT relkind FROM pg_class WHERE relname = :table AND relkind IN ('r', 'p')"
+    ), {"table": MEASUREMENTS_TABLE}).scalar()
+    return None if kind is None else kind == "p"
+
+
+def migrate_to_partitioned(db: Session) -> None:
+    """
+    Move an existing flat measurements table into the partitioned one.
+    The old table is kept as measurements_unpartitioned until it is dropped by hand
+    """
+    legacy = f"{MEASUREMENTS_TABLE}_unpartitioned"
+    db.execute(text(f"ALTER TABLE {MEASUREMENTS_TABLE} RENAME TO {legacy}"))
+    # the new table creates indexes and a sequence with the same names
+    index_names = db.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table"
+    ), {"table": legacy}).scalars().all()
+    for index_name in index_names:
+        # identifiers longer than 63 characters are truncated by Postgres anyway
+        db.execute(text(f"ALTER INDEX {index_name} RENAME TO {f'{legacy}_{index_name}'[:63]}"))
+    db.execute(text(f"ALTER SEQUENCE IF EXISTS {MEASUREMENTS_TABLE}_id_seq RENAME TO {legacy}_id_seq"))
+
+    Base.metadata.create_all(db.connection(), tables=[DbModelMeasurement.__table__])
+
+    first, last = db.execute(text(f"SELECT min(measured_at), max(measured_at) FROM {legacy}")).one()
+    if first is not None:
+        forget_known_partitions()
+        ensure_partitions(db, first, last)
+        copied = db.execute(text(
+            f"INSERT INTO {MEASUREMENTS_TABLE} (station_id, pollutant_id, value, measured_at) "
+            f"SELECT station_id, pollutant_id, value, measured_at FROM {legacy} "
+            "WHERE station_id IS NOT NULL AND pollutant_id IS NOT NULL "
+            "ON CONFLICT (station_id, pollutant_id, measured_at) DO NOTHING"
+        )).rowcount
+        logging.info(f"Copied {copied} measurements into the partitioned table")
+
+
+def _ensure_station_id_unique(db: Session) -> None:
+    """Tables created before the constraint was declared"""
+    exists = db.execute(text(
+        "SELECT 1 FROM pg_index "
+        "JOIN pg_class ON pg_class.oid = pg_index.indrelid "
+        "JOIN pg_attribute ON pg_attribute.attrelid = pg_class.oid AND pg_attribute.attnum = pg_index.indkey[0] "
+        "WHERE pg_class.relname = 'stations' AND pg_index.indisunique "
+        "AND pg_index.indnatts = 1 AND pg_attribute.attname = 'station_id'"
+    )).first()
+    if exists is None:
+        db.execute(text("ALTER TABLE stations ADD CONSTRAINT stations_station_id_key UNIQUE (station_id)"))
+        logging.info("Added unique constraint on stations.station_id")
+
+
+def create_schema(engine: Engine, months_ahead: int = PARTITION_MONTHS_AHEAD, migrate: bool = False) -> None:
+    """
+    Create missing tables, constraints and partitions
+
+    Args:
+        migrate: move a flat measurements table into the partitioned one,
+                 without it a flat table is left as it is and reported
+    """
+    with Session(engine) as db:
+        partitioned = _is_partitioned(db)
+        if partitioned is False:
+            if not migrate:
+                logging.warning(f"{MEASUREMENTS_TABLE} is not partitioned, run with --migrate to convert it")
+            else:
+                migrate_to_partitioned(db)
+                partitioned = True
+
+        Base.metadata.create_all(db.connection())
+        _ensure_station_id_unique(db)
+        if partitioned is not False:
+            ensure_future_partitions(db, months_ahead)
+        db.commit()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Create tables and monthly measurement partitions")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--migrate", action="store_true", help="convert a flat measurements table into partitions")
+    parser.add_argument("--retention-months", type=int, default=MEASUREMENT_RETENTION_MONTHS,
+                        help="drop partitions older than this, default: MEASUREMENT_RETENTION_MONTHS or keep everything")
+    args = parser.parse_args()
+
+    from backend.database.session import get_engine
+    engine = get_engine()
+    create_schema(engine, months_ahead=args.months_ahead, migrate=args.migrate)
+
+    with Session(engine) as db:
+        maintain_partitions(db, args.months_ahead, args.retention_months)
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,95 @@
 import os
+import threading
 import urllib.parse
+from typing import Any, Optional
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from backend.utils.env import env_flag
 
-# Load environment variables from .env file
-load_dotenv()
 
-db_user = os.getenv("DB_USER")
-db_password = os.getenv("DB_PASSWORD")
-db_host = os.getenv("DB_HOST")
-db_port = os.getenv("DB_PORT")
-db_name = os.getenv("DB_NAME")
+"""
+Database engine and sessions, created lazily on first use.
 
+Importing this module has no side effects: .env is read, the engine is built
+and the pool opens connections only when the first session is needed.
+Pool and logging are configured with environment variables:
+    DB_POOL_SIZE (5), DB_MAX_OVERFLOW (0), DB_POOL_TIMEOUT (30 s), DB_ECHO (false)
+"""
 
-# Ensure db_password is provided so its type is known to be str before quoting
-if db_password is None:
-    raise RuntimeError("DB_PASSWORD environment variable is not set")
 
-# URL-encode the password
-safe_password = urllib.parse.quote(db_password)
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
 
 
-DATABASE_URL = f"postgresql://{db_user}:{safe_password}@{db_host}:{db_port}/{db_name}?sslmode=require"
+def get_database_url() -> str:
+    # Load environment variables from .env file
+    load_dotenv()
 
+    db_user = os.getenv("DB_USER")
+    db_password = os.getenv("DB_PASSWORD")
+    db_host = os.getenv("DB_HOST")
+    db_port = os.getenv("DB_PORT")
+    db_name = os.getenv("DB_NAME")
 
+    # Ensure db_password is provided so its type is known to be str before quoting
+    if db_password is None:
+        raise RuntimeError("DB_PASSWORD environment variable is not set")
 
-# Create the SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True, # Checks if connection is alive before using it
-    pool_size=5, # matching my Nano Free tier limit
-    max_overflow=0, # no overflow connections
-    #timeout=30, # 30 seconds timeout
-    echo=True, # log all SQL queries
-    future=True # use 2.0 style
-    )
+    # URL-encode the password
+    safe_password = urllib.parse.quote(db_password)
+
+    return f"postgresql://{db_user}:{safe_password}@{db_host}:{db_port}/{db_name}?sslmode=require"
+
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
 
-# Create session
-SessionLocal = sessionmaker(bind=engine)
 
-# Test connection
-session = None
-try:
-    session = SessionLocal()
-    result = session.execute(text("SELECT 1"))
-    print("Database connection successful, result:", result.scalar())
+def get_engine() -> Engine:
+    """The process-wide engine, created on the first call"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    get_database_url(),
+                    pool_pre_ping=True, # Checks if connection is alive before using it
+                    pool_size=_env_int("DB_POOL_SIZE", 5), # default matches my Nano Free tier limit
+                    max_overflow=_env_int("DB_MAX_OVERFLOW", 0), # no overflow connections by default
+                    pool_timeout=_env_int("DB_POOL_TIMEOUT", 30), # seconds to wait for a free connection
+                    echo=env_flag("DB_ECHO"), # log all SQL queries when enabled
+                    future=True # use 2.0 style
+                )
+    return _engine
 
-except Exception as e:
-    print("Database connection failed", e)
 
-finally:
-    if session is not None:
-        session.close()
+def engine_created() -> bool:
+    return _engine is not None
 
 
+class _LazySessionFactory:
+    """
+    Drop-in for sessionmaker(bind=engine): SessionLocal() works as before,
+    but the engine is only created by the first call
+    """
 
+    def __init__(self) -> None:
+        self._factory: Optional[sessionmaker] = None
+
+    def __call__(self, **kwargs: Any) -> Session:
+        if self._factory is None:
+            self._factory = sessionmaker(bind=get_engine())
+        return self._factory(**kwargs)
+
+
+# Create session
+SessionLocal = _LazySessionFactory()
 
 
+def check_connection() -> bool:
+    """SELECT 1 on a pooled connection, used by the readiness probe"""
+    with get_engine().connect() as connection:
+        return connection.execute(text("SELECT 1")).scalar() == 1
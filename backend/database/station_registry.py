@@ -0,0 +1,232 @@
+"""
+Station registry
+================
+In-process registry of stations, loaded once from the database.
+
+Station metadata (coordinates, D96 easting/northing, elevation) almost
+never changes, so every station is fingerprinted:
+- the parser reuses the cached ParsedStationModel while the raw <postaja>
+  attributes are unchanged, validation runs only for new or changed stations
+- sync() upserts only stations whose fingerprint differs from the database
+- resolve() maps sifra to the database primary key with a dict lookup
+"""
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.database.db_models import DbModelStation
+from backend.parsers.field_schema import STATION_ATTRIBUTE_FIELDS, STATION_ID_ATTRIBUTE
+from backend.parsers.models.station_models import ParsedStationModel
+
+
+# Raw <postaja> texts the parsed station is built from: (station name, attribute texts...)
+RawStationKey = Tuple[Optional[str], ...]
+
+
+def station_fingerprint(
+        station_name: Optional[str],
+        latitude: Optional[float],
+        longitude: Optional[float],
+        d96_easting: Optional[float],
+        d96_northing: Optional[float],
+        elevation_meters: Optional[float]
+) -> str:
+    """Digest of all station attributes, equal for a parsed station and its database row"""
+    values = (station_name, latitude, longitude, d96_easting, d96_northing,
+              None if elevation_meters is None else int(elevation_meters))
+    return hashlib.sha1(repr(values).encode("utf-8")).hexdigest()
+
+
+def parsed_station_fingerprint(station: ParsedStationModel) -> str:
+    return station_fingerprint(
+        station.station_name, station.latitude, station.longitude,
+        station.d96_easting, station.d96_northing, station.elevation_meters
+    )
+
+
+@dataclass
+class RegisteredStation:
+    """One known station"""
+    pk: int                                         # stations.id
+    fingerprint: str                                # fingerprint of the stored row
+    parsed: Optional[ParsedStationModel] = None     # last parsed model, reused while raw_key is unchanged
+    raw_key: Optional[RawStationKey] = None
+
+
+#=================================================================================
+# REGISTRY
+# ================================================================================
+
+class StationRegistry:
+    """Station id (sifra) -> primary key and fingerprint, shared by all ingest cycles"""
+
+    def __init__(self) -> None:
+        self._stations: Dict[str, RegisteredStation] = {}
+        # parsed but not synced yet: sifra -> (raw key, model)
+        self._pending: Dict[str, Tuple[RawStationKey, ParsedStationModel]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, db: Session) -> None:
+        """(Re)load all stations from the database"""
+        rows = db.execute(select(
+            DbModelStation.id, DbModelStation.station_id, DbModelStation.station_name,
+            DbModelStation.latitude, DbModelStation.longitude,
+            DbModelStation.d96_easting, DbModelStation.d96_northing, DbModelStation.elevation_meters
+        )).all()
+
+        with self._lock:
+            stations: Dict[str, RegisteredStation] = {}
+            for row in rows:
+                entry = RegisteredStation(
+                    pk=row.id,
+                    fingerprint=station_fingerprint(
+                        row.station_name, row.latitude, row.longitude,
+                        row.d96_easting, row.d96_northing, row.elevation_meters
+                    )
+                )
+                # parsed models of unchanged rows stay reusable by the parser
+                known = self._stations.get(row.station_id)
+                if known is not None and known.fingerprint == entry.fingerprint:
+                    entry.parsed, entry.raw_key = known.parsed, known.raw_key
+                stations[row.station_id] = entry
+            self._stations = stations
+            self._loaded = True
+        logging.info(f"Station registry loaded {len(rows)} stations")
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self._loaded:
+            self.load(db)
+
+    def invalidate(self) -> None:
+        """Forget everything, the next ensure_loaded() reads the database again"""
+        with self._lock:
+            self._stations = {}
+            self._pending = {}
+            self._loaded = False
+
+    #------------------------------------------------------------
+    # Parser side
+    #------------------------------------------------------------
+
+    def parsed_station(self, attributes: Mapping[str, str], station_name: Optional[str]) -> ParsedStationModel:
+        """
+        ParsedStationModel for one <postaja>, the cached one while its raw texts are unchanged
+
+        Raises:
+            ValueError: new or changed station fails validation
+        """
+        station_id = attributes.get(STATION_ID_ATTRIBUTE)
+        raw_key: RawStationKey = (station_name, *(attributes.get(attribute) for attribute in STATION_ATTRIBUTE_FIELDS))
+
+        with self._lock:
+            entry = self._stations.get(station_id) if station_id else None
+            if entry is not None and entry.parsed is not None and entry.raw_key == raw_key:
+                return entry.parsed
+
+        parsed = ParsedStationModel.from_postaja(attributes, station_name)
+        with self._lock:
+            self._pending[parsed.station_id] = (raw_key, parsed)  # type: ignore[index]
+        return parsed
+
+    #------------------------------------------------------------
+    # Database side
+    #------------------------------------------------------------
+
+    def sync(self, db: Session, stations: Iterable[ParsedStationModel]) -> int:
+        """
+        Upsert new and changed stations, unchanged ones cost no query
+
+        Returns:
+            int: number of upserted stations
+        """
+        self.ensure_loaded(db)
+
+        changed: List[ParsedStationModel] = []
+        with self._lock:
+            for station in stations:
+                if station.station_id is None:
+                    continue
+                entry = self._stations.get(station.station_id)
+                if entry is not None and entry.parsed is station:
+                    continue  # reused model, nothing changed since the last cycle
+
+                fingerprint = parsed_station_fingerprint(station)
+                if entry is not None and entry.fingerprint == fingerprint:
+                    self._remember_parsed(entry, station)
+                    continue
+                changed.append(station)
+
+        if not changed:
+            return 0
+
+        station_pks = self._upsert_stations(db, changed)
+
+        with self._lock:
+            for station in changed:
+                entry = RegisteredStation(pk=station_pks[station.station_id], fingerprint=parsed_station_fingerprint(station))  # type: ignore[index]
+                self._remember_parsed(entry, station)
+                self._stations[station.station_id] = entry  # type: ignore[index]
+
+        logging.info(f"Station registry upserted {len(changed)} new or changed stations")
+        return len(changed)
+
+    def resolve(self, station_id: str) -> Optional[int]:
+        """Primary key of the station, None when it is not registered"""
+        entry = self._stations.get(station_id)
+        return entry.pk if entry is not None else None
+
+    def _remember_parsed(self, entry: RegisteredStation, station: ParsedStationModel) -> None:
+        pending = self._pending.pop(station.station_id, None)  # type: ignore[arg-type]
+        if pending is not None and pending[1] is station:
+            entry.raw_key, entry.parsed = pending
+
+    def _upsert_stations(self, db: Session, stations: List[ParsedStationModel]) -> Dict[str, int]:
+        """One INSERT ... ON CONFLICT DO UPDATE for all stations, returns sifra -> primary key"""
+        rows = {
+            station.station_id: {
+                "station_id": station.station_id,
+                "station_name": station.station_name,
+                "latitude": station.latitude,
+                "longitude": station.longitude,
+                "d96_easting": station.d96_easting,
+                "d96_northing": station.d96_northing,
+                "elevation_meters": station.elevation_meters,
+            }
+            for station in stations
+        }
+        statement = insert(DbModelStation).values(list(rows.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=['station_id'],
+            set_={
+                column: statement.excluded[column]
+                for column in ("station_name", "latitude", "longitude", "d96_easting", "d96_northing", "elevation_meters")
+            }
+        ).returning(DbModelStation.id, DbModelStation.station_id)
+
+        return {row.station_id: row.id for row in db.execute(statement)}
+
+
+#=================================================================================
+# SHARED INSTANCE
+# ================================================================================
+
+_station_registry = StationRegistry()
+
+
+def get_station_registry() -> StationRegistry:
+    """Process-wide registry"""
+    return _station_registry
@@ -0,0 +1,176 @@
+"""
+Gap filling
+===========
+Hours lost to a failed fetch or insert are found with a set-based scan
+(backend.database.gaps) and filled from:
+
+1. archived payloads (backend.network.payload_archive), re-parsed and
+   stored like a backfill
+2. a refetch of a multi-day ARSO feed configured with ARSO_REFILL_FEED_URL,
+   for gaps that are still within its window
+
+Stored rows are skipped by the insert, so filling is safe to repeat. The
+missing hours per station are exported after every scan.
+
+Run with:
+    python -m backend.gap_fill --days 7
+"""
+import argparse
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from backend.backfill import BatchLoader, load_archive_files, publish_stored_rows, store_batch
+from backend.database.gaps import MeasurementGap, find_gaps, missing_hours_by_station
+from backend.network.config import ARSO_TIMEZONE
+from backend.network.feeds import FeedConfig
+from backend.network.payload_archive import find_snapshots
+from backend.utils.metrics import GAP_FILL_ROWS, MEASUREMENT_MISSING_HOURS
+
+
+GAP_SCAN_DAYS = 7                           # window scanned by the scheduled job
+# archived payloads are parsed in-process, a process pool would fork the multithreaded worker
+GAP_FILL_WORKERS = 0
+SNAPSHOT_LOOKAHEAD = timedelta(days=1)      # snapshots prepared this long after a gap may still hold it
+REFETCH_WINDOW = timedelta(days=7)          # hours the refill feed covers
+
+# (start, end) -> missing hour ranges
+GapScanner = Callable[[datetime, datetime], List[MeasurementGap]]
+
+
+@dataclass
+class GapFillStats:
+    gaps_found: int = 0
+    hours_missing: int = 0
+    snapshots_loaded: int = 0
+    rows_from_archive: int = 0
+    rows_from_refetch: int = 0
+    hours_missing_after: int = 0
+
+    @property
+    def rows_stored(self) -> int:
+        return self.rows_from_archive + self.rows_from_refetch
+
+
+_reported_stations: Set[str] = set()
+
+
+def report_missing_hours(gaps: List[MeasurementGap]) -> Dict[str, int]:
+    """Export missing hours per station, stations without gaps anymore drop to 0"""
+    totals = missing_hours_by_station(gaps)
+    for station_id in _reported_stations - totals.keys():
+        MEASUREMENT_MISSING_HOURS.labels(station=station_id).set(0)
+    for station_id, hours in totals.items():
+        MEASUREMENT_MISSING_HOURS.labels(station=station_id).set(hours)
+    _reported_stations.update(totals)
+    return totals
+
+
+def gap_scan_window(days: int = GAP_SCAN_DAYS) -> Tuple[datetime, datetime]:
+    """The last days full hours in ARSO local time, the current hour is not published yet"""
+    end = datetime.now(ZoneInfo(ARSO_TIMEZONE)).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    return end - timedelta(days=days), end
+
+
+def get_refill_feed() -> Optional[FeedConfig]:
+    url = os.environ.get("ARSO_REFILL_FEED_URL", "").strip()
+    return FeedConfig(name="refill", url=url) if url else None
+
+
+def _scan_gaps(start: datetime, end: datetime) -> List[MeasurementGap]:
+    from backend.database.session import SessionLocal
+    with SessionLocal() as db:
+        return find_gaps(db, start, end)
+
+
+def refetch_feed(feed: FeedConfig, loader: BatchLoader) -> int:
+    """Download, parse and store one feed, returns the stored rows"""
+    from backend.database.station_registry import get_station_registry
+    from backend.network.arso_client import fetch_arso_xml
+    from backend.parsers.feed_router import combine_feeds, parse_feed
+
+    success, xml_content, error = fetch_arso_xml(feed.url)
+    if not success or not xml_content:
+        logging.error(f"Refetching {feed.url} failed: {error or 'no content'}")
+        return 0
+    result = parse_feed(feed, xml_content, station_cache=get_station_registry())
+    if not result.success:
+        logging.error(f"Parsing refetched {feed.url} failed: {result.error_message}")
+        return 0
+
+    stations, batch = combine_feeds([result.data])
+    batch = batch.deduplicate()
+    return len(batch) if len(batch) and loader(stations, batch) else 0
+
+
+def fill_gaps(
+        start: datetime,
+        end: datetime,
+        loader: Optional[BatchLoader] = None,
+        scanner: Optional[GapScanner] = None,
+        archive_dir: Optional[Path] = None,
+        refill_feed: Optional[FeedConfig] = None
+) -> GapFillStats:
+    """
+    Find and fill missing hours in [start, end)
+
+    Args:
+        loader: stores one batch, defaults to insert_measurement_batch()
+        scanner: finds gaps, defaults to find_gaps() in a new session
+        archive_dir: defaults to ARSO_ARCHIVE_DIR
+        refill_feed: defaults to the ARSO_REFILL_FEED_URL feed
+    """
+    loader = loader or store_batch
+    scanner = scanner or _scan_gaps
+    refill_feed = refill_feed or get_refill_feed()
+    stats = GapFillStats()
+
+    gaps = scanner(start, end)
+    report_missing_hours(gaps)
+    stats.gaps_found = len(gaps)
+    stats.hours_missing = sum(gap.hours for gap in gaps)
+    if not gaps:
+        return stats
+    logging.info(f"Found {stats.gaps_found} gaps, {stats.hours_missing} missing pollutant hours")
+
+    first_missing = min(gap.start for gap in gaps)
+    last_missing = max(gap.end for gap in gaps)
+
+    snapshots = find_snapshots(first_missing, last_missing, SNAPSHOT_LOOKAHEAD, archive_dir)
+    if snapshots:
+        archive_stats = load_archive_files(snapshots, workers=GAP_FILL_WORKERS, loader=loader)
+        stats.snapshots_loaded = archive_stats.files_loaded
+        stats.rows_from_archive = archive_stats.rows_loaded
+        GAP_FILL_ROWS.labels(source="archive").inc(archive_stats.rows_loaded)
+        gaps = scanner(start, end)
+
+    if gaps and refill_feed is not None and last_missing >= end - REFETCH_WINDOW:
+        stats.rows_from_refetch = refetch_feed(refill_feed, loader)
+        GAP_FILL_ROWS.labels(source="refetch").inc(stats.rows_from_refetch)
+        gaps = scanner(start, end)
+
+    report_missing_hours(gaps)
+    stats.hours_missing_after = sum(gap.hours for gap in gaps)
+    logging.info(f"Gap fill done: {stats}")
+    return stats
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    parser = argparse.ArgumentParser(description="Find and fill missing measurement hours")
+    parser.add_argument("--days", type=int, default=GAP_SCAN_DAYS, help="scan the last days")
+    parser.add_argument("--archive", type=Path, default=None, help="payload archive, default: ARSO_ARCHIVE_DIR")
+    args = parser.parse_args()
+
+    start, end = gap_scan_window(args.days)
+    if fill_gaps(start, end, archive_dir=args.archive).rows_stored:
+        publish_stored_rows()
+
+
+if __name__ == "__main__":
+    main()
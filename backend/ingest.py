@@ -0,0 +1,205 @@
+"""
+Ingest cycle
+============
+Fetch, parse, merge, store and cache the latest ARSO data. Runs in the
+process that owns scheduling (backend.worker), web processes only read
+what it published, see backend.utils.generation.
+"""
+from datetime import datetime
+import logging
+from typing import Any, List, Optional, Tuple
+from backend.cache import cache, get_redis_client
+from backend.network.feed_fetcher import fetch_all_feeds
+from backend.network.fetch_schedule import get_fetch_planner
+from backend.network.fetch_state import get_fetch_state
+from backend.network.payload_archive import archive_payload
+from backend.utils.generation import (
+    Generation, get_latest_generation, next_generation, notify_generation, publish_generation, published_preparation,
+)
+from backend.utils.latest_readings import LATEST_MERGED_DATA_KEY, store_rendered_readings
+from backend.utils.metrics import ARSO_FETCH_SKIPPED, ARSO_FETCH_BYTES_SAVED
+from backend.parsers.arso_parser import read_feed_metadata
+from backend.parsers.feed_router import parse_feed, combine_feeds
+from backend.parsers.models.feed_model import ParsedFeedModel
+from backend.parsers.stations_and_measurments_merger import merge_stations_and_measurements
+from backend.parsers.insert_data import insert_measurement_batch
+from backend.database.station_registry import get_station_registry
+from backend.database.fencing import StaleFencingTokenError
+
+
+def _is_stored(fetch_state: Any, published: Optional[Generation], url: str,
+               preparation_timestamp: Optional[datetime]) -> bool:
+    """The preparation was stored by this instance or is covered by the published generation"""
+    if preparation_timestamp is None:
+        return False
+    if fetch_state.is_same_preparation(preparation_timestamp):
+        return True
+    published_timestamp = published_preparation(published, url)
+    return published_timestamp is not None and published_timestamp >= preparation_timestamp
+
+
+def _preparation_changed(published: Generation, preparation_timestamp: Optional[datetime]) -> bool:
+    if published.preparation_timestamp is None:
+        return preparation_timestamp is not None
+    return preparation_timestamp != datetime.fromisoformat(published.preparation_timestamp)
+
+
+def adopt_published_generation() -> None:
+    """
+    Another instance holds the ingest lease and stored the data. Its generation
+    marker seeds the fetch state and planner of this one, so the next poll does
+    not re-ingest the same period once the lease is free again
+    """
+    published = get_latest_generation(cache)
+    if published is None:
+        return
+    for url, timestamp in (published.feed_preparations or {}).items():
+        preparation_timestamp = datetime.fromisoformat(timestamp)
+        fetch_state = get_fetch_state(url)
+        if fetch_state.preparation_timestamp is None or preparation_timestamp > fetch_state.preparation_timestamp:
+            fetch_state.preparation_timestamp = preparation_timestamp
+    if published.preparation_timestamp:
+        get_fetch_planner().mark_ingested(datetime.fromisoformat(published.preparation_timestamp))
+
+
+def update_data(fencing_token: Optional[int] = None):
+    """
+    Fetch, parse, merge, store and cache the latest ARSO data
+
+    All configured feeds are downloaded concurrently, each payload is parsed by
+    the parser of its feed and everything is stored in one transaction.
+
+    Args:
+        fencing_token: token of the distributed ingest lock, passed to the DB transaction
+    """
+    # (fetch state, feed URL, <datum_priprave>) of every feed that is part of this ingest
+    ingested_feeds: List[Tuple[Any, str, Optional[datetime]]] = []
+    parsed_feeds: List[ParsedFeedModel] = []
+    # preparations stored by other instances are skipped, see adopt_published_generation()
+    published = get_latest_generation(cache)
+
+    # Fetch all feeds concurrently, conditional GETs against the last ingested responses
+    for payload in fetch_all_feeds():
+        feed_name = payload.feed.name
+        fetch_state = get_fetch_state(payload.feed.url)
+
+        if payload.success and payload.xml_content is None:
+            # ARSO has not published anything new, nothing to parse, store or cache
+            logging.info(f"ARSO feed {feed_name} unchanged, skipping it")
+            continue
+        if not payload.success or not payload.xml_content:
+            logging.error(f"Error fetching feed {feed_name}: {payload.error}")
+            continue
+
+        # the document head is enough to tell whether this preparation is stored already
+        metadata = read_feed_metadata(payload.xml_content)
+        preparation_timestamp = metadata.preparation_timestamp if metadata else None
+        # suggested schedule and publication lag drive the next fetch time
+        get_fetch_planner().observe_metadata(metadata)
+
+        # Different body but the same <datum_priprave>, data was already ingested here or by another instance
+        if _is_stored(fetch_state, published, payload.feed.url, preparation_timestamp):
+            logging.info(f"ARSO feed {feed_name} prepared at {preparation_timestamp} already ingested, skipping it")
+            ARSO_FETCH_SKIPPED.labels(reason="same_preparation_timestamp").inc()
+            ARSO_FETCH_BYTES_SAVED.labels(reason="same_preparation_timestamp").inc(len(payload.xml_content))
+            fetch_state.mark_ingested(preparation_timestamp)
+            get_fetch_planner().mark_ingested(preparation_timestamp)
+            continue
+
+        # parse stations, measurements and metadata in a single pass,
+        # measurements go straight into NumPy columns, unchanged stations are reused from the registry
+        feed_result = parse_feed(payload.feed, payload.xml_content, station_cache=get_station_registry())
+        if not feed_result.success:
+            logging.error(f"Error parsing feed {feed_name}: {feed_result.error_message}")
+            continue
+
+        feed = feed_result.data
+
+        # kept before storing, a failed insert can be refilled from it (backend.gap_fill)
+        archive_payload(feed_name, payload.xml_content, preparation_timestamp)
+
+        parsed_feeds.append(feed)
+        ingested_feeds.append((fetch_state, payload.feed.url, preparation_timestamp))
+
+    if not parsed_feeds:
+        logging.info("No new ARSO data, skipping update")
+        return False
+
+    # all feeds become one station list and one columnar batch
+    stations, measurement_batch = combine_feeds(parsed_feeds)
+
+    # merge stations and measurements
+    merged_data = merge_stations_and_measurements(
+        stations,
+        measurement_batch)
+
+    if not merged_data:
+        logging.info("No merged data available")
+        return False
+    else:
+        # summary log
+        logging.info(f"Merged data for {len(merged_data)} stations")
+
+        for station_id, station_info in merged_data.items():
+            logging.debug(f"Station ID: {station_id}")
+            logging.debug(f"  Name: {station_info['info'].station_name}")
+            logging.debug(f"  Measurements ({len(station_info['measurements_list'])}):")
+
+            for m in station_info['measurements_list'][:23]:
+                logging.debug(f"    {m}")
+            if len(station_info['measurements_list']) > 5:
+                logging.debug(f"    ...and {len(station_info['measurements_list']) - 5} more\n")
+            else:
+                logging.debug("")
+
+        # Insert into storage, one transaction for all feeds
+        inserted = False
+        write_result = None
+        try:
+            write_result = insert_measurement_batch(stations, measurement_batch, fencing_token=fencing_token)
+            inserted = write_result is not None
+            if write_result is not None:
+                logging.info(f"Stored {write_result.inserted} new measurements, {write_result.skipped} were already stored")
+        except StaleFencingTokenError as e:
+            # the lease expired and a newer holder already ingested,
+            # its cached data and generation marker must not be replaced
+            logging.warning(f"Ingest rejected, nothing is cached or published: {e}")
+            return False
+        except Exception as e:
+            logging.exception(f"Failed to insert data: {e}")
+            # continue to attempt caching the merged data even if DB insert failed
+
+        # Only stored data counts as ingested, otherwise the next poll tries again
+        if inserted:
+            for fetch_state, _url, preparation_timestamp in ingested_feeds:
+                fetch_state.mark_ingested(preparation_timestamp)
+                get_fetch_planner().mark_ingested(preparation_timestamp)
+
+        latest_preparation = max((timestamp for _, _, timestamp in ingested_feeds if timestamp is not None), default=None)
+        # rows that were all stored already with the published preparation change no response,
+        # a new generation would only invalidate every cached body and ETag
+        if (write_result is not None and write_result.inserted == 0
+                and published is not None and not _preparation_changed(published, latest_preparation)):
+            logging.info(f"No new rows and the same preparation, generation {published.number} is kept")
+            return True
+
+        # put the merged data into the cache if available
+        try:
+            redis_client = get_redis_client()
+            cache.set(LATEST_MERGED_DATA_KEY, merged_data, timeout=0)# type: ignore
+            # only stored feeds are recorded, other instances must not skip what is missing in the database
+            feed_preparations = {url: timestamp for _, url, timestamp in ingested_feeds if inserted and timestamp is not None}
+            generation = next_generation(cache, latest_preparation, get_fetch_planner().expected_next_update(),
+                                         feed_preparations=feed_preparations, redis_client=redis_client)
+            # response bodies are rendered once per generation, before it is visible
+            store_rendered_readings(cache, merged_data, generation)
+            # the marker is written last, readers that see it also see the data
+            publish_generation(cache, generation=generation)
+            get_fetch_planner().record_published(latest_preparation)
+            # other instances drop their in-process copies
+            notify_generation(redis_client, generation)
+        except Exception:
+            logging.exception("Failed to update cache for latest_merged_data")
+
+        logging.info(f"Inserted total of {len(measurement_batch)} measurement entries into the database.")
+        return True
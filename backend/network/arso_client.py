@@ -1,14 +1,15 @@
 from backend.utils.decorators import handle_exceptions, add_timing, handle_http_request_exception
 from typing import Tuple, Optional
-import requests
 import logging
+from backend.network.fetch_state import get_fetch_state, hash_body
+from backend.network.http_client import get_http_client
+from backend.utils.metrics import ARSO_FETCH_SKIPPED, ARSO_FETCH_BYTES_SAVED
 
 
 
 # import existing constants
 from backend.network.config import  (
     ARSO_STATIONS_URL,        # "https://www.arso.gov.si/xml/zrak/ones_zrak_urni_podatki_zadnji.xml"
-    REQUEST_TIMEOUT,          # 10 seconds
     
 )
 
@@ -19,22 +20,53 @@ from backend.network.config import  (
 @handle_exceptions
 @handle_http_request_exception
 @add_timing
-def fetch_arso_xml() -> Tuple[bool, Optional[str], Optional[str]]:
+def fetch_arso_xml(url: str = ARSO_STATIONS_URL, timeout: Optional[float] = None) -> Tuple[bool, Optional[str], Optional[str]]:
     
     """
+       Conditional GET: sends If-None-Match/If-Modified-Since from the last
+       ingested response and compares the body hash with it.
+       timeout: seconds for the whole download, retries included
+
        RETURNS:
             Tuple[success[bool],xml_data[str], error[str]]
             -True, <xml>..</xml> on success
+            -True, None, None when ARSO has nothing new (304 or identical body)
             -False, None, error message on failure    
     """
 
-    logging.info(f"Fetching ARSO xml data from {ARSO_STATIONS_URL}")
+    fetch_state = get_fetch_state(url)
+
+    logging.info(f"Fetching ARSO xml data from {url}")
+
+    response = get_http_client().get(url, deadline=timeout, headers=fetch_state.conditional_headers())
+
+    # Nothing published since the last ingested response, body was not sent
+    if response.status_code == 304:
+        logging.info("ARSO xml data not modified since last fetch")
+        ARSO_FETCH_SKIPPED.labels(reason="not_modified").inc()
+        ARSO_FETCH_BYTES_SAVED.labels(reason="not_modified").inc(fetch_state.body_size)
+        return True, None, None
 
-    response = requests.get(ARSO_STATIONS_URL, timeout=REQUEST_TIMEOUT)
     response.encoding = 'utf-8'
     
     response.raise_for_status() #raise request exception for HTTP errors
 
+    # ARSO may re-serve identical data with new headers
+    body_hash = hash_body(response.text)
+    if fetch_state.is_same_body(body_hash):
+        logging.info("ARSO xml data is identical to the last ingested data")
+        ARSO_FETCH_SKIPPED.labels(reason="same_body").inc()
+        ARSO_FETCH_BYTES_SAVED.labels(reason="same_body").inc(len(response.text))
+        return True, None, None
+
+    # Remember the response, committed by update_data() once the data is stored
+    fetch_state.pending = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_hash": body_hash,
+        "body_size": len(response.text),
+    }
+
     logging.info(f"Successfully fetched ARSO xml data Length: {len(response.text)} characters")
     
     return True, response.text, None
@@ -1,4 +1,30 @@
 
 # Configuration constants
 ARSO_STATIONS_URL = "https://www.arso.gov.si/xml/zrak/ones_zrak_urni_podatki_zadnji.xml"
-REQUEST_TIMEOUT = 10 # seconds
\ No newline at end of file
+REQUEST_TIMEOUT = 10 # seconds
+
+# HTTP client (keep-alive session with retries)
+CONNECT_TIMEOUT = 5 # seconds to establish TCP+TLS connection
+READ_TIMEOUT = REQUEST_TIMEOUT # seconds to wait for data between bytes
+POOL_MAXSIZE = 4 # keep-alive connections kept per host
+MAX_RETRIES = 3 # extra attempts after the first one fails
+BACKOFF_BASE = 1.0 # seconds, doubled with every retry
+BACKOFF_MAX = 30.0 # seconds, upper bound of a single backoff sleep
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504) # transient HTTP errors worth retrying
+
+# Circuit breaker (per host)
+CIRCUIT_FAILURE_THRESHOLD = 5 # consecutive failed attempts that open the circuit
+CIRCUIT_RESET_TIMEOUT = 300 # seconds before a trial request is allowed again
+
+# Multi-feed fetching
+FEED_TIMEOUT = 60 # seconds for one whole feed download, retries included
+FEED_HOST_CONCURRENCY = POOL_MAXSIZE # parallel downloads per host, one pooled connection each
+
+# Adaptive fetch scheduling (see backend.network.fetch_schedule)
+ARSO_TIMEZONE = "Europe/Ljubljana" # <datum_priprave> and the suggested fetch time are local time
+DEFAULT_FETCH_OFFSET = 5 # minutes after the period boundary when <predlagan_zajem> is missing
+DEFAULT_FETCH_PERIOD = 60 # minutes between publications when <predlagan_zajem_perioda> is missing
+FETCH_MARGIN = 1 # minutes added to the expected publication time
+FETCH_RETRY_INITIAL = 60 # seconds before the first re-poll when the data is not fresh yet
+FETCH_RETRY_MAX = 15 * 60 # seconds, upper bound of the doubled re-poll delay
+PUBLICATION_LAG_SAMPLES = 24 # recent publications the typical lag is learned from
@@ -0,0 +1,73 @@
+"""
+Feed registry
+=============
+All ARSO air quality feeds that are fetched every cycle.
+
+Every feed names the parser its payload is routed to (see
+backend.parsers.feed_router). The default registry holds the latest hourly
+feed, more hourly feeds (longer windows) are configured without code
+changes through the ARSO_FEEDS environment variable:
+
+    ARSO_FEEDS="hourly_latest,hourly_week=https://.../ones_zrak_urni_podatki_7dni.xml"
+
+A bare name enables a registered feed, name=url[|parser] adds a new one.
+Only hourly measurements are stored, feeds of daily or longer averages are
+rejected when they are parsed.
+"""
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from backend.network.config import ARSO_STATIONS_URL, FEED_TIMEOUT
+
+
+DEFAULT_FEED_PARSER = "arso_xml"
+
+
+@dataclass(frozen=True)
+class FeedConfig:
+    """One configured feed"""
+    name: str
+    url: str
+    parser: str = DEFAULT_FEED_PARSER   # key in backend.parsers.feed_router.FEED_PARSERS
+    timeout: float = FEED_TIMEOUT       # seconds for the whole download
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.url).netloc
+
+
+FEEDS: Dict[str, FeedConfig] = {
+    "hourly_latest": FeedConfig(name="hourly_latest", url=ARSO_STATIONS_URL),
+}
+
+
+def _parse_feed_spec(spec: str) -> Optional[FeedConfig]:
+    """"name" or "name=url" or "name=url|parser" -> FeedConfig, None when unknown"""
+    name, _, target = spec.partition("=")
+    name = name.strip()
+    if not target:
+        feed = FEEDS.get(name)
+        if feed is None:
+            logging.warning(f"Unknown feed {name} in ARSO_FEEDS, skipped")
+        return feed
+
+    url, _, parser = target.partition("|")
+    return FeedConfig(name=name, url=url.strip(), parser=parser.strip() or DEFAULT_FEED_PARSER)
+
+
+def get_configured_feeds() -> List[FeedConfig]:
+    """Feeds fetched every cycle, the whole registry when ARSO_FEEDS is not set"""
+    specs = os.environ.get("ARSO_FEEDS", "").strip()
+    if not specs:
+        return list(FEEDS.values())
+
+    feeds: Dict[str, FeedConfig] = {}
+    for spec in specs.split(","):
+        if spec.strip():
+            feed = _parse_feed_spec(spec)
+            if feed is not None:
+                feeds[feed.name] = feed
+    return list(feeds.values())
@@ -0,0 +1,194 @@
+"""
+Adaptive fetch schedule
+=======================
+ARSO tells in every feed when to fetch it: <predlagan_zajem> ("5 minut čez
+polno uro", minutes after the period boundary) and <predlagan_zajem_perioda>
+("60 min"), and <datum_priprave> says when the data was prepared. A fixed
+hourly interval started with the process ignores all of it, so data was up
+to an hour stale or fetched just before ARSO published.
+
+The planner aligns fetches to the expected publication time of every period:
+
+    period start + max(suggested offset, learned publication lag) + margin
+
+The publication lag is the median delay of <datum_priprave> after its period
+start over the recent feeds. When a fetch finds nothing new although the
+period is due, it re-polls after 1, 2, 4 ... minutes (capped) until the data
+shows up or the next period is due.
+
+All times are ARSO local time (Europe/Ljubljana), like the feed itself.
+"""
+import re
+import statistics
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Optional
+from zoneinfo import ZoneInfo
+
+from backend.network.config import (
+    ARSO_TIMEZONE, DEFAULT_FETCH_OFFSET, DEFAULT_FETCH_PERIOD, FETCH_MARGIN,
+    FETCH_RETRY_INITIAL, FETCH_RETRY_MAX, PUBLICATION_LAG_SAMPLES
+)
+from backend.parsers.models.station_models import ARSOMetadata
+from backend.utils.metrics import ARSO_FRESHNESS_LAG_SECONDS, ARSO_PUBLICATION_LAG_SECONDS
+
+
+_DURATION_PATTERN = re.compile(r"(\d+)\s*(min|ur|h)?", re.IGNORECASE)
+
+
+def parse_minutes(text: Optional[str]) -> Optional[int]:
+    """
+    Minutes from ARSO duration texts: "60 min", "5 minut čez polno uro", "1 ura"
+
+    Returns:
+        None when the text has no number
+    """
+    if not text:
+        return None
+    match = _DURATION_PATTERN.search(text)
+    if match is None:
+        return None
+    value = int(match.group(1))
+    unit = (match.group(2) or "min").lower()
+    return value * 60 if unit in ("ur", "h") else value
+
+
+class FetchPlanner:
+    """Decides when the next ingest runs, fed with the metadata of every fetched feed"""
+
+    def __init__(self, timezone: str = ARSO_TIMEZONE) -> None:
+        self.timezone = ZoneInfo(timezone)
+        self.offset = timedelta(minutes=DEFAULT_FETCH_OFFSET)
+        self.period = timedelta(minutes=DEFAULT_FETCH_PERIOD)
+        # newest <datum_priprave> that was stored, and the newest one seen in any fetched feed
+        self.latest_preparation: Optional[datetime] = None
+        self._latest_observed: Optional[datetime] = None
+        self._lags: Deque[timedelta] = deque(maxlen=PUBLICATION_LAG_SAMPLES)
+        self._retry_delay = float(FETCH_RETRY_INITIAL)
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        """Current ARSO local time, naive like <datum_priprave>"""
+        return datetime.now(self.timezone).replace(tzinfo=None)
+
+    def period_start(self, moment: datetime) -> datetime:
+        """Start of the publication period moment falls into, periods are aligned to midnight"""
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + ((moment - midnight) // self.period) * self.period
+
+    @property
+    def publication_lag(self) -> timedelta:
+        """Median delay of recent publications after their period start, the suggested offset until one was seen"""
+        with self._lock:
+            return statistics.median(self._lags) if self._lags else self.offset
+
+    def expected_publication(self, period_start: datetime) -> datetime:
+        return period_start + max(self.offset, self.publication_lag) + timedelta(minutes=FETCH_MARGIN)
+
+    def observe_metadata(self, metadata: Optional[ARSOMetadata]) -> None:
+        """Take the suggested schedule and the preparation time of a fetched feed"""
+        if metadata is None:
+            return
+        offset = parse_minutes(metadata.suggested_fetch_time)
+        period = parse_minutes(metadata.suggested_update_fetch_interval)
+        with self._lock:
+            if offset is not None:
+                self.offset = timedelta(minutes=offset)
+            # a period must split the day, anything else keeps the previous one
+            if period and 0 < period <= 24 * 60:
+                self.period = timedelta(minutes=period)
+
+        preparation = metadata.preparation_timestamp
+        if preparation is None:
+            return
+        with self._lock:
+            # every publication is one lag sample, however often it is fetched
+            if self._latest_observed is not None and preparation <= self._latest_observed:
+                return
+            self._latest_observed = preparation
+        lag = preparation - self.period_start(preparation)
+        with self._lock:
+            self._lags.append(lag)
+        ARSO_PUBLICATION_LAG_SECONDS.set(self.publication_lag.total_seconds())
+
+    def mark_ingested(self, preparation_timestamp: Optional[datetime]) -> None:
+        """
+        Data prepared at preparation_timestamp is stored, its period needs no more fetches.
+        Fetched data that failed to store does not count, the period is re-polled
+        """
+        if preparation_timestamp is None:
+            return
+        with self._lock:
+            if self.latest_preparation is None or preparation_timestamp > self.latest_preparation:
+                self.latest_preparation = preparation_timestamp
+
+    def record_published(self, preparation_timestamp: Optional[datetime]) -> None:
+        """Export the end-to-end freshness lag of data that was just published"""
+        if preparation_timestamp is None:
+            return
+        lag = (self.now() - preparation_timestamp).total_seconds()
+        if lag >= 0:
+            ARSO_FRESHNESS_LAG_SECONDS.observe(lag)
+
+    def expected_next_update(self, now: Optional[datetime] = None) -> datetime:
+        """Timezone aware time the next new data is expected, the current period if it is still pending"""
+        now = now or self.now()
+        current_start = self.period_start(now)
+        current_publication = self.expected_publication(current_start)
+        with self._lock:
+            has_current = self.latest_preparation is not None and self.latest_preparation >= current_start
+        if not has_current and now < current_publication:
+            return current_publication.replace(tzinfo=self.timezone)
+        return self.expected_publication(current_start + self.period).replace(tzinfo=self.timezone)
+
+    def next_run(self, fresh: bool, now: Optional[datetime] = None) -> datetime:
+        """
+        When to fetch next
+
+        Args:
+            fresh: the last run stored new data, or another instance ran it,
+                   used only until a <datum_priprave> was seen
+            now: ARSO local time, defaults to the current time
+
+        Returns:
+            timezone aware run time for the scheduler
+        """
+        now = now or self.now()
+        current_start = self.period_start(now)
+        current_publication = self.expected_publication(current_start)
+        next_publication = self.expected_publication(current_start + self.period)
+
+        with self._lock:
+            # without any <datum_priprave> seen (or on another instance) only the run outcome is known
+            if self.latest_preparation is not None:
+                has_current = self.latest_preparation >= current_start
+            else:
+                has_current = fresh
+            if has_current:
+                self._retry_delay = float(FETCH_RETRY_INITIAL)
+                run_at = next_publication
+            elif now < current_publication:
+                # the previous period was fetched, this one is not published yet
+                self._retry_delay = float(FETCH_RETRY_INITIAL)
+                run_at = current_publication
+            else:
+                # due but not fresh yet: poll again soon, backing off
+                run_at = min(now + timedelta(seconds=self._retry_delay), next_publication)
+                self._retry_delay = min(self._retry_delay * 2, float(FETCH_RETRY_MAX))
+
+        return run_at.replace(tzinfo=self.timezone)
+
+
+_planner: Optional[FetchPlanner] = None
+_planner_lock = threading.Lock()
+
+
+def get_fetch_planner() -> FetchPlanner:
+    """Process wide planner, shared by the ingest cycle and the scheduler"""
+    global _planner
+    if _planner is None:
+        with _planner_lock:
+            if _planner is None:
+                _planner = FetchPlanner()
+    return _planner
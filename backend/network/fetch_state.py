@@ -0,0 +1,81 @@
+"""
+Remembers what was last ingested from every ARSO feed URL:
+ETag, Last-Modified, hash of the body and <datum_priprave>.
+
+Values from a new response are first kept as pending and are only
+committed with mark_ingested() once the data was stored, so a failed
+DB insert does not make the next poll skip the same data.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+
+#=================================================================================
+# FETCH STATE OF ONE FEED
+# ================================================================================
+
+@dataclass
+class FeedFetchState:
+    """State of the last successfully ingested response of one feed"""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[str] = None
+    body_size: int = 0
+    preparation_timestamp: Optional[datetime] = None
+    # values of the latest response, not ingested yet
+    pending: Dict[str, object] = field(default_factory=dict)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for a conditional GET based on the last ingested response"""
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def is_same_body(self, body_hash: str) -> bool:
+        return self.body_hash is not None and self.body_hash == body_hash
+
+    def is_same_preparation(self, preparation_timestamp: Optional[datetime]) -> bool:
+        return preparation_timestamp is not None and self.preparation_timestamp == preparation_timestamp
+
+    def mark_ingested(self, preparation_timestamp: Optional[datetime] = None) -> None:
+        """Promote pending response values after the data was stored"""
+        self.etag = self.pending.get("etag", self.etag)  # type: ignore[assignment]
+        self.last_modified = self.pending.get("last_modified", self.last_modified)  # type: ignore[assignment]
+        self.body_hash = self.pending.get("body_hash", self.body_hash)  # type: ignore[assignment]
+        self.body_size = self.pending.get("body_size", self.body_size)  # type: ignore[assignment]
+        if preparation_timestamp is not None:
+            self.preparation_timestamp = preparation_timestamp
+        self.pending = {}
+
+
+def hash_body(body: str) -> str:
+    """Hash of the response body used to detect re-served identical data"""
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+#=================================================================================
+# STATE FOR ALL FEEDS
+# ================================================================================
+
+_fetch_states: Dict[str, FeedFetchState] = {}
+_fetch_states_lock = threading.Lock()
+
+
+def get_fetch_state(url: str) -> FeedFetchState:
+    """Fetch state for the feed URL, created on first use"""
+    with _fetch_states_lock:
+        if url not in _fetch_states:
+            _fetch_states[url] = FeedFetchState()
+        return _fetch_states[url]
+
+
+def reset_fetch_states() -> None:
+    """Forget all feeds, the next poll downloads and ingests everything again"""
+    with _fetch_states_lock:
+        _fetch_states.clear()
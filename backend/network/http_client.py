@@ -0,0 +1,223 @@
+"""
+HTTP client for ARSO feeds
+==========================
+One shared requests.Session with keep-alive connection pooling, so hourly
+polls reuse the TCP+TLS connection instead of paying for a new handshake.
+Transient failures are retried with exponential backoff and jitter, and a
+per-host circuit breaker stops hammering ARSO while it is down.
+
+Errors are raised as requests exceptions, so callers decorated with
+handle_http_request_exception keep their (success, xml, error) contract.
+"""
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.network.config import (
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    POOL_MAXSIZE,
+    MAX_RETRIES,
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    RETRY_STATUS_CODES,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+)
+from backend.utils.metrics import HTTP_ATTEMPT_SECONDS, HTTP_CIRCUIT_OPEN
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised when the circuit of a host is open and no request is sent"""
+
+
+#=================================================================================
+# CIRCUIT BREAKER
+# ================================================================================
+
+@dataclass
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures,
+    after reset_timeout seconds one trial request is let through (half-open),
+    concurrent callers are rejected until its outcome is recorded
+    """
+    failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD
+    reset_timeout: float = CIRCUIT_RESET_TIMEOUT
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None
+    half_open_in_flight: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # half-open: let one trial request through, a failure opens the circuit again
+            if self.half_open_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.half_open_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.half_open_in_flight = False
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+#=================================================================================
+# POOLED, RETRYING CLIENT
+# ================================================================================
+
+class ARSOHttpClient:
+    """Reusable HTTP client, create once and share (see get_http_client())"""
+
+    def __init__(
+            self,
+            connect_timeout: float = CONNECT_TIMEOUT,
+            read_timeout: float = READ_TIMEOUT,
+            max_retries: int = MAX_RETRIES,
+            backoff_base: float = BACKOFF_BASE,
+            backoff_max: float = BACKOFF_MAX,
+            pool_maxsize: int = POOL_MAXSIZE,
+            sleep: Callable[[float], None] = time.sleep
+    ) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+
+        # Retries are done here, the adapter itself must not retry
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # requests decodes gzip/deflate bodies transparently
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker_for(self, host: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker()
+            return self._breakers[host]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry number (1, 2, ...)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def get(self, url: str, deadline: Optional[float] = None, **kwargs: Any) -> requests.Response:
+        """
+        GET with retries, timeouts and circuit breaker
+
+        Args:
+            deadline: seconds for all attempts and backoff sleeps together,
+                      every attempt's connect and read timeouts are cut to what is left
+
+        Returns the last response, also when it has an error status,
+        so the caller still decides with raise_for_status()
+
+        Raises:
+            CircuitOpenError: the host circuit is open
+            requests.Timeout, requests.ConnectionError: all attempts failed or the deadline passed
+        """
+        host = urlparse(url).netloc
+        breaker = self.breaker_for(host)
+        timeout = kwargs.pop("timeout", self.timeout)
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+
+        def remaining() -> Optional[float]:
+            return deadline_at - time.monotonic() if deadline_at is not None else None
+
+        attempt = 0
+        while True:
+            attempt += 1
+
+            left = remaining()
+            if left is not None:
+                if left <= 0:
+                    raise requests.Timeout(f"Deadline of {deadline} s for {host} exceeded after {attempt - 1} attempts")
+                kwargs["timeout"] = (min(timeout[0], left), min(timeout[1], left))
+            else:
+                kwargs["timeout"] = timeout
+
+            if not breaker.allow_request():
+                HTTP_CIRCUIT_OPEN.labels(host=host).inc()
+                raise CircuitOpenError(f"Circuit open for {host} after {breaker.consecutive_failures} failures")
+
+            start_time = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+
+            except (requests.ConnectionError, requests.Timeout) as request_error:
+                HTTP_ATTEMPT_SECONDS.labels(host=host, outcome="error").observe(time.perf_counter() - start_time)
+                breaker.record_failure()
+                if attempt > self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise requests.Timeout(f"Deadline of {deadline} s for {host} exceeded after {attempt} attempts") from request_error
+                logging.warning(f"Attempt {attempt} to {host} failed: {request_error}, retrying in {delay:.1f} s")
+                self._sleep(delay)
+                continue
+            except Exception:
+                # not retried, but a half-open trial must not stay in flight
+                breaker.record_failure()
+                raise
+
+            elapsed = time.perf_counter() - start_time
+            HTTP_ATTEMPT_SECONDS.labels(host=host, outcome=str(response.status_code)).observe(elapsed)
+            logging.info(f"Attempt {attempt} to {host} returned {response.status_code} in {elapsed * 1000:.0f} ms")
+
+            if response.status_code in RETRY_STATUS_CODES:
+                breaker.record_failure()
+                if attempt > self.max_retries:
+                    return response
+                delay = self.backoff_delay(attempt)
+                left = remaining()
+                if left is not None and delay >= left:
+                    # no time for another attempt, the caller gets the error status
+                    return response
+                response.close()
+                logging.warning(f"Attempt {attempt} to {host} returned {response.status_code}, retrying in {delay:.1f} s")
+                self._sleep(delay)
+                continue
+
+            breaker.record_success()
+            return response
+
+
+#=================================================================================
+# SHARED INSTANCE
+# ================================================================================
+
+_http_client: Optional[ARSOHttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> ARSOHttpClient:
+    """Process-wide client, created on first use"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = ARSOHttpClient()
+        return _http_client
@@ -0,0 +1,87 @@
+"""
+Payload archive
+===============
+Every fetched feed payload is kept as a gzipped snapshot before it is
+parsed and stored, so hours lost to a failed insert can be re-parsed later
+(backend.gap_fill) and history can be reloaded with backend.backfill.
+
+Files are named after the feed and its <datum_priprave>:
+
+    <ARSO_ARCHIVE_DIR>/<feed>/<feed>_20250101T1320.xml.gz
+
+Archiving is off when ARSO_ARCHIVE_DIR is not set.
+"""
+import gzip
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+
+ARCHIVE_TIMESTAMP_FORMAT = "%Y%m%dT%H%M"
+
+
+def get_archive_dir() -> Optional[Path]:
+    directory = os.environ.get("ARSO_ARCHIVE_DIR", "").strip()
+    return Path(directory) if directory else None
+
+
+def archive_path(directory: Path, feed_name: str, preparation_timestamp: datetime) -> Path:
+    return directory / feed_name / f"{feed_name}_{preparation_timestamp.strftime(ARCHIVE_TIMESTAMP_FORMAT)}.xml.gz"
+
+
+def archive_payload(feed_name: str, xml_content: str, preparation_timestamp: Optional[datetime],
+                    directory: Optional[Path] = None) -> Optional[Path]:
+    """
+    Store one payload, a snapshot that is already archived is not written again
+
+    Returns:
+        path of the snapshot, None when archiving is off, the payload has no
+        <datum_priprave> or writing failed
+    """
+    directory = directory or get_archive_dir()
+    if directory is None or preparation_timestamp is None:
+        return None
+
+    path = archive_path(directory, feed_name, preparation_timestamp)
+    if path.exists():
+        return path
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write and rename, readers never see half written snapshots
+        temporary_path = path.with_name(path.name + ".tmp")
+        with gzip.open(temporary_path, "wb") as archive_file:
+            archive_file.write(xml_content.encode("utf-8"))
+        os.replace(temporary_path, path)
+    except OSError:
+        logging.exception(f"Archiving payload of feed {feed_name} failed")
+        return None
+    return path
+
+
+def snapshot_timestamp(path: Path) -> Optional[datetime]:
+    """<datum_priprave> from the snapshot name, None for files not written by archive_payload()"""
+    _, _, stamp = path.name.partition(".")[0].rpartition("_")
+    try:
+        return datetime.strptime(stamp, ARCHIVE_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def find_snapshots(start: datetime, end: datetime, lookahead: timedelta,
+                   directory: Optional[Path] = None) -> List[Path]:
+    """
+    Snapshots that may hold hours in [start, end): prepared from start
+    until lookahead after end, feeds cover hours before their preparation time
+    """
+    directory = directory or get_archive_dir()
+    if directory is None or not directory.is_dir():
+        return []
+
+    snapshots = []
+    for path in directory.rglob("*.xml.gz"):
+        timestamp = snapshot_timestamp(path)
+        if timestamp is not None and start <= timestamp < end + lookahead:
+            snapshots.append(path)
+    return sorted(snapshots, key=lambda path: snapshot_timestamp(path))  # type: ignore[arg-type, return-value]
@@ -0,0 +1,182 @@
+"""
+ARSO Parser Module
+==================
+Single-pass parser for the ARSO air quality XML feed.
+The XML tree is built once and every <postaja> element is visited once,
+producing the ParsedStationModel and the ParsedMeasurementModel for it,
+together with the ARSOMetadata from the root element.
+
+read_feed_metadata() reads only the metadata before the first <postaja>,
+so a payload that was already ingested is recognized without parsing it.
+"""
+
+from xml.etree import ElementTree as ET
+import logging
+import time
+from typing import Mapping, Optional, Protocol
+
+from backend.parsers.models.station_models import ARSOMetadata, ParsedStationModel
+from backend.parsers.models.measurement_model import ParsedMeasurementModel
+from backend.parsers.models.measurement_batch import MeasurementBatchBuilder
+from backend.parsers.models.feed_model import ParsedFeedModel
+from backend.parsers.models.parse_result import ParseResult
+from backend.parsers.field_schema import scan_postaja
+
+
+class StationCache(Protocol):
+    """Source of ParsedStationModel objects that can skip unchanged stations, e.g. StationRegistry"""
+
+    def parsed_station(self, attributes: Mapping[str, str], station_name: Optional[str]) -> ParsedStationModel: ...
+
+
+# characters of the document fed at a time while looking for the first <postaja>
+METADATA_READ_SIZE = 4096
+
+
+# =====================================================================
+# XML PARSING METHODS
+# =====================================================================
+
+def read_feed_metadata(xml_content: str) -> Optional[ARSOMetadata]:
+    """
+    ARSOMetadata from the root elements that precede the first <postaja>
+
+    Returns:
+        None when the document is broken before the first <postaja>
+    """
+    pull_parser = ET.XMLPullParser(events=("start",))
+    root: Optional[ET.Element] = None
+    try:
+        for offset in range(0, len(xml_content), METADATA_READ_SIZE):
+            pull_parser.feed(xml_content[offset:offset + METADATA_READ_SIZE])
+            for _event, element in pull_parser.read_events():
+                if root is None:
+                    root = element
+                elif element.tag == 'postaja':
+                    # metadata elements are closed by now, the rest is not needed
+                    return ARSOMetadata.from_xml_root(root)
+        pull_parser.close()
+    except ET.ParseError as parse_error:
+        logging.warning(f"Failed to read feed metadata: {parse_error}")
+        return None
+    return ARSOMetadata.from_xml_root(root) if root is not None else None
+
+
+def parse_arso_xml(xml_content: str, columnar: bool = False, station_cache: Optional[StationCache] = None) -> ParseResult:
+    """
+    Parse stations, measurements and root metadata from ARSO XML in one pass
+
+    Args:
+        xml_content: ARSO XML document as returned by fetch_arso_xml()
+        columnar: collect measurements into a MeasurementBatch instead of
+                  a list of ParsedMeasurementModel objects
+        station_cache: reuse models of unchanged stations instead of validating them again
+
+    Returns:
+        ParseResult with a ParsedFeedModel in data on success
+    """
+    start_time = time.perf_counter()
+
+    try:
+        logging.info("Starting single-pass XML parsing for stations and measurements")
+
+        # Build the tree only once for the whole document
+        root = ET.fromstring(xml_content.encode('utf-8'))
+
+        feed = ParsedFeedModel(metadata=ARSOMetadata.from_xml_root(root))
+
+        measurement_builder = MeasurementBatchBuilder() if columnar else None
+
+        found_elements = 0
+
+        # Walk <postaja> elements only once, each element feeds both models
+        for single_element in root.iter('postaja'):
+            found_elements += 1
+
+            # One pass over the children gives the texts for both models
+            texts, extra_texts = scan_postaja(single_element)
+
+            try:
+                if station_cache is not None:
+                    feed.stations.append(station_cache.parsed_station(single_element.attrib, texts["station_name"]))
+                else:
+                    feed.stations.append(ParsedStationModel.from_postaja(single_element.attrib, texts["station_name"]))
+            except Exception as station_error:
+                feed.skipped_stations += 1
+                logging.warning(f"Failed to parse station element {str(station_error)}")
+
+            try:
+                if measurement_builder is not None:
+                    measurement_builder.append_texts(texts, extra_texts)
+                else:
+                    feed.measurements.append(ParsedMeasurementModel.from_texts(texts, extra_texts))
+            except Exception as measurement_error:
+                feed.skipped_measurements += 1
+                logging.warning(f"Failed to parse measurement element {str(measurement_error)}")
+
+        if measurement_builder is not None:
+            feed.measurements = measurement_builder.build()
+
+        if found_elements == 0:
+            logging.warning("No station elements found in XML")
+            return ParseResult(
+                success=False,
+                data=feed,
+                items_parsed=0,
+                error_message="No stations found in XML data",
+                processing_time_ms=(time.perf_counter() - start_time) * 1000
+            )
+
+        # Build result summary
+        if feed.skipped_stations or feed.skipped_measurements:
+            result_message = (
+                f"Parsed {len(feed.stations)}/{found_elements} stations and "
+                f"{len(feed.measurements)}/{found_elements} measurements, "
+                f"skipped {feed.skipped_stations} stations and {feed.skipped_measurements} measurements"
+            )
+        else:
+            result_message = f"Successfully parsed all {found_elements} stations and measurements"
+        logging.info(result_message)
+
+        return ParseResult(
+            success=True,
+            data=feed,
+            items_parsed=len(feed.measurements),
+            error_message=result_message if feed.skipped_stations or feed.skipped_measurements else None,
+            processing_time_ms=(time.perf_counter() - start_time) * 1000
+        )
+
+    except ET.ParseError as parse_error:
+        # XML structure is fundamentaly broken
+        error_msg = f"Invalid XML structure: {str(parse_error)}"
+        logging.error(error_msg)
+
+        return ParseResult(
+            success=False,
+            data=None,
+            items_parsed=0,
+            error_message=error_msg
+        )
+
+    except UnicodeDecodeError as decode_error:
+        # Character decoding problems
+        error_msg = f"Character decoding problems: {str(decode_error)}"
+        logging.error(error_msg)
+
+        return ParseResult(
+            success=False,
+            data=None,
+            items_parsed=0,
+            error_message=error_msg
+        )
+
+    except Exception as unexpected_error:
+        error_msg = f"Unexpected error during XML parsing {str(unexpected_error)}"
+        logging.error(error_msg)
+
+        return ParseResult(
+            success=False,
+            data=None,
+            items_parsed=0,
+            error_message=error_msg
+        )
@@ -0,0 +1,119 @@
+"""
+Value converters
+================
+Conversion of ARSO XML texts to Python and NumPy values.
+
+Timestamps are memoized, nearly all <postaja> elements of one feed share
+the same datum_od/datum_do. Pollutant texts can be converted one by one
+(to_int/to_float) or a whole column at once (convert_pollutant_column).
+
+Values below the detection limit are reported by ARSO as "<N".
+They are stored as N and flagged as below detection.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+
+ARSO_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+# Distinct timestamp strings remembered, a month of hourly data is ~750
+TIMESTAMP_CACHE_SIZE = 8192
+
+BELOW_DETECTION_PREFIX = "<"
+
+
+#=================================================================================
+# TIMESTAMPS
+# ================================================================================
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def _parse_timestamp_cached(text: str) -> datetime:
+    return datetime.strptime(text, ARSO_TIMESTAMP_FORMAT)
+
+
+def parse_arso_timestamp(text: Optional[str]) -> Optional[datetime]:
+    """
+    Convert "2025-01-01 13:00" to datetime, strptime runs once per distinct string
+
+    Raises:
+        ValueError: text is not in ARSO_TIMESTAMP_FORMAT
+    """
+    if not text:
+        return None
+    return _parse_timestamp_cached(text.strip())
+
+
+#=================================================================================
+# SINGLE VALUES
+# ================================================================================
+
+def is_below_detection(text: Optional[str]) -> bool:
+    """True for values like "<2" """
+    return bool(text) and text.strip().startswith(BELOW_DETECTION_PREFIX)  # type: ignore[union-attr]
+
+
+def to_float(text: Optional[str]) -> Optional[float]:
+    """"1.5" -> 1.5, "<0.1" -> 0.1 (detection limit), empty or invalid -> None"""
+    if not text:
+        return None
+    try:
+        return float(text.strip().lstrip(BELOW_DETECTION_PREFIX))
+    except ValueError:
+        return None
+
+
+def to_int(text: Optional[str]) -> Optional[int]:
+    """"12" -> 12, "<2" -> 2 (detection limit), empty or invalid -> None"""
+    if not text:
+        return None
+    try:
+        text = text.strip()
+        # handles values like "<2"
+        if text.startswith(BELOW_DETECTION_PREFIX):
+            return int(float(text[1:]))
+        return int(text)
+    except ValueError:
+        return None
+
+
+#=================================================================================
+# WHOLE COLUMNS
+# ================================================================================
+
+def convert_pollutant_column(texts: Sequence[Optional[str]], integer: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert all texts of one pollutant at once
+
+    Args:
+        texts: raw XML texts, None for missing elements
+        integer: apply to_int() rules, "12.5" is invalid for integer pollutants
+
+    Returns:
+        Tuple[values float64 (NaN when invalid), valid mask, below detection mask]
+    """
+    count = len(texts)
+    stripped = [text.strip() if text else "" for text in texts]
+    below_detection = np.fromiter(
+        (text.startswith(BELOW_DETECTION_PREFIX) for text in stripped), dtype=bool, count=count
+    )
+    numbers = [text.lstrip(BELOW_DETECTION_PREFIX) or "nan" for text in stripped]
+
+    try:
+        # float() through map is the fastest text -> float64 path, faster than ndarray.astype on strings
+        values = np.fromiter(map(float, numbers), dtype=np.float64, count=count)
+    except ValueError:
+        # Some text is not a number, fall back to converting one by one
+        values = np.array([to_float(text) for text in numbers], dtype=np.float64)
+
+    valid = ~np.isnan(values)
+
+    if integer:
+        # int("12.5") fails in to_int(), only detection limits are truncated
+        whole = values == np.trunc(values)
+        valid &= whole | below_detection
+        values = np.where(valid, np.trunc(values), np.nan)
+
+    below_detection &= valid
+    return values, valid, below_detection
@@ -0,0 +1,75 @@
+"""
+Feed router
+===========
+Routes the payload of every configured feed to its parser and combines
+the parsed feeds into one set of stations and one MeasurementBatch,
+which is then stored in a single ingest transaction.
+
+Measurements are stored as hourly values, a feed whose rows do not each
+span one hour (daily or multi-day averages) is rejected as a whole
+instead of being written into the hourly table.
+"""
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.network.feeds import FeedConfig
+from backend.parsers.arso_parser import StationCache, parse_arso_xml
+from backend.parsers.models.feed_model import ParsedFeedModel
+from backend.parsers.models.measurement_batch import MeasurementBatch
+from backend.parsers.models.parse_result import ParseResult
+from backend.parsers.models.station_models import ParsedStationModel
+
+
+MEASUREMENT_PERIOD = np.timedelta64(60, "m")
+
+FeedParser = Callable[[str, Optional[StationCache]], ParseResult]
+
+# FeedConfig.parser -> parser, every parser returns a ParsedFeedModel in data
+FEED_PARSERS: Dict[str, FeedParser] = {
+    "arso_xml": lambda xml_content, station_cache: parse_arso_xml(xml_content, columnar=True, station_cache=station_cache),
+}
+
+
+def parse_feed(feed: FeedConfig, xml_content: str, station_cache: Optional[StationCache] = None) -> ParseResult:
+    """Parse one feed payload with the parser it is registered with"""
+    parser = FEED_PARSERS.get(feed.parser)
+    if parser is None:
+        error_msg = f"No parser {feed.parser} registered for feed {feed.name}"
+        logging.error(error_msg)
+        return ParseResult(success=False, data=None, items_parsed=0, error_message=error_msg)
+
+    result = parser(xml_content, station_cache)
+    if result.success and not is_hourly(result.data):
+        error_msg = f"Feed {feed.name} does not hold hourly measurements, it is not stored"
+        logging.error(error_msg)
+        return ParseResult(success=False, data=None, items_parsed=0, error_message=error_msg)
+    return result
+
+
+def is_hourly(feed: ParsedFeedModel) -> bool:
+    """Every measurement covers exactly one hour"""
+    batch = _measurement_batch(feed)
+    return bool(np.all(batch.time_to - batch.time_from == MEASUREMENT_PERIOD))
+
+
+def _measurement_batch(feed: ParsedFeedModel) -> MeasurementBatch:
+    return (feed.measurements if isinstance(feed.measurements, MeasurementBatch)
+            else MeasurementBatch.from_models(feed.measurements))
+
+
+def combine_feeds(feeds: List[ParsedFeedModel]) -> Tuple[List[ParsedStationModel], MeasurementBatch]:
+    """
+    Stations of all feeds (first occurrence of every station id wins)
+    and all measurements in one batch
+    """
+    stations: Dict[str, ParsedStationModel] = {}
+    batches: List[MeasurementBatch] = []
+
+    for feed in feeds:
+        for station in feed.stations:
+            stations.setdefault(station.station_id, station)  # type: ignore[arg-type]
+        batches.append(_measurement_batch(feed))
+
+    return list(stations.values()), MeasurementBatch.concat(batches)
@@ -0,0 +1,112 @@
+"""
+Field schema of the <postaja> element
+=====================================
+Mapping of XML attributes and child tags to model fields and converters,
+compiled once at import time. scan_postaja() reads all child elements of
+one <postaja> in a single pass instead of one findtext() scan per field.
+
+Child tags that are not in the schema are returned as extra pollutants,
+so a new pollutant published by ARSO is stored without code changes.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+from backend.parsers.converters import to_float, to_int
+
+
+#=================================================================================
+# <postaja> ATTRIBUTES -> ParsedStationModel
+# ================================================================================
+
+STATION_ID_ATTRIBUTE = "sifra"
+
+# attribute: (ParsedStationModel field, converter), converters raise ValueError on bad input
+STATION_ATTRIBUTE_FIELDS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "wgs84_sirina": ("latitude", float),
+    "wgs84_dolzina": ("longitude", float),
+    "d96_e": ("d96_easting", float),
+    "d96_n": ("d96_northing", float),
+    "nadm_visina": ("elevation_meters", lambda text: int(float(text))),
+}
+
+
+#=================================================================================
+# <postaja> CHILD TAGS -> ParsedMeasurementModel
+# ================================================================================
+
+# child tag: field, non-pollutant texts
+POSTAJA_TEXT_FIELDS: Dict[str, str] = {
+    "merilno_mesto": "station_name",
+    "datum_od": "time_from",
+    "datum_do": "time_to",
+}
+
+# pollutant text -> value, None when empty or invalid, the detection limit N for "<N"
+PollutantConverter = Callable[[Optional[str]], Optional[Union[int, float]]]
+
+# child tag: (pollutant field, converter), whole-number pollutants use to_int
+POLLUTANT_TAG_FIELDS: Dict[str, Tuple[str, PollutantConverter]] = {
+    "co": ("co", to_float),
+    "o3": ("o3", to_int),
+    "no2": ("no2", to_int),
+    "so2": ("so2", to_int),
+    "pm10": ("pm10", to_int),
+    "pm2.5": ("pm25", to_int),
+    "nox": ("nox", to_int),
+    "benzen": ("benzen", to_float),
+}
+
+# child tags not in the schema
+EXTRA_POLLUTANT_CONVERTER: PollutantConverter = to_float
+
+# pollutant field: converter
+POLLUTANT_CONVERTERS: Dict[str, PollutantConverter] = {
+    field_name: converter for field_name, converter in POLLUTANT_TAG_FIELDS.values()
+}
+
+# Pollutants stored as integers, whole columns are converted with the to_int rules
+INTEGER_POLLUTANTS = frozenset(
+    field_name for field_name, converter in POLLUTANT_CONVERTERS.items() if converter is to_int
+)
+
+# Compiled lookup for the single pass over children
+CHILD_TAG_FIELDS: Dict[str, str] = {
+    **POSTAJA_TEXT_FIELDS,
+    **{tag: field_name for tag, (field_name, _converter) in POLLUTANT_TAG_FIELDS.items()},
+}
+
+# Every field present with None, copied for each element so missing children stay None
+EMPTY_POSTAJA_TEXTS: Dict[str, Optional[str]] = {field_name: None for field_name in CHILD_TAG_FIELDS.values()}
+
+
+def pollutant_field_name(tag: str) -> str:
+    """Field name for a pollutant tag not in the schema, e.g. "pm1.0" -> "pm1_0" """
+    return tag.strip().lower().replace(".", "_").replace("-", "_")
+
+
+#=================================================================================
+# SINGLE PASS OVER ONE <postaja>
+# ================================================================================
+
+def scan_postaja(element: ElementTree.Element) -> Tuple[Dict[str, Optional[str]], Dict[str, Optional[str]]]:
+    """
+    Read all texts of one <postaja> element in one pass over its children
+
+    Returns:
+        Tuple[
+            texts keyed by ParsedMeasurementModel field names (station_id included),
+            texts of child tags not in the schema keyed by pollutant_field_name()
+        ]
+    """
+    texts = dict(EMPTY_POSTAJA_TEXTS)
+    extra_texts: Dict[str, Optional[str]] = {}
+
+    for child in element:
+        field_name = CHILD_TAG_FIELDS.get(child.tag)
+        if field_name is not None:
+            texts[field_name] = child.text
+        else:
+            extra_texts[pollutant_field_name(child.tag)] = child.text
+
+    texts["station_id"] = element.get(STATION_ID_ATTRIBUTE)
+    return texts, extra_texts
@@ -1,9 +1,14 @@
 from backend.database.session import SessionLocal
-from backend.database.db_models import DbModelStation, DbModelPollutant, DbModelMeasurement
-from backend.parsers.models.measurement_model import ParsedMeasurementModel
+from backend.database.identity_cache import IdentityCache, get_identity_cache
+from backend.database.schema import ensure_partitions, forget_known_partitions
+from backend.database.rollups import update_rollups
+from backend.database.fencing import StaleFencingTokenError, check_fencing_token
+from backend.database.bulk_writer import BulkWriteResult, MeasurementRow, write_measurements, write_reported_hours
+from backend.parsers.models.measurement_model import ParsedMeasurementModel, POLLUTANT_FIELDS
+from backend.parsers.models.measurement_batch import MeasurementBatch
 from backend.parsers.models.station_models import ParsedStationModel
 from sqlalchemy.orm import Session
-from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, Iterable, List, Optional
 
 
 """
@@ -13,128 +18,89 @@ SQLAlchemy models DbModelStation and DbModelMeasurement
 
 """
 
-def ensure_pollutants_in_db(db:Session):
-    # Get existing pollutant names from DB
-    existing_pollutant = {pollutant.name for pollutant in db.query(DbModelPollutant).all()}
+# name of the ingest job in the distributed lock and the fencing table
+INGEST_JOB_NAME = "ingest"
 
-    # Extract pollutant names from the dataclass
-    all_fields = ParsedMeasurementModel.__dataclass_fields__.keys()
-    non_pollutant_fields = {"station_id","station_name","time_from","time_to"}
-    pollutant_fields = [field for field in all_fields if field not in non_pollutant_fields]
-
-    # Insert pollutant into database if not already present
-    for field in pollutant_fields:
-        if field not in existing_pollutant:
-            new_pollutant = insert(DbModelPollutant).values(
-                name = field, 
-                unit = "μg/m³" if field != "co" else "mg/m³"
-                ).on_conflict_do_nothing(
-                    index_elements=['name']
-                )
-            db.execute(new_pollutant)
-            db.commit()
 
+def ensure_pollutants_in_db(db:Session, extra_pollutants: Iterable[str] = (),
+                            identity_cache: Optional[IdentityCache] = None) -> Dict[str, int]:
+    """
+    extra_pollutants: pollutant tags found in the feed that are not in the field schema
+    Returns pollutant name -> primary key, the database is only queried for names not cached yet
+    """
+    identity_cache = identity_cache or get_identity_cache()
+    return identity_cache.pollutant_ids(db, (*POLLUTANT_FIELDS, *extra_pollutants))
 
 
-# Function to insert stations and measurements into the database
-def insert_data_into_db(db: Session, parsed_stations: ParsedStationModel, parsed_measurements: ParsedMeasurementModel):
 
+def insert_all_data(all_parsed_data: list[tuple[ParsedStationModel, ParsedMeasurementModel]]) -> bool:
     """
-    Insert a station and all measurements for all pollutants into the database.
-    Arguments:
-    - parsed_stations: an object (parsing model StationInfo) with station attributes
-    - parsed_measurements: an object (parsing model ParseMeasurements) with pollutant values as attributes
+    all_parsed_data: list of (ParsedStationModel, ParsedMeasurementModel) tuples
+    Returns True when the data was committed
     """
+    stations = [parsed_station for parsed_station, _ in all_parsed_data]
+    batch = MeasurementBatch.from_models(parsed_measurements for _, parsed_measurements in all_parsed_data)
+    return insert_measurement_batch(stations, batch) is not None
 
-    try:
-        # Check if the station already exists, querying the database using SQLAlcchemy ORM. 
-        db_single_station = db.query(DbModelStation).filter_by(station_id=parsed_stations.station_id).first()
-        # if the station doesn't exist, create a new one:
-        if not db_single_station:            
-            db_single_station = insert(DbModelStation).values(
-                # Map all attributes from ParsedStationModel to DbModelStation
-                station_id = parsed_stations.station_id,
-                station_name = parsed_stations.station_name,
-                latitude = parsed_stations.latitude,
-                longitude = parsed_stations.longitude,
-                d96_easting = parsed_stations.d96_easting,
-                d96_northing = parsed_stations.d96_northing,
-                elevation_meters = parsed_stations.elevation_meters                                        
-                              
-            ).on_conflict_do_nothing(
-                
-                index_elements=['station_id']
-            )
-
-            # Add the new station to the session
-            db.execute(db_single_station)
-            db.commit()
-            # Re-query to get the DbModelStation instance instead of the Insert object
-            db_single_station = db.query(DbModelStation).filter_by(station_id=parsed_stations.station_id).first()
-            if db_single_station is None:
-                raise ValueError(f"Station with id {parsed_stations.station_id} not found or inserted")
-
-        
-        
-        # parsed_measurements is a ParsedMeasurementModel instance
-        # This loop creates one DbModelPollutant instance for each pollutant
-        # with a value and time for the station
-        db_pollutants = db.query(DbModelPollutant).all()
-        measurement_time = getattr(parsed_measurements, "time_to", None)
-
-        for single_pollutant in db_pollutants:
-            name = single_pollutant.name # e.g. co, nox ..
-
-            # gets the value from parsed_measurements, dinamically access the attribute
-            # of parsed_measurements object using names from database pollutant model
-            # getattr always gets the attribute value or None so in this case the value of 'name'
-            value = getattr(parsed_measurements, name, None)
-            
-            if value is not None:
-                single_pollutant_measurement = insert(DbModelMeasurement).values(
-                    station_id = db_single_station.id, # from db_single_station object
-                    pollutant_id = single_pollutant.id,
-                    value = value,
-                    measured_at = measurement_time
-                ).on_conflict_do_nothing(
-                    index_elements=['station_id', 'pollutant_id', 'measured_at']
-                )
-
-                db.execute(single_pollutant_measurement)
-                
-        # should not commit here 
-     
-    except Exception as e:
-        db.rollback()
-        print(f"Error inserting in database: {e}")
-        
 
 
-def insert_all_data(all_parsed_data: list[tuple[ParsedStationModel, ParsedMeasurementModel]]):
+def insert_measurement_batch(parsed_stations: List[ParsedStationModel], batch: MeasurementBatch,
+                             identity_cache: Optional[IdentityCache] = None,
+                             fencing_token: Optional[int] = None) -> Optional[BulkWriteResult]:
     """
-    all_parsed_data: list of (ParsedStationModel, ParsedMeasurementModel) tuples
+    Insert stations and a columnar MeasurementBatch in one transaction.
+    Only new or changed stations are upserted (one statement), the identity cache
+    resolves sifra and pollutant names to primary keys. Measurement rows are built column by column
+    from the validity masks and written set-based by write_measurements().
+    fencing_token: token of the distributed ingest lock, the transaction is
+                   rejected when a newer lock holder has already written
+    Returns inserted/skipped counts when the data was committed, None on failure
+
+    Raises:
+        StaleFencingTokenError: a newer lock holder has written, nothing was stored
     """
-    # open session
+    identity_cache = identity_cache or get_identity_cache()
     db = SessionLocal()
     try:
-        ensure_pollutants_in_db(db)
-        for parsed_station, parsed_measurements in all_parsed_data:
-            insert_data_into_db(db, parsed_station, parsed_measurements)
+        if fencing_token is not None:
+            check_fencing_token(db, INGEST_JOB_NAME, fencing_token)
+
+        pollutant_ids = ensure_pollutants_in_db(db, [name for name, mask in batch.valid.items() if mask.any()], identity_cache)
+
+        batch_station_ids = set(batch.station_ids)
+        identity_cache.stations.sync(db, (station for station in parsed_stations if station.station_id in batch_station_ids))
+        station_pks = identity_cache.station_pks(db, batch.station_ids)
+
+        measurement_rows: List[MeasurementRow] = [
+            (station_pks[station_id], pollutant_ids[pollutant], value, measured_at)
+            for station_id, pollutant, measured_at, value in batch.iter_pollutant_records()
+            if station_id in station_pks and pollutant in pollutant_ids
+        ]
+
+        if measurement_rows:
+            # rows of a month without a partition would be rejected
+            ensure_partitions(db, min(row[3] for row in measurement_rows), max(row[3] for row in measurement_rows))
+        result = write_measurements(db, measurement_rows)
+        # in the same transaction, hours without any row are then known to be published empty
+        write_reported_hours(db, [
+            (station_pks[station_id], measured_at)
+            for station_id, measured_at in batch.iter_station_hours() if station_id in station_pks
+        ])
+        if result.inserted:
+            # only the days and months these rows fall into
+            update_rollups(db, measurement_rows)
         db.commit()
+        return result
 
+    except StaleFencingTokenError:
+        # not a storage failure, the caller must not publish anything either
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
+        identity_cache.invalidate()
+        forget_known_partitions()
         print(f"Error inserting in database: {e}")
+        return None
     finally:
         db.close()
-                  
-                
-                        
-
-
-
-                    
-                       
-                
-
-              
\ No newline at end of file
@@ -0,0 +1,22 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+from backend.parsers.models.station_models import ARSOMetadata, ParsedStationModel
+from backend.parsers.models.measurement_model import ParsedMeasurementModel
+from backend.parsers.models.measurement_batch import MeasurementBatch
+
+
+#=====================================================================
+# RESULT OF A SINGLE-PASS PARSE OF THE WHOLE ARSO FEED
+#=====================================================================
+
+@dataclass
+class ParsedFeedModel:
+    """
+    Everything extracted from one ARSO XML document in a single walk:
+    root metadata, station information and measurements
+    """
+    metadata: Optional[ARSOMetadata] = None                                     # <arsopodatki> root info
+    stations: List[ParsedStationModel] = field(default_factory=list)            # one per <postaja>
+    measurements: Union[List[ParsedMeasurementModel], MeasurementBatch] = field(default_factory=list)  # one per <postaja>, batch when parsed columnar
+    skipped_stations: int = 0                                                   # <postaja> elements without valid station info
+    skipped_measurements: int = 0                                               # <postaja> elements without valid measurements
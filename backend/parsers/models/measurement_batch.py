@@ -0,0 +1,359 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, overload
+import numpy as np
+from xml.etree import ElementTree
+from backend.parsers.models.measurement_model import ParsedMeasurementModel, POLLUTANT_FIELDS, INTEGER_POLLUTANTS
+from backend.parsers.field_schema import scan_postaja
+from backend.parsers.converters import (
+    parse_arso_timestamp, convert_pollutant_column, BELOW_DETECTION_PREFIX, ARSO_TIMESTAMP_FORMAT
+)
+
+
+#============================================================
+# COLUMNAR MEASUREMENTS
+#============================================================
+
+
+@dataclass
+class MeasurementBatch:
+    """
+    Many measurements stored column by column in NumPy arrays
+    instead of one ParsedMeasurementModel object per <postaja>.
+
+    Row i is: station_ids[station_index[i]], time_from[i], time_to[i]
+    and values[pollutant][i], which is only meaningful where valid[pollutant][i] is True.
+    below_detection[pollutant][i] is True when ARSO reported "<N" and the value is the limit N.
+    """
+    station_ids: List[str] = field(default_factory=list)      # distinct station ids (sifra)
+    station_names: List[str] = field(default_factory=list)    # name for every distinct station id
+    station_index: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    time_from: np.ndarray = field(default_factory=lambda: np.empty(0, dtype="datetime64[m]"))
+    time_to: np.ndarray = field(default_factory=lambda: np.empty(0, dtype="datetime64[m]"))
+    values: Dict[str, np.ndarray] = field(default_factory=dict)   # pollutant -> float64 column, NaN when missing, also tags not in the schema
+    valid: Dict[str, np.ndarray] = field(default_factory=dict)    # pollutant -> bool validity mask
+    below_detection: Dict[str, np.ndarray] = field(default_factory=dict)  # pollutant -> bool "<N" mask
+
+
+    def __len__(self) -> int:
+        return int(self.station_index.shape[0])
+
+
+    @classmethod
+    def from_models(cls, measurements: Iterable[ParsedMeasurementModel]) -> MeasurementBatch:
+        """Build a batch from existing dataclass instances"""
+        builder = MeasurementBatchBuilder()
+        for measurement in measurements:
+            builder.append_model(measurement)
+        return builder.build()
+
+    @classmethod
+    def concat(cls, batches: Sequence[MeasurementBatch]) -> MeasurementBatch:
+        """
+        Join batches, e.g. of several feeds, into one.
+        Station ids are merged, a pollutant missing in one batch is invalid in its rows
+        """
+        station_positions: Dict[str, int] = {}
+        station_ids: List[str] = []
+        station_names: List[str] = []
+        station_index: List[np.ndarray] = []
+
+        for batch in batches:
+            remap = np.empty(len(batch.station_ids), dtype=np.int32)
+            for position, (station_id, station_name) in enumerate(zip(batch.station_ids, batch.station_names)):
+                if station_id not in station_positions:
+                    station_positions[station_id] = len(station_ids)
+                    station_ids.append(station_id)
+                    station_names.append(station_name)
+                remap[position] = station_positions[station_id]
+            station_index.append(remap[batch.station_index] if len(batch) else np.empty(0, dtype=np.int32))
+
+        pollutants = list(dict.fromkeys(pollutant for batch in batches for pollutant in batch.values))
+
+        def column(batch: MeasurementBatch, columns: Dict[str, np.ndarray], pollutant: str, fill: Any, dtype: Any) -> np.ndarray:
+            return columns[pollutant] if pollutant in columns else np.full(len(batch), fill, dtype=dtype)
+
+        return cls(
+            station_ids=station_ids,
+            station_names=station_names,
+            station_index=np.concatenate(station_index) if station_index else np.empty(0, dtype=np.int32),
+            time_from=np.concatenate([batch.time_from for batch in batches]) if batches else np.empty(0, dtype="datetime64[m]"),
+            time_to=np.concatenate([batch.time_to for batch in batches]) if batches else np.empty(0, dtype="datetime64[m]"),
+            values={
+                pollutant: np.concatenate([column(batch, batch.values, pollutant, np.nan, np.float64) for batch in batches])
+                for pollutant in pollutants
+            },
+            valid={
+                pollutant: np.concatenate([column(batch, batch.valid, pollutant, False, bool) for batch in batches])
+                for pollutant in pollutants
+            },
+            below_detection={
+                pollutant: np.concatenate([column(batch, batch.below_detection, pollutant, False, bool) for batch in batches])
+                for pollutant in pollutants
+            },
+        )
+
+
+    def take(self, indices: np.ndarray) -> MeasurementBatch:
+        """New batch with only the given rows, station ids are kept as they are"""
+        return MeasurementBatch(
+            station_ids=self.station_ids,
+            station_names=self.station_names,
+            station_index=self.station_index[indices],
+            time_from=self.time_from[indices],
+            time_to=self.time_to[indices],
+            values={pollutant: column[indices] for pollutant, column in self.values.items()},
+            valid={pollutant: mask[indices] for pollutant, mask in self.valid.items()},
+            below_detection={pollutant: mask[indices] for pollutant, mask in self.below_detection.items()},
+        )
+
+    def deduplicate(self) -> MeasurementBatch:
+        """
+        One row per (station, time_to), the last occurrence wins,
+        e.g. for overlapping hours of consecutive archived snapshots
+        """
+        if len(self) == 0:
+            return self
+        keys = np.stack([self.station_index.astype(np.int64), self.time_to.astype(np.int64)], axis=1)
+        # np.unique keeps the first occurrence, so search the reversed rows
+        _, reversed_first = np.unique(keys[::-1], axis=0, return_index=True)
+        last = np.sort(len(self) - 1 - reversed_first)
+        return self if last.shape[0] == len(self) else self.take(last)
+
+
+    #------------------------------------------------------------
+    # Row views for existing callers
+    #------------------------------------------------------------
+
+    def row(self, index: int) -> ParsedMeasurementModel:
+        """Materialize a single row as ParsedMeasurementModel"""
+        station_position = int(self.station_index[index])
+        pollutant_values: Dict[str, Any] = {}
+        extra_pollutants: Dict[str, float] = {}
+        below_detection = set()
+
+        for pollutant, column in self.values.items():
+            if not self.valid[pollutant][index]:
+                continue
+            value = column[index].item()
+            if pollutant in INTEGER_POLLUTANTS:
+                pollutant_values[pollutant] = int(value)
+            elif pollutant in POLLUTANT_FIELDS:
+                pollutant_values[pollutant] = value
+            else:
+                extra_pollutants[pollutant] = value
+            if pollutant in self.below_detection and self.below_detection[pollutant][index]:
+                below_detection.add(pollutant)
+
+        return ParsedMeasurementModel(
+            station_id=self.station_ids[station_position],
+            station_name=self.station_names[station_position],
+            time_from=self.time_from[index].astype(datetime),
+            time_to=self.time_to[index].astype(datetime),
+            below_detection=frozenset(below_detection),
+            extra_pollutants=extra_pollutants,
+            **pollutant_values
+        )
+
+    def iter_rows(self) -> Iterator[ParsedMeasurementModel]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def rows(self, indices: Optional[np.ndarray] = None) -> MeasurementRowsView:
+        """Lazy list-like view, rows are only materialized when accessed"""
+        if indices is None:
+            indices = np.arange(len(self))
+        return MeasurementRowsView(self, indices)
+
+    def indices_by_station(self) -> Dict[str, np.ndarray]:
+        """Row indices of every station, one stable sort instead of a Python loop over rows"""
+        order = np.argsort(self.station_index, kind="stable")
+        sorted_positions = self.station_index[order]
+        boundaries = np.flatnonzero(np.diff(sorted_positions)) + 1
+        groups = np.split(order, boundaries)
+        return {
+            self.station_ids[int(self.station_index[group[0]])]: group
+            for group in groups if group.size
+        }
+
+
+    #------------------------------------------------------------
+    # Column access for the DB, cache and API layers
+    #------------------------------------------------------------
+
+    def iter_pollutant_records(self) -> Iterator[Tuple[str, str, datetime, float]]:
+        """
+        Long format records (station_id, pollutant, time_to, value) for all valid values,
+        selected column by column with the validity masks
+        """
+        time_to = self.time_to.astype(datetime)
+        for pollutant, column in self.values.items():
+            for index in np.flatnonzero(self.valid[pollutant]):
+                yield (
+                    self.station_ids[self.station_index[index]],
+                    pollutant,
+                    time_to[index],
+                    column[index].item()
+                )
+
+    def iter_station_hours(self) -> Iterator[Tuple[str, datetime]]:
+        """Distinct (station_id, time_to) of all rows, also of rows without any valid value"""
+        time_to = self.time_to.astype(datetime)
+        stations = [self.station_ids[position] for position in self.station_index]
+        yield from dict.fromkeys(zip(stations, time_to))
+
+    def to_dicts(self, indices: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """JSON friendly rows, missing pollutant values are None"""
+        if indices is None:
+            indices = np.arange(len(self))
+        time_from = np.datetime_as_string(self.time_from[indices])
+        time_to = np.datetime_as_string(self.time_to[indices])
+
+        rows: List[Dict[str, Any]] = []
+        for position, index in enumerate(indices):
+            station_position = int(self.station_index[index])
+            row: Dict[str, Any] = {
+                "station_id": self.station_ids[station_position],
+                "station_name": self.station_names[station_position],
+                "time_from": str(time_from[position]),
+                "time_to": str(time_to[position]),
+            }
+            for pollutant, column in self.values.items():
+                row[pollutant] = column[index].item() if self.valid[pollutant][index] else None
+            row["below_detection"] = [
+                pollutant for pollutant, mask in self.below_detection.items() if mask[index]
+            ]
+            rows.append(row)
+        return rows
+
+
+class MeasurementRowsView(Sequence[ParsedMeasurementModel]):
+    """List-like access to a subset of batch rows as ParsedMeasurementModel objects"""
+
+    def __init__(self, batch: MeasurementBatch, indices: np.ndarray) -> None:
+        self.batch = batch
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return int(self.indices.shape[0])
+
+    @overload
+    def __getitem__(self, position: int) -> ParsedMeasurementModel: ...
+    @overload
+    def __getitem__(self, position: slice) -> List[ParsedMeasurementModel]: ...
+
+    def __getitem__(self, position: Any) -> Any:
+        if isinstance(position, slice):
+            return [self.batch.row(int(index)) for index in self.indices[position]]
+        return self.batch.row(int(self.indices[position]))
+
+
+#============================================================
+# BATCH BUILDER
+#============================================================
+
+class MeasurementBatchBuilder:
+    """
+    Collects measurements row by row, pollutants as raw XML texts,
+    and converts every pollutant column at once in build()
+    """
+
+    def __init__(self) -> None:
+        self._station_positions: Dict[str, int] = {}
+        self._station_ids: List[str] = []
+        self._station_names: List[str] = []
+        self._station_index: List[int] = []
+        # timestamps repeat for every station, rows keep a code into the distinct values
+        self._time_codes: Dict[datetime, int] = {}
+        self._time_from: List[int] = []
+        self._time_to: List[int] = []
+        self._texts: Dict[str, List[Optional[str]]] = {pollutant: [] for pollutant in POLLUTANT_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._station_index)
+
+    def append_texts(self, texts: Dict[str, Optional[str]], extra_texts: Optional[Dict[str, Optional[str]]] = None) -> None:
+        """
+        Append one row given as raw texts keyed by ParsedMeasurementModel field names,
+        station and time range are validated the same way as in the dataclass.
+        extra_texts are pollutants not in the field schema, each gets its own column
+
+        Raises:
+            ValueError: invalid station or time range
+        """
+        station_id = texts["station_id"] or ""
+        time_from = parse_arso_timestamp(texts["time_from"])
+        time_to = parse_arso_timestamp(texts["time_to"])
+        station_name = ParsedMeasurementModel.validate_fields(
+            station_id, texts["station_name"] or "", time_from, time_to
+        )
+
+        position = self._station_positions.get(station_id)
+        if position is None:
+            position = len(self._station_ids)
+            self._station_positions[station_id] = position
+            self._station_ids.append(station_id)
+            self._station_names.append(station_name)
+
+        self._station_index.append(position)
+        self._time_from.append(self._time_code(time_from))  # type: ignore[arg-type]
+        self._time_to.append(self._time_code(time_to))  # type: ignore[arg-type]
+
+        # a pollutant seen for the first time gets a column padded for the previous rows
+        for pollutant in (extra_texts or {}):
+            if pollutant not in self._texts:
+                self._texts[pollutant] = [None] * (len(self._station_index) - 1)
+
+        for pollutant, column in self._texts.items():
+            text = texts.get(pollutant) if pollutant in texts else (extra_texts or {}).get(pollutant)
+            column.append(text)
+
+    def _time_code(self, timestamp: datetime) -> int:
+        code = self._time_codes.get(timestamp)
+        if code is None:
+            code = self._time_codes[timestamp] = len(self._time_codes)
+        return code
+
+    def append_element(self, element: ElementTree.Element) -> None:
+        """Append one <postaja> element without creating a dataclass instance"""
+        self.append_texts(*scan_postaja(element))
+
+    def append_model(self, measurement: ParsedMeasurementModel) -> None:
+        texts: Dict[str, Optional[str]] = {
+            "station_id": measurement.station_id,
+            "station_name": measurement.station_name,
+            "time_from": measurement.time_from.strftime(ARSO_TIMESTAMP_FORMAT) if measurement.time_from else None,
+            "time_to": measurement.time_to.strftime(ARSO_TIMESTAMP_FORMAT) if measurement.time_to else None,
+        }
+        values: Dict[str, Any] = {pollutant: getattr(measurement, pollutant) for pollutant in POLLUTANT_FIELDS}
+        values.update(measurement.extra_pollutants)
+        for pollutant, value in values.items():
+            prefix = BELOW_DETECTION_PREFIX if pollutant in measurement.below_detection else ""
+            texts[pollutant] = None if value is None else f"{prefix}{value!r}"
+        self.append_texts(texts, {name: texts[name] for name in measurement.extra_pollutants})
+
+    def build(self) -> MeasurementBatch:
+        values: Dict[str, np.ndarray] = {}
+        valid: Dict[str, np.ndarray] = {}
+        below_detection: Dict[str, np.ndarray] = {}
+
+        # one bulk conversion per pollutant instead of one per value
+        for pollutant, texts in self._texts.items():
+            values[pollutant], valid[pollutant], below_detection[pollutant] = convert_pollutant_column(
+                texts, integer=pollutant in INTEGER_POLLUTANTS
+            )
+
+        # convert only the distinct timestamps, then expand them with the row codes
+        distinct_times = np.asarray(list(self._time_codes), dtype="datetime64[m]")
+
+        return MeasurementBatch(
+            station_ids=self._station_ids,
+            station_names=self._station_names,
+            station_index=np.asarray(self._station_index, dtype=np.int32),
+            time_from=distinct_times[np.asarray(self._time_from, dtype=np.intp)],
+            time_to=distinct_times[np.asarray(self._time_to, dtype=np.intp)],
+            values=values,
+            valid=valid,
+            below_detection=below_detection,
+        )
@@ -1,8 +1,17 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, FrozenSet, Tuple
 from datetime import datetime
 from xml.etree import ElementTree
 from backend.parsers.xml_utils import decode_unicode_escapes
+from backend.parsers.converters import parse_arso_timestamp, is_below_detection
+from backend.parsers.field_schema import (
+    scan_postaja, EXTRA_POLLUTANT_CONVERTER, INTEGER_POLLUTANTS, POLLUTANT_CONVERTERS,
+)
+
+
+
+# Fields of ParsedMeasurementModel that are not pollutant values
+NON_POLLUTANT_FIELDS = ("station_id", "station_name", "time_from", "time_to", "below_detection", "extra_pollutants")
 
 
 
@@ -27,6 +36,8 @@ class ParsedMeasurementModel:
     pm25: Optional[int] = None
     nox: Optional[int] = None
     benzen: Optional[float] = None       
+    below_detection: FrozenSet[str] = frozenset() # pollutants reported as "<N", value is the detection limit N
+    extra_pollutants: Dict[str, float] = field(default_factory=dict) # pollutant tags not in the field schema
 
 
 
@@ -34,122 +45,91 @@ class ParsedMeasurementModel:
         """
         Validates air pollution measurements data after fetching
         """
-        if not self.station_id or not str(self.station_id).strip():
+        self.station_name = self.validate_fields(self.station_id, self.station_name, self.time_from, self.time_to)
+
+
+    @staticmethod
+    def validate_fields(station_id: str, station_name: str, time_from: Optional[datetime], time_to: Optional[datetime]) -> str:
+        """
+        Validation shared with MeasurementBatch, which does not create dataclass instances
+        Returns:
+            str: cleaned and decoded station name
+        """
+        if not station_id or not str(station_id).strip():
             raise ValueError("Invalid station ID")
         
-        self.station_name = self.station_name.strip()
-        self.station_name = decode_unicode_escapes(self.station_name)
+        station_name = station_name.strip()
+        station_name = decode_unicode_escapes(station_name)
         
         
-        if not self.station_name or not str(self.station_name.strip()):
+        if not station_name or not str(station_name.strip()):
             raise ValueError("Invalid station name")
 
         # Validate time range presence and order
-        if self.time_from is None or self.time_to is None:
+        if time_from is None or time_to is None:
             raise ValueError("Missing time_from or time_to")
-        if self.time_from >= self.time_to:
+        if time_from >= time_to:
             raise ValueError("Time range is invalid")
+
+        return station_name
         
 
     @classmethod
     def from_xml_element(cls, element: ElementTree.Element) -> "ParsedMeasurementModel":
-        # extract attributes
-        station_id = element.get("sifra") or ""
-        station_name = element.findtext("merilno_mesto") or ""
-        time_from_text = element.findtext("datum_od")
-        time_to_text = element.findtext("datum_do")
-        co_text = element.findtext("co")
-        o3_text = element.findtext("o3")
-        no2_text = element.findtext("no2")
-        so2_text = element.findtext("so2")
-        pm25_text = element.findtext("pm2.5")
-        pm10_text = element.findtext("pm10")
-        benzen_text = element.findtext("benzen")
-        nox_text = element.findtext("nox")
-
-
-        # This helper function takes a string from XML
-        # as text variable and tries to convert it to an integer
-        def _to_int(text: Optional[str]) -> Optional[int]:
-            if not text:
-                return None
-            try:
-                # handles values like "<2"
-                if text.strip().startswith("<"):
-                    return int(float(text.strip()[1:]))                
-
-                return int(text)
-            except ValueError:
-                return None
-
-        def _to_float(text: Optional[str]) -> Optional[float]:
-            if not text:
-                return None
-            try:
-                # handles values like "<2" 
-                if text.strip().startswith("<"):
-                    return float(text.strip()[:1])
-                return float(text)
-            except ValueError:
-                return None
-            
-        
-
-        # Convert time string to datetime objects
-        time_from = datetime.strptime(time_from_text, "%Y-%m-%d %H:%M") if time_from_text else None
-        time_to = datetime.strptime(time_to_text, "%Y-%m-%d %H:%M") if time_to_text else None
-
-        return cls(            
-            station_id=station_id,
-            station_name=station_name,
-            time_from=time_from,
-            time_to=time_to,
-            co=_to_float(co_text),
-            o3=_to_int(o3_text),
-            no2=_to_int(no2_text),
-            so2=_to_int(so2_text),
-            pm25=_to_int(pm25_text),
-            pm10=_to_int(pm10_text),
-            benzen=_to_float(benzen_text),
-            nox=_to_int(nox_text)
-        )
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-                                 
-
-
-
-    
-
-
-
-
-
-
-
-
-
-
-    
-
-
-
+        return cls.from_texts(*scan_postaja(element))
 
 
+    @classmethod
+    def from_texts(cls, texts: Dict[str, Optional[str]], extra_texts: Optional[Dict[str, Optional[str]]] = None) -> "ParsedMeasurementModel":
+        """Create from texts of an already scanned <postaja> (see field_schema.scan_postaja)"""
+        return cls(**cls.fields_from_texts(texts, extra_texts))
 
 
+    @staticmethod
+    def fields_from_xml_element(element: ElementTree.Element) -> Dict[str, Any]:
+        """
+        Extract and convert all fields of one <postaja> element,
+        keys are the dataclass field names
+        """
+        return ParsedMeasurementModel.fields_from_texts(*scan_postaja(element))
 
 
+    @staticmethod
+    def fields_from_texts(texts: Dict[str, Optional[str]], extra_texts: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+        """
+        Convert raw texts keyed by field names to dataclass field values
+        """
+        # Convert time string to datetime objects, memoized per distinct string
+        fields: Dict[str, Any] = {
+            "station_id": texts["station_id"] or "",
+            "station_name": texts["station_name"] or "",
+            "time_from": parse_arso_timestamp(texts["time_from"]),
+            "time_to": parse_arso_timestamp(texts["time_to"]),
+        }
+
+        below_detection = set()
+        for field_name in POLLUTANT_FIELDS:
+            text = texts[field_name]
+            value = POLLUTANT_CONVERTERS[field_name](text)
+            fields[field_name] = value
+            if value is not None and is_below_detection(text):
+                below_detection.add(field_name)
+
+        # Unknown child tags are kept when their text is a number
+        extra_pollutants: Dict[str, float] = {}
+        for field_name, text in (extra_texts or {}).items():
+            value = EXTRA_POLLUTANT_CONVERTER(text)
+            if value is not None:
+                extra_pollutants[field_name] = value
+                if is_below_detection(text):
+                    below_detection.add(field_name)
+
+        fields["below_detection"] = frozenset(below_detection)
+        fields["extra_pollutants"] = extra_pollutants
+        return fields
+
+
+# Pollutant fields in dataclass order, e.g. co, o3, no2 ...
+POLLUTANT_FIELDS: Tuple[str, ...] = tuple(
+    name for name in ParsedMeasurementModel.__dataclass_fields__ if name not in NON_POLLUTANT_FIELDS
+)
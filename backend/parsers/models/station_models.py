@@ -1,9 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Mapping
 from datetime import datetime
 from xml.etree import ElementTree
 from backend.parsers.xml_utils import decode_unicode_escapes
+from backend.parsers.field_schema import STATION_ATTRIBUTE_FIELDS, STATION_ID_ATTRIBUTE
 
 
 #=============================================================================
@@ -158,59 +159,33 @@ class ParsedStationModel:
         Returns:
             ARSO StationInfo class instance with extracted data
         """
-        station_id = element.get("sifra")
-        station_name = element.findtext("merilno_mesto") #child element in the <postaja> XML structure
-        lat_str = element.get("wgs84_sirina")
-        lon_str = element.get("wgs84_dolzina")
-        d96_e_str = element.get("d96_e")
-        d96_n_str = element.get("d96_n")
-        elev_str = element.get("nadm_visina")
-
-        # Convert string values to proper numeric types for typing safety.
-        latitude: Optional[float] = None
-        if lat_str is not None and str(lat_str).strip() != "":
-            try:
-                latitude = float(lat_str)
-            except (ValueError, TypeError):
-                raise ValueError(f"Invalid latitude value: {lat_str}")
+        return cls.from_postaja(element.attrib, element.findtext("merilno_mesto")) #child element in the <postaja> XML structure
 
-        longitude: Optional[float] = None
-        if lon_str is not None and str(lon_str).strip() != "":
-            try:
-                longitude = float(lon_str)
-            except (ValueError, TypeError):
-                raise ValueError(f"Invalid longitude value: {lon_str}")
-
-        d96_easting: Optional[float] = None
-        if d96_e_str is not None and str(d96_e_str).strip() != "":
-            try:
-                d96_easting = float(d96_e_str)
-            except (ValueError, TypeError):
-                raise ValueError(f"Invalid d96_easting value: {d96_e_str}")
 
-        d96_northing: Optional[float] = None
-        if d96_n_str is not None and str(d96_n_str).strip() != "":
-            try:
-                d96_northing = float(d96_n_str)
-            except (ValueError, TypeError):
-                raise ValueError(f"Invalid d96_northing value: {d96_n_str}")
+    @classmethod
+    def from_postaja(cls, attributes: Mapping[str, str], station_name: Optional[str]) -> "ParsedStationModel":
+        """
+        Create from attributes of an already scanned <postaja> (see field_schema.scan_postaja)
+        Args:
+            attributes: <postaja> attributes, e.g. element.attrib
+            station_name: text of the <merilno_mesto> child
+        """
+        fields: Dict[str, Any] = {}
 
-        elevation_meters: Optional[int] = None
-        if elev_str is not None and str(elev_str).strip() != "":
+        # Convert string values to proper numeric types for typing safety, schema compiled in field_schema
+        for attribute, (field_name, converter) in STATION_ATTRIBUTE_FIELDS.items():
+            text = attributes.get(attribute)
+            if text is None or str(text).strip() == "":
+                continue
             try:
-                elevation_meters = int(float(elev_str))
+                fields[field_name] = converter(text)
             except (ValueError, TypeError):
-                raise ValueError(f"Invalid elevation_meters value: {elev_str}")
+                raise ValueError(f"Invalid {field_name} value: {text}")
 
         return cls(
-            station_id = station_id,
+            station_id = attributes.get(STATION_ID_ATTRIBUTE),
             station_name = station_name,
-            latitude = latitude,
-            longitude = longitude,
-            d96_easting = d96_easting,
-            d96_northing = d96_northing,
-            elevation_meters = elevation_meters
-
+            **fields
         )
     
     
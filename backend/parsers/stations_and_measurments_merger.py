@@ -1,6 +1,7 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
 from backend.parsers.models.station_models import ParsedStationModel
 from backend.parsers.models.measurement_model import ParsedMeasurementModel
+from backend.parsers.models.measurement_batch import MeasurementBatch
 import logging
 
 #================================================================
@@ -9,7 +10,7 @@ import logging
 
 def merge_stations_and_measurements(
         stations: List[ParsedStationModel], 
-        measurements: List[ParsedMeasurementModel]
+        measurements: Union[List[ParsedMeasurementModel], MeasurementBatch]
 
 ) -> Dict[str, Dict[str, Any]]: # Return type: 
     """
@@ -18,6 +19,8 @@ def merge_stations_and_measurements(
     Args:
         stations List[ParsedStationModel] a list of station information from ParsedStationModel dataclass
         measurements List[ParsedMeasurementModel] a list of ParsedMeasurementModel dataclass objects
+            or a MeasurementBatch, then "measurements_list" is a lazy MeasurementRowsView
+            over the rows of that station
 
     Returns:
         Dict[str,[str,Object]] a dictionary where the key of the outer is the station_id
@@ -47,6 +50,15 @@ def merge_stations_and_measurements(
             "measurements_list": []
         }
 
+    # Columnar batch: group row indices per station once, no per-row Python objects
+    if isinstance(measurements, MeasurementBatch):
+        for station_id, indices in measurements.indices_by_station().items():
+            if station_id in merged_data:
+                merged_data[station_id]["measurements_list"] = measurements.rows(indices)
+            else:
+                logging.warning(f"No station info found for {station_id}")
+        return merged_data
+
     # Append measurrements to coresponding station:
     # for each Measurement object in measurements list
     # check if the station_id already exists in merged_data dictionary    
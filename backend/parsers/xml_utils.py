@@ -1,21 +1,55 @@
-import codecs
 import re
+import sys
 import logging
+from functools import lru_cache
 
 
-# Function to decode Unicode escape sequencec -> UTF-8  
+logger = logging.getLogger(__name__)
+
+# Literal \uXXXX escape, group(1) is the hex code point
+UNICODE_ESCAPE_PATTERN = re.compile(r'\\u([0-9a-fA-F]{4})')
+
+# Distinct raw strings remembered, station names and metadata texts are only a few hundred
+DECODE_CACHE_SIZE = 4096
+
+
+def _replace_unicode(match: "re.Match[str]") -> str:
+    """Convert unicode escape to character"""
+    return chr(int(match.group(1), 16))
+
+
+@lru_cache(maxsize=DECODE_CACHE_SIZE)
+def _decode_and_intern(text: str) -> str:
+    """
+    Decode once per distinct raw string, repeated names come from the cache.
+    Result is interned, so the same station name parsed every hour is one shared object.
+    """
+    # Fast path: nothing to decode
+    if '\\u' not in text:
+        return sys.intern(text)
+
+    decoded = UNICODE_ESCAPE_PATTERN.sub(_replace_unicode, text)
+
+    # Lazy logging, repr() is only called when DEBUG is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Decoded unicode escapes %r -> %r", text, decoded)
+
+    return sys.intern(decoded)
+
+
+# Function to decode Unicode escape sequencec -> UTF-8
 def decode_unicode_escapes(text: str) -> str:
     """
     Decode Unicode escape sequences (\\uXXXX) to proper UTF-8
-    
+
     Args:
         text(str): Input string potentialy Unicode escape sequences
-    
+
     Returns:
         str: Decoded text with proper UTF-8 characters
-    
+
     Example:
-        input: "LJ Be\u017eigrad"
+        input: "LJ Be\\u017eigrad"
         output: "LJ Bežigrad"
     """
 
@@ -23,35 +57,9 @@ def decode_unicode_escapes(text: str) -> str:
     if not text:
         return text
     try:
-        print(f"DEBUG: Input: {repr(text)}")  # Debug line
-        
-        # Method 1: Try direct codecs decode  literal \uXXXX
-        if '\\u' in text: # Check for literal \u in the string
-            try:
-                decoded = codecs.decode(text, 'unicode_escape')
-                print(f"DEBUG: Codecs decode result: {repr(decoded)}")
-                return decoded
-            
-            except Exception as e:
-                print(f"DEBUG: Codecs decode failed: {e}")
-        
-                # Method 2: Manual regex replacement for Unicode escapes
-                def replace_unicode(match):
-                    """Convert unicode escape to character"""
-                    code_point = int(match.group(1), 16) # match extracts hex string and converts hex to int, group(1) means first capture group of signs after \u
-                    return chr(code_point) # Convert int code_point to character
-                
-                
-                decoded = re.sub(r'\\u([0-9a-fA-F]{4})', replace_unicode, text)
-                print(f"DEBUG: Regex decode result: {repr(decoded)}")
-                return decoded
-            
-        print(f"DEBUG: No escapes found: {repr(text)}")
-        return text          
-            
-           
+        return _decode_and_intern(text)
+
     except Exception as e:
-        logging.warning(f"Failed to decode Unicode escapes in: {text} - Error: {e}")
+        logger.warning("Failed to decode Unicode escapes in: %s - Error: %s", text, e)
         # Ensure a string is returned on all code paths
         return text
-    
\ No newline at end of file
@@ -0,0 +1,44 @@
+import logging
+from flask import Blueprint, jsonify
+from backend.database.session import check_connection
+from backend.cache import tiered_cache
+from backend.utils.generation import get_latest_generation
+from backend.utils.http_cache import no_store
+from backend.utils.readiness import readiness
+
+
+# Create blueprint
+readiness_bp = Blueprint('readiness', __name__)
+
+
+# Liveness: the process serves requests, no dependencies are checked
+@readiness_bp.route("/api/live")
+@no_store
+def live():
+    return jsonify({"status": "alive"}), 200
+
+
+# Readiness: database reachable and first ingest finished,
+# in this process or in the ingestion worker (a generation was published)
+@readiness_bp.route("/api/ready")
+@no_store
+def ready():
+    try:
+        database_ok = check_connection()
+        database_error = None
+    except Exception as e:
+        logging.warning(f"Readiness database check failed: {e}")
+        database_ok, database_error = False, str(e)
+
+    generation = get_latest_generation(tiered_cache)
+    state = readiness.to_dict()
+    state["first_ingest_done"] = readiness.first_ingest_done or generation is not None
+
+    is_ready = database_ok and state["first_ingest_done"]
+    return jsonify({
+        "status": "ready" if is_ready else "starting",
+        "database_ok": database_ok,
+        "database_error": database_error,
+        "generation": generation.number if generation else None,
+        **state
+    }), 200 if is_ready else 503
@@ -0,0 +1,58 @@
+from flask import Blueprint, Response, jsonify
+from backend.cache import tiered_cache
+from backend.utils.compression import IDENTITY, encoded_response, negotiate_encoding
+from backend.utils.generation import get_latest_generation
+from backend.utils.http_cache import apply_data_cache_headers, is_not_modified, not_modified_response
+from backend.utils.json_provider import wants_pretty
+from backend.utils.latest_readings import ALL_STATIONS_VIEW, get_rendered_readings, readings_etag
+
+
+# Create blueprint
+readings_bp = Blueprint('readings', __name__)
+
+
+def _format() -> str:
+    """?pretty=1 for indented output, compact otherwise"""
+    return 'pretty' if wants_pretty() else 'compact'
+
+
+def _latest_readings(view: str) -> Response:
+    generation = get_latest_generation(tiered_cache)
+    if generation is None:
+        response = jsonify({"error": "No data ingested yet"})
+        response.status_code = 503
+        return response
+
+    fmt = _format()
+    encoding = negotiate_encoding()
+
+    # the client has this generation, answered from the marker alone;
+    # small bodies are only stored uncompressed, their identity ETag is valid too
+    for candidate in dict.fromkeys((encoding, IDENTITY)):
+        etag = readings_etag(generation, view, fmt, candidate)
+        if is_not_modified(generation, etag):
+            response = not_modified_response(generation, etag)
+            response.vary.add('Accept-Encoding')
+            return response
+
+    body, encoding = get_rendered_readings(tiered_cache, generation, view, fmt, encoding)
+    if body is None:
+        response = jsonify({"error": f"Station {view} not found"})
+        response.status_code = 404
+        return response
+
+    # pre-compressed bytes, cacheable until the next expected ARSO update
+    response = encoded_response(Response(mimetype='application/json'), body, encoding)
+    return apply_data_cache_headers(response, generation, readings_etag(generation, view, fmt, encoding))
+
+
+# Latest readings of all stations, bytes pre-rendered per ingest generation
+@readings_bp.route("/api/readings/latest")
+def latest_readings():
+    return _latest_readings(ALL_STATIONS_VIEW)
+
+
+# Latest readings of one station (sifra, e.g. E403)
+@readings_bp.route("/api/readings/latest/<station_id>")
+def latest_station_readings(station_id: str):
+    return _latest_readings(station_id)
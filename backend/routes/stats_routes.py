@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Optional
+from flask import Blueprint, request, jsonify
+from backend.database.session import SessionLocal
+from backend.database.rollups import get_rollup_stats
+from backend.utils.decorators import handle_exceptions
+from backend.utils.http_cache import generation_cached
+
+
+# Create blueprint
+stats_bp = Blueprint('stats', __name__)
+
+
+def _date_arg(name: str) -> Optional[date]:
+    """?from=2025-01-01, raises ValueError on other formats"""
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else None
+
+
+# Statistics are read from the rollup tables only,
+# latency does not grow with the amount of stored history.
+# Rollups change with every ingest, gap fill and backfill, each publishes a new generation;
+# responses are cached until the next one
+@stats_bp.route("/api/stats/<granularity>")
+@generation_cached
+@handle_exceptions
+def get_stats_api(granularity: str):
+    """
+    /api/stats/daily?station=E403&pollutant=pm10&from=2025-01-01&to=2025-01-31
+    /api/stats/monthly?station=E403&pollutant=pm10
+    """
+    if granularity not in ("daily", "monthly"):
+        return jsonify({"error": "Granularity must be daily or monthly"}), 404
+
+    station_id = request.args.get('station')
+    pollutant = request.args.get('pollutant')
+    if not station_id or not pollutant:
+        return jsonify({"error": "Query parameters station and pollutant are required"}), 400
+
+    start, end = _date_arg('from'), _date_arg('to')
+
+    with SessionLocal() as db:
+        stats = get_rollup_stats(db, granularity, station_id, pollutant, start, end)
+
+    return jsonify({
+        "station": station_id,
+        "pollutant": pollutant,
+        "granularity": granularity,
+        "stats": [single_stats.to_dict() for single_stats in stats]
+    }), 200
@@ -0,0 +1,44 @@
+import pytest # testing framework
+import os
+import subprocess
+import sys
+from backend.utils.readiness import ReadinessState
+
+
+"""
+Importing the app has no side effects: no database connection,
+no Redis ping and no synchronous ingest. Until the database is reachable
+and the first ingest finished the readiness probe answers 503.
+"""
+STARTUP_SNIPPET = """
+from backend.app import app
+from backend.database.session import engine_created
+client = app.test_client()
+assert client.get('/api/live').status_code == 200
+ready = client.get('/api/ready')
+assert ready.status_code == 503, ready.status_code
+assert ready.get_json()['database_ok'] is False
+assert ready.get_json()['first_ingest_done'] is False
+print('ok')
+"""
+
+
+def test_import_and_readiness_without_database():
+    environment = {key: value for key, value in os.environ.items() if not key.startswith("DB_")}
+    environment.update({"RUN_SCHEDULER": "0"})
+    environment.pop("REDIS_URL", None)
+
+    result = subprocess.run([sys.executable, "-c", STARTUP_SNIPPET], env=environment,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
+
+
+def test_first_ingest_is_done_only_when_data_was_stored():
+    state = ReadinessState()
+    state.record_ingest(ok=False, error="No new data was stored")
+    assert not state.first_ingest_done and state.last_ingest_ok is False
+
+    state.record_ingest(ok=True)
+    assert state.first_ingest_done and state.last_ingest_ok is True
@@ -1,18 +1,21 @@
 import pytest # testing framework
 from unittest.mock import patch, MagicMock # used to mock network calls
+from typing import Optional
 from backend.network.arso_client import fetch_arso_xml
+from backend.network.config import ARSO_STATIONS_URL
+from backend.network.fetch_state import get_fetch_state, reset_fetch_states
 
 
 """
 Test successful fetching of ARSO XML data.
-"With patch" block replaces the real request.get
+"With patch" block replaces the real requests.Session.get
 function with mock object for the duration of the with
-object. When fetch_arso_xml() calls request.get, 
+object. When fetch_arso_xml() calls the pooled client session.get, 
 it actually calls mock_get which returns mock_response
 """
 def test_fetch_arso_xml_success():
     fake_xml = "<xml>test</xml>"
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = MagicMock()
         mock_response.text = fake_xml
         mock_response.encoding = "utf-8"
@@ -29,7 +32,7 @@ def test_fetch_arso_xml_success():
 
 
 def test_fetch_arso_html_http_error():
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_response = MagicMock()
         mock_response.raise_for_status.side_effect = Exception("Http Error")
         mock_get.return_value = mock_response
@@ -46,3 +49,52 @@ def test_fetch_arso_html_http_error():
 
 
 
+
+
+"""
+Conditional GET: after a response is marked as ingested the next fetch
+sends its ETag/Last-Modified, and a 304 or an identical body
+returns (True, None, None) so update_data() stops before parsing.
+"""
+def _mock_response(status_code: int, text: str = "", headers: Optional[dict] = None) -> MagicMock:
+    mock_response = MagicMock()
+    mock_response.status_code = status_code
+    mock_response.text = text
+    mock_response.headers = headers or {}
+    mock_response.raise_for_status.return_value = None
+    return mock_response
+
+
+def test_fetch_arso_xml_sends_conditional_headers_and_handles_304():
+    reset_fetch_states()
+    first = _mock_response(200, "<xml>test</xml>", {"ETag": '"abc"', "Last-Modified": "Mon, 06 Jan 2025 10:00:00 GMT"})
+
+    with patch("requests.Session.get", return_value=first) as mock_get:
+        assert fetch_arso_xml() == (True, "<xml>test</xml>", None)
+        assert mock_get.call_args.kwargs["headers"] == {}
+
+    get_fetch_state(ARSO_STATIONS_URL).mark_ingested()
+
+    with patch("requests.Session.get", return_value=_mock_response(304)) as mock_get:
+        assert fetch_arso_xml() == (True, None, None)
+        assert mock_get.call_args.kwargs["headers"] == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 06 Jan 2025 10:00:00 GMT",
+        }
+
+
+def test_fetch_arso_xml_skips_identical_body():
+    reset_fetch_states()
+
+    with patch("requests.Session.get", return_value=_mock_response(200, "<xml>test</xml>", {"ETag": '"v1"'})):
+        assert fetch_arso_xml() == (True, "<xml>test</xml>", None)
+
+    # not ingested yet, the same body is returned again
+    with patch("requests.Session.get", return_value=_mock_response(200, "<xml>test</xml>", {"ETag": '"v2"'})):
+        assert fetch_arso_xml() == (True, "<xml>test</xml>", None)
+
+    get_fetch_state(ARSO_STATIONS_URL).mark_ingested()
+
+    # identical data re-served with new headers
+    with patch("requests.Session.get", return_value=_mock_response(200, "<xml>test</xml>", {"ETag": '"v3"'})):
+        assert fetch_arso_xml() == (True, None, None)
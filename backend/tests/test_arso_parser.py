@@ -0,0 +1,83 @@
+import pytest # testing framework
+from datetime import datetime
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Tests for the single-pass ARSO parser.
+One document should give stations, measurements
+and root metadata in a single ParseResult.
+"""
+def test_parse_arso_xml_returns_stations_measurements_and_metadata():
+    xml_content = generate_arso_xml(station_count=3, hours=2)
+
+    result = parse_arso_xml(xml_content)
+    assert result.success is True
+    assert result.error_message is None
+
+    feed = result.data
+    # every <postaja> gives one station and one measurement
+    assert len(feed.stations) == 6
+    assert len(feed.measurements) == 6
+    assert {station.station_id for station in feed.stations} == {"E0000", "E0001", "E0002"}
+    assert feed.stations[0].station_name == "LJ Bežigrad 0"
+
+    assert feed.metadata is not None
+    assert feed.metadata.preparation_timestamp == datetime(2025, 1, 1, 2, 0)
+
+
+def test_parse_arso_xml_skips_broken_elements():
+    xml_content = """<arsopodatki verzija="1.4">
+    <postaja sifra="E1" wgs84_sirina="46.0">
+        <merilno_mesto>Celje</merilno_mesto>
+        <datum_od>2025-01-01 00:00</datum_od>
+        <datum_do>2025-01-01 01:00</datum_do>
+        <o3>20</o3>
+    </postaja>
+    <postaja sifra="E2" wgs84_sirina="not-a-number">
+        <merilno_mesto>Koper</merilno_mesto>
+    </postaja>
+    </arsopodatki>"""
+
+    result = parse_arso_xml(xml_content)
+    assert result.success is True
+    assert result.data.skipped_stations == 1
+    assert result.data.skipped_measurements == 1
+    assert result.error_message is not None
+
+
+@pytest.mark.parametrize("xml_content", ["<arsopodatki>", "<arsopodatki></arsopodatki>"])
+def test_parse_arso_xml_failure(xml_content: str):
+    result = parse_arso_xml(xml_content)
+    assert result.success is False
+    assert result.error_message is not None
+
+
+"""
+Pollutant tags that are not in the field schema are kept, not dropped.
+"""
+NEW_POLLUTANT_XML = """<arsopodatki>
+    <postaja sifra="E1"><merilno_mesto>Celje</merilno_mesto>
+        <datum_od>2025-01-01 00:00</datum_od><datum_do>2025-01-01 01:00</datum_do>
+        <o3>20</o3><pm1.0>4.5</pm1.0><opomba>servis</opomba></postaja>
+    <postaja sifra="E2"><merilno_mesto>Koper</merilno_mesto>
+        <datum_od>2025-01-01 00:00</datum_od><datum_do>2025-01-01 01:00</datum_do>
+        <o3>25</o3></postaja>
+    </arsopodatki>"""
+
+
+def test_unknown_pollutant_tags_are_stored_on_models():
+    measurements = parse_arso_xml(NEW_POLLUTANT_XML).data.measurements
+    assert measurements[0].extra_pollutants == {"pm1_0": 4.5}
+    assert measurements[1].extra_pollutants == {}
+
+
+def test_unknown_pollutant_tags_get_batch_columns():
+    batch = parse_arso_xml(NEW_POLLUTANT_XML, columnar=True).data.measurements
+    assert batch.valid["pm1_0"].tolist() == [True, False]
+    assert batch.values["pm1_0"][0] == 4.5
+    # non-numeric texts never become values
+    assert not batch.valid["opomba"].any()
+    assert ("E1", "pm1_0") in {(record[0], record[1]) for record in batch.iter_pollutant_records()}
+    assert batch.row(0) == parse_arso_xml(NEW_POLLUTANT_XML).data.measurements[0]
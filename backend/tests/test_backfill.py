@@ -0,0 +1,44 @@
+import pytest # testing framework
+import gzip
+from pathlib import Path
+from typing import List
+from backend.backfill import run_backfill, scan_archive
+from backend.parsers.models.measurement_batch import MeasurementBatch
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Archived snapshots are parsed in worker processes, overlapping hours are
+stored once and a second run resumes from the checkpoint.
+"""
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    # two snapshots with the same 3 hours, the second one compressed
+    xml_content = generate_arso_xml(station_count=4, hours=3)
+    (tmp_path / "2024-01-01.xml").write_text(xml_content, encoding="utf-8")
+    with gzip.open(tmp_path / "2024-01-02.xml.gz", "wt", encoding="utf-8") as archive_file:
+        archive_file.write(xml_content)
+    (tmp_path / "notes.txt").write_text("not a snapshot")
+    return tmp_path
+
+
+def test_scan_finds_plain_and_compressed_snapshots(archive: Path):
+    assert [path.name for path in scan_archive(archive)] == ["2024-01-01.xml", "2024-01-02.xml.gz"]
+
+
+def test_backfill_deduplicates_and_resumes(archive: Path):
+    loaded: List[MeasurementBatch] = []
+
+    def loader(stations, batch: MeasurementBatch) -> bool:
+        loaded.append(batch)
+        return True
+
+    stats = run_backfill(archive, workers=2, batch_size=1_000, loader=loader)
+
+    assert stats.files_loaded == 2
+    assert stats.rows_parsed == 24
+    assert [len(batch) for batch in loaded] == [12]
+
+    resumed = run_backfill(archive, workers=2, loader=loader)
+    assert resumed.files_skipped == 2 and resumed.files_loaded == 0
+    assert len(loaded) == 1
@@ -0,0 +1,80 @@
+import pytest # testing framework
+import gzip
+from types import SimpleNamespace
+from flask import Flask, jsonify
+from flask.testing import FlaskClient
+from backend.cache import cache, configure_cache
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.stations_and_measurments_merger import merge_stations_and_measurements
+from backend.routes.readings_routes import readings_bp
+from backend.utils import compression
+from backend.utils.compression import compress_response
+from backend.utils.generation import next_generation, publish_generation
+from backend.utils.latest_readings import LATEST_MERGED_DATA_KEY, store_rendered_readings
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Compressed variants are negotiated from Accept-Encoding and served as stored
+bytes, every variant has its own ETag and responses vary on Accept-Encoding.
+"""
+@pytest.fixture
+def fake_brotli(monkeypatch: pytest.MonkeyPatch) -> None:
+    # only negotiation is tested here, not the brotli codec
+    monkeypatch.setattr(compression, "brotli", SimpleNamespace(compress=lambda body, quality: b"br:" + body))
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> FlaskClient:
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    app = Flask(__name__)
+    configure_cache(app)
+    app.register_blueprint(readings_bp)
+    app.after_request(compress_response)
+
+    @app.route("/test/large")
+    def large():
+        return jsonify({"values": list(range(1000))})
+
+    feed = parse_arso_xml(generate_arso_xml(station_count=3, hours=24), columnar=True).data
+    merged_data = merge_stations_and_measurements(feed.stations, feed.measurements)
+    with app.app_context():
+        cache.clear()
+        cache.set(LATEST_MERGED_DATA_KEY, merged_data, timeout=0)
+        generation = next_generation(cache)
+        store_rendered_readings(cache, merged_data, generation)
+        publish_generation(cache, generation=generation)
+    return app.test_client()
+
+
+def test_gzip_variant(client: FlaskClient):
+    identity = client.get("/api/readings/latest")
+    compressed = client.get("/api/readings/latest", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert "Content-Encoding" not in identity.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == identity.data
+    assert compressed.headers["ETag"] == '"g1-all-compact-gzip"'
+    for response in (identity, compressed):
+        assert "Accept-Encoding" in response.vary
+
+    not_modified = client.get("/api/readings/latest", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert "Accept-Encoding" in not_modified.vary
+
+
+def test_brotli_is_preferred(fake_brotli, client: FlaskClient):
+    response = client.get("/api/readings/latest/E0001", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.data.startswith(b"br:")
+
+    refused = client.get("/api/readings/latest/E0001", headers={"Accept-Encoding": "br;q=0, gzip"})
+    assert refused.headers["Content-Encoding"] == "gzip"
+
+
+def test_other_json_is_gzipped_on_the_fly(client: FlaskClient):
+    response = client.get("/test/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).startswith(b'{"values":[0,1,2')
+    assert "Accept-Encoding" in response.vary
@@ -0,0 +1,60 @@
+import pytest # testing framework
+from datetime import datetime
+from typing import Optional
+from backend.parsers.converters import (
+    parse_arso_timestamp, to_int, to_float, is_below_detection, convert_pollutant_column
+)
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.field_schema import POLLUTANT_CONVERTERS
+from backend.parsers.models.measurement_model import ParsedMeasurementModel, POLLUTANT_FIELDS
+
+
+@pytest.mark.parametrize("text, expected", [("1.5", 1.5), ("<0.1", 0.1), (" <2 ", 2.0), ("", None), (None, None), ("n/a", None)])
+def test_to_float(text, expected):
+    assert to_float(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [("12", 12), ("<2", 2), ("12.5", None), (None, None)])
+def test_to_int(text, expected):
+    assert to_int(text) == expected
+
+
+def test_parse_arso_timestamp_is_memoized():
+    first = parse_arso_timestamp("2025-01-01 13:00")
+    assert first == datetime(2025, 1, 1, 13, 0)
+    # the same string returns the cached object
+    assert parse_arso_timestamp("2025-01-01 13:00") is first
+    assert parse_arso_timestamp(None) is None
+
+
+def test_convert_pollutant_column_matches_single_value_converters():
+    texts = ["12", "<2", "12.5", None, "", "abc", " 7 "]
+
+    values, valid, below = convert_pollutant_column(texts, integer=True)
+    assert [int(v) if ok else None for v, ok in zip(values, valid)] == [to_int(text) for text in texts]
+    assert below.tolist() == [is_below_detection(text) and to_int(text) is not None for text in texts]
+
+    values, valid, below = convert_pollutant_column(texts, integer=False)
+    assert [float(v) if ok else None for v, ok in zip(values, valid)] == [to_float(text) for text in texts]
+
+
+def test_below_detection_flag_on_models_and_batch():
+    xml_content = """<arsopodatki>
+    <postaja sifra="E1"><merilno_mesto>Celje</merilno_mesto>
+        <datum_od>2025-01-01 00:00</datum_od><datum_do>2025-01-01 01:00</datum_do>
+        <so2>&lt;3</so2><benzen>&lt;0.1</benzen><o3>20</o3></postaja>
+    </arsopodatki>"""
+
+    model = parse_arso_xml(xml_content).data.measurements[0]
+    assert model.so2 == 3 and model.benzen == 0.1 and model.o3 == 20
+    assert model.below_detection == frozenset({"so2", "benzen"})
+
+    batch = parse_arso_xml(xml_content, columnar=True).data.measurements
+    assert batch.row(0) == model
+
+
+def test_every_pollutant_field_has_a_converter_of_its_type():
+    assert set(POLLUTANT_CONVERTERS) == set(POLLUTANT_FIELDS)
+    for field_name, converter in POLLUTANT_CONVERTERS.items():
+        expected = to_int if ParsedMeasurementModel.__dataclass_fields__[field_name].type == Optional[int] else to_float
+        assert converter is expected, field_name
@@ -0,0 +1,81 @@
+import pytest # testing framework
+import time
+from backend.network import feed_fetcher
+from backend.network.feeds import FeedConfig
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.feed_router import combine_feeds, parse_feed
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Feeds are downloaded concurrently, a slow feed only fails itself,
+and parsed feeds are combined into one batch for a single insert.
+Feeds that are not hourly are rejected instead of stored as hourly rows.
+"""
+def slow_fetch(url: str, timeout: float):
+    time.sleep(0.3 if "slow" in url else 0.2)
+    return True, f"<xml>{url}</xml>", None
+
+
+def test_feeds_are_fetched_concurrently(monkeypatch):
+    monkeypatch.setattr(feed_fetcher, "fetch_arso_xml", slow_fetch)
+    feeds = [FeedConfig(name=f"feed{i}", url=f"https://example.com/{i}.xml") for i in range(3)]
+
+    start_time = time.perf_counter()
+    payloads = feed_fetcher.fetch_all_feeds(feeds)
+    elapsed = time.perf_counter() - start_time
+
+    assert [payload.xml_content for payload in payloads] == [f"<xml>{feed.url}</xml>" for feed in feeds]
+    assert elapsed < 0.5  # sequential would take 0.6 seconds
+
+
+def test_feed_timeout_fails_only_that_feed(monkeypatch):
+    monkeypatch.setattr(feed_fetcher, "fetch_arso_xml", slow_fetch)
+    feeds = [
+        FeedConfig(name="fast", url="https://example.com/fast.xml"),
+        FeedConfig(name="slow", url="https://example.com/slow.xml", timeout=0.05),
+    ]
+
+    fast, slow = feed_fetcher.fetch_all_feeds(feeds)
+
+    assert fast.success and fast.xml_content
+    assert not slow.success and "Timed out" in (slow.error or "")
+
+
+def test_feed_timeout_bounds_the_cycle(monkeypatch):
+    def stuck_fetch(url: str, timeout: float):
+        time.sleep(1)
+        return True, "<xml/>", None
+
+    monkeypatch.setattr(feed_fetcher, "fetch_arso_xml", stuck_fetch)
+    feeds = [FeedConfig(name="stuck", url="https://example.com/stuck.xml", timeout=0.1)]
+
+    start_time = time.perf_counter()
+    stuck, = feed_fetcher.fetch_all_feeds(feeds)
+    elapsed = time.perf_counter() - start_time
+
+    assert not stuck.success
+    # the abandoned download is not waited for
+    assert elapsed < 0.5
+
+
+def test_combined_feeds_share_stations():
+    first = parse_arso_xml(generate_arso_xml(station_count=3, hours=2), columnar=True).data
+    second = parse_arso_xml(generate_arso_xml(station_count=4, hours=1), columnar=True).data
+
+    stations, batch = combine_feeds([first, second])
+
+    assert len(stations) == 4
+    assert len(batch) == 3 * 2 + 4 * 1
+    assert list(batch.iter_rows()) == [*first.measurements.iter_rows(), *second.measurements.iter_rows()]
+
+
+def test_daily_average_feed_is_rejected():
+    hourly = generate_arso_xml(station_count=2, hours=1)
+    daily = hourly.replace("<datum_od>2025-01-01 00:00</datum_od>", "<datum_od>2024-12-31 01:00</datum_od>")
+    feed = FeedConfig(name="daily", url="http://arso.test/daily.xml")
+
+    assert parse_feed(feed, hourly).success is True
+    result = parse_feed(feed, daily)
+    assert result.success is False
+    assert "hourly" in result.error_message
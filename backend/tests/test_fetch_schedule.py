@@ -0,0 +1,63 @@
+import pytest # testing framework
+from datetime import datetime, timedelta
+from backend.network.fetch_schedule import FetchPlanner, parse_minutes
+from backend.parsers.models.station_models import ARSOMetadata
+
+
+"""
+Fetches are aligned to the suggested ARSO publication time,
+re-polls back off while the data is not fresh yet.
+"""
+@pytest.fixture
+def planner() -> FetchPlanner:
+    planner = FetchPlanner()
+    planner.observe_metadata(ARSOMetadata(
+        suggested_fetch_time="5 minut čez polno uro",
+        suggested_update_fetch_interval="60 min",
+        preparation_timestamp=datetime(2025, 1, 1, 12, 20),
+    ))
+    return planner
+
+
+@pytest.mark.parametrize("text,minutes", [
+    ("60 min", 60),
+    ("5 minut čez polno uro", 5),
+    ("1 ura", 60),
+    ("vsako uro", None),
+    (None, None),
+])
+def test_parse_minutes(text, minutes):
+    assert parse_minutes(text) == minutes
+
+
+def test_publication_lag_is_learned(planner: FetchPlanner):
+    # the suggested offset is 5 minutes, ARSO actually prepared the data 20 minutes after the hour
+    assert planner.publication_lag == timedelta(minutes=20)
+    assert planner.next_run(fresh=True, now=datetime(2025, 1, 1, 12, 30)).replace(tzinfo=None) == datetime(2025, 1, 1, 13, 21)
+
+
+def test_waits_for_publication_of_current_period(planner: FetchPlanner):
+    run_at = planner.next_run(fresh=False, now=datetime(2025, 1, 1, 13, 2))
+    assert run_at.replace(tzinfo=None) == datetime(2025, 1, 1, 13, 21)
+
+
+def test_backs_off_while_not_fresh(planner: FetchPlanner):
+    now = datetime(2025, 1, 1, 13, 30)
+    delays = [planner.next_run(fresh=False, now=now).replace(tzinfo=None) - now for _ in range(3)]
+    assert delays == [timedelta(minutes=1), timedelta(minutes=2), timedelta(minutes=4)]
+
+    planner.observe_metadata(ARSOMetadata(preparation_timestamp=datetime(2025, 1, 1, 13, 25)))
+    planner.mark_ingested(datetime(2025, 1, 1, 13, 25))
+    assert planner.next_run(fresh=True, now=now).replace(tzinfo=None) == datetime(2025, 1, 1, 14, 23, 30)  # median of 20 and 25 minutes
+
+
+def test_fetched_but_not_stored_is_polled_again(planner: FetchPlanner):
+    now = datetime(2025, 1, 1, 13, 30)
+    planner.mark_ingested(datetime(2025, 1, 1, 12, 20))
+
+    # fetched, but the insert failed
+    planner.observe_metadata(ARSOMetadata(preparation_timestamp=datetime(2025, 1, 1, 13, 25)))
+    assert planner.next_run(fresh=False, now=now).replace(tzinfo=None) == now + timedelta(minutes=1)
+
+    planner.mark_ingested(datetime(2025, 1, 1, 13, 25))
+    assert planner.next_run(fresh=False, now=now).replace(tzinfo=None) == datetime(2025, 1, 1, 14, 23, 30)
@@ -0,0 +1,82 @@
+import pytest # testing framework
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+from backend import backfill
+from backend.database.db_models import DbModelReportedHour
+from backend.database.gaps import _GAPS_QUERY, MeasurementGap
+from backend.gap_fill import fill_gaps
+from backend.network.payload_archive import archive_payload, find_snapshots, snapshot_timestamp
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.models.measurement_batch import MeasurementBatch
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Fetched payloads are archived, missing hours are refilled from the
+snapshots prepared around them, in the worker process, and scanned
+again afterwards. Hours ARSO published empty are not missing.
+"""
+PREPARED = datetime(2024, 1, 1, 13, 20)
+
+
+@pytest.fixture
+def archive(tmp_path: Path) -> Path:
+    xml_content = generate_arso_xml(station_count=2, hours=2)
+    archive_payload("hourly_latest", xml_content, PREPARED, directory=tmp_path)
+    archive_payload("hourly_latest", xml_content, PREPARED + timedelta(days=3), directory=tmp_path)
+    return tmp_path
+
+
+def test_snapshots_are_named_by_preparation_time(archive: Path):
+    path = archive_payload("hourly_latest", "<arsopodatki/>", PREPARED, directory=archive)
+
+    assert path == archive / "hourly_latest" / "hourly_latest_20240101T1320.xml.gz"
+    assert snapshot_timestamp(path) == PREPARED
+    assert find_snapshots(datetime(2024, 1, 1, 12), datetime(2024, 1, 1, 13), timedelta(days=1), archive) == [path]
+
+
+def test_gaps_are_refilled_from_archive(archive: Path, monkeypatch: pytest.MonkeyPatch):
+    # the worker runs jobs in threads, forking a process pool from it is not safe
+    monkeypatch.setattr(backfill, "ProcessPoolExecutor", lambda *args, **kwargs: pytest.fail("forked a process pool"))
+    gap = MeasurementGap("E403", "pm10", datetime(2024, 1, 1, 12), datetime(2024, 1, 1, 13), hours=2)
+    scans: List[List[MeasurementGap]] = [[gap], []]
+    loaded: List[MeasurementBatch] = []
+
+    def loader(stations, batch: MeasurementBatch) -> bool:
+        loaded.append(batch)
+        return True
+
+    stats = fill_gaps(datetime(2024, 1, 1), datetime(2024, 1, 2), loader=loader,
+                      scanner=lambda start, end: scans.pop(0), archive_dir=archive)
+
+    # only the snapshot prepared right after the gap is re-parsed
+    assert stats.snapshots_loaded == 1
+    assert stats.rows_from_archive == sum(len(batch) for batch in loaded) > 0
+    assert (stats.hours_missing, stats.hours_missing_after) == (2, 0)
+
+
+EMPTY_HOUR_XML = """<arsopodatki>
+    <postaja sifra="E1" wgs84_sirina="46.0" wgs84_dolzina="14.5">
+        <merilno_mesto>Celje</merilno_mesto>
+        <datum_od>2024-01-01 11:00</datum_od>
+        <datum_do>2024-01-01 12:00</datum_do>
+        <pm10>20</pm10>
+    </postaja>
+    <postaja sifra="E1" wgs84_sirina="46.0" wgs84_dolzina="14.5">
+        <merilno_mesto>Celje</merilno_mesto>
+        <datum_od>2024-01-01 12:00</datum_od>
+        <datum_do>2024-01-01 13:00</datum_do>
+        <pm10></pm10>
+    </postaja>
+    </arsopodatki>"""
+
+
+def test_hour_published_empty_is_recorded_not_missing():
+    batch = parse_arso_xml(EMPTY_HOUR_XML, columnar=True).data.measurements
+
+    # no pm10 row for 13:00, but the hour is recorded as published with the rows
+    assert [(station, hour) for station, _, hour, _ in batch.iter_pollutant_records()] == [("E1", datetime(2024, 1, 1, 12))]
+    assert list(batch.iter_station_hours()) == [("E1", datetime(2024, 1, 1, 12)), ("E1", datetime(2024, 1, 1, 13))]
+    # the scan only reports hours that were not recorded as published
+    assert f"FROM {DbModelReportedHour.__tablename__} AS r" in str(_GAPS_QUERY)
@@ -0,0 +1,69 @@
+import pytest # testing framework
+import time
+from datetime import datetime
+from typing import Dict
+from flask import Flask
+from flask_caching import Cache
+from backend.utils.generation import GENERATION_COUNTER_KEY, get_latest_generation, next_generation, publish_generation
+
+
+"""
+The ingesting process publishes increasing generations,
+web processes read the latest one from the shared cache.
+Numbers allocated in Redis are unique and survive a flush.
+"""
+@pytest.fixture
+def cache() -> Cache:
+    app = Flask(__name__)
+    app.config['CACHE_TYPE'] = 'SimpleCache'
+    cache = Cache()
+    cache.init_app(app)
+    return cache
+
+
+def test_generations_increase(cache: Cache):
+    assert get_latest_generation(cache) is None
+
+    first = publish_generation(cache, datetime(2025, 1, 1, 13, 0))
+    second = publish_generation(cache)
+
+    assert (first.number, second.number) == (1, 2)
+    assert first.preparation_timestamp == "2025-01-01T13:00:00"
+    assert get_latest_generation(cache) == second
+
+
+class FakeRedis:
+    """SET NX and INCR of one Redis instance"""
+    def __init__(self) -> None:
+        self.values: Dict[str, int] = {}
+
+    def set(self, key: str, value: int, nx: bool = False) -> None:
+        if not (nx and key in self.values):
+            self.values[key] = value
+
+    def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def flushall(self) -> None:
+        self.values.clear()
+
+
+def test_concurrent_publishers_get_distinct_numbers(cache: Cache):
+    redis = FakeRedis()
+    # ingest and gap fill both read the same published generation
+    publish_generation(cache, generation=next_generation(cache, redis_client=redis))
+    ingest = next_generation(cache, redis_client=redis)
+    gap_fill = next_generation(cache, redis_client=redis)
+
+    assert len({ingest.number, gap_fill.number}) == 2
+
+
+def test_flushed_counter_never_reuses_numbers(cache: Cache):
+    redis = FakeRedis()
+    redis.set(GENERATION_COUNTER_KEY, int(time.time()) - 3600)
+    before = next_generation(cache, redis_client=redis)
+
+    redis.flushall()
+    cache.clear()
+    assert next_generation(cache, redis_client=redis).number > before.number
@@ -0,0 +1,94 @@
+import pytest # testing framework
+import importlib
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from flask.testing import FlaskClient
+from backend.cache import cache
+from backend.utils.generation import Generation, next_generation, publish_generation
+from backend.utils.http_cache import generation_cached, max_age
+from backend.utils.latest_readings import LATEST_MERGED_DATA_KEY, store_rendered_readings
+
+
+"""
+Data routes are cacheable until the next ARSO update and revalidated
+against the ingest generation, dynamic routes stay no-store.
+"""
+@pytest.fixture(scope="module")
+def app() -> Flask:
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("RUN_SCHEDULER", "0")
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        app = importlib.import_module("backend.app").app
+
+    view_calls = []
+
+    @app.route("/test/data")
+    @generation_cached
+    def data_view():
+        view_calls.append(1)
+        return {"value": 1}
+
+    app.config["VIEW_CALLS"] = view_calls
+    return app
+
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    with app.app_context():
+        cache.clear()
+        cache.set(LATEST_MERGED_DATA_KEY, {}, timeout=0)
+        generation = next_generation(cache, next_update=datetime.now(timezone.utc) + timedelta(minutes=10))
+        store_rendered_readings(cache, {}, generation)
+        publish_generation(cache, generation=generation)
+    return app.test_client()
+
+
+def test_max_age_counts_down_to_next_update():
+    now = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    generation = Generation(1, now.isoformat(), None, next_update=(now + timedelta(minutes=20)).isoformat())
+
+    assert max_age(generation, now) == 1200
+    assert max_age(generation, now + timedelta(hours=1)) == 30     # overdue, revalidate soon
+    assert max_age(Generation(1, now.isoformat(), None), now) == 300
+
+
+def test_dynamic_routes_are_not_stored(client: FlaskClient):
+    for path in ("/api/status", "/api/live"):
+        response = client.get(path)
+        assert response.headers["Cache-Control"] == "no-cache, no-store, must-revalidate"
+        assert response.headers["Pragma"] == "no-cache"
+
+
+def test_readings_are_cacheable_until_next_update(client: FlaskClient):
+    response = client.get("/api/readings/latest")
+    cache_control = response.headers["Cache-Control"]
+
+    assert cache_control.startswith("public, max-age=")
+    assert 590 <= response.cache_control.max_age <= 600
+    assert response.cache_control.s_maxage == response.cache_control.max_age
+    assert "stale-while-revalidate=120" in cache_control
+    assert "Pragma" not in response.headers
+    assert response.headers["ETag"] == '"g1-all-compact"'
+    assert response.last_modified is not None
+
+
+def test_conditional_requests_get_304(client: FlaskClient):
+    response = client.get("/api/readings/latest")
+
+    by_etag = client.get("/api/readings/latest", headers={"If-None-Match": response.headers["ETag"]})
+    by_date = client.get("/api/readings/latest", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+
+    for not_modified in (by_etag, by_date):
+        assert not_modified.status_code == 304
+        assert not_modified.headers["ETag"] == response.headers["ETag"]
+        assert not_modified.headers["Cache-Control"].startswith("public, max-age=")
+
+
+def test_generation_cached_view_is_skipped_on_304(app: Flask, client: FlaskClient):
+    view_calls = app.config["VIEW_CALLS"]
+    response = client.get("/test/data")
+    assert response.headers["ETag"].startswith('W/"g1-')
+
+    calls = len(view_calls)
+    assert client.get("/test/data", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    assert len(view_calls) == calls
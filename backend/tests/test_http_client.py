@@ -0,0 +1,102 @@
+import pytest # testing framework
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock # used to mock network calls
+from backend.network.http_client import ARSOHttpClient, CircuitOpenError
+
+
+"""
+Tests for the pooled ARSO HTTP client.
+Session.get is mocked and sleep is replaced, so retries
+and backoff run instantly without network access.
+"""
+URL = "https://www.arso.gov.si/xml/zrak/test.xml"
+
+
+def _response(status_code: int) -> MagicMock:
+    mock_response = MagicMock()
+    mock_response.status_code = status_code
+    return mock_response
+
+
+def test_client_retries_transient_status_then_succeeds():
+    sleeps = []
+    client = ARSOHttpClient(max_retries=3, sleep=sleeps.append)
+
+    with patch.object(client.session, "get", side_effect=[_response(503), _response(502), _response(200)]) as mock_get:
+        response = client.get(URL)
+
+    assert response.status_code == 200
+    assert mock_get.call_count == 3
+    assert len(sleeps) == 2
+    # separate connect and read timeouts are sent with every attempt
+    assert mock_get.call_args.kwargs["timeout"] == client.timeout
+
+
+def test_client_raises_after_last_retry():
+    client = ARSOHttpClient(max_retries=2, sleep=lambda _: None)
+
+    with patch.object(client.session, "get", side_effect=requests.ConnectionError("down")) as mock_get:
+        with pytest.raises(requests.ConnectionError):
+            client.get(URL)
+
+    assert mock_get.call_count == 3
+
+
+def test_circuit_opens_after_consecutive_failures():
+    client = ARSOHttpClient(max_retries=0, sleep=lambda _: None)
+    breaker = client.breaker_for("www.arso.gov.si")
+    breaker.failure_threshold = 2
+
+    with patch.object(client.session, "get", side_effect=requests.Timeout("slow")) as mock_get:
+        for _ in range(2):
+            with pytest.raises(requests.Timeout):
+                client.get(URL)
+
+        # circuit is open now, no request is sent
+        with pytest.raises(CircuitOpenError):
+            client.get(URL)
+
+    assert mock_get.call_count == 2
+
+
+def test_half_open_circuit_lets_one_trial_through():
+    breaker = ARSOHttpClient().breaker_for("www.arso.gov.si")
+    breaker.failure_threshold = 1
+    breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout
+
+    # many feeds poll the host at once, only one of them probes it
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        allowed = list(executor.map(lambda _: breaker.allow_request(), range(8)))
+    assert allowed.count(True) == 1
+
+    # the trial failed, the circuit is open again
+    breaker.record_failure()
+    assert breaker.allow_request() is False
+
+    breaker.opened_at -= breaker.reset_timeout
+    assert breaker.allow_request() is True
+    breaker.record_success()
+    assert all(breaker.allow_request() for _ in range(3))
+
+
+def test_backoff_is_bounded():
+    client = ARSOHttpClient(backoff_base=1.0, backoff_max=5.0)
+    for attempt in range(1, 10):
+        assert 0 <= client.backoff_delay(attempt) <= 5.0
+
+
+def test_deadline_caps_attempt_timeouts_and_retries():
+    sleeps = []
+    client = ARSOHttpClient(max_retries=5, sleep=sleeps.append)
+    client.backoff_delay = lambda attempt: 10.0
+
+    with patch.object(client.session, "get", side_effect=requests.ConnectionError("down")) as mock_get:
+        with pytest.raises(requests.Timeout):
+            client.get(URL, deadline=1)
+
+    # a 10 s backoff does not fit into the deadline, no retry is attempted
+    assert mock_get.call_count == 1 and sleeps == []
+    connect_timeout, read_timeout = mock_get.call_args.kwargs["timeout"]
+    assert connect_timeout <= 1 and read_timeout <= 1
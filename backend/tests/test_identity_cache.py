@@ -0,0 +1,76 @@
+import pytest # testing framework
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from backend.database.identity_cache import IdentityCache
+from backend.database.station_registry import StationRegistry
+from backend.parsers.models.measurement_model import POLLUTANT_FIELDS
+
+
+"""
+Pollutant keys are read from the database once and then served from memory,
+also when many threads ask at the same time. Unknown stations reload once.
+"""
+class PollutantRows:
+    def all(self) -> list:
+        return [(pk, name) for pk, name in enumerate(POLLUTANT_FIELDS, start=1)]
+
+
+class CountingSession:
+    def __init__(self) -> None:
+        self.queries = 0
+
+    def execute(self, statement):
+        self.queries += 1
+        return PollutantRows()
+
+
+def test_pollutant_ids_are_loaded_once():
+    cache = IdentityCache(StationRegistry())
+    db = CountingSession()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: cache.pollutant_ids(db, POLLUTANT_FIELDS), range(32)))
+
+    assert db.queries == 1
+    assert all(result == results[0] for result in results)
+    assert results[0]["co"] == 1
+
+
+def test_invalidate_reloads_on_next_lookup():
+    cache = IdentityCache(StationRegistry())
+    db = CountingSession()
+
+    cache.pollutant_pk(db, "no2")
+    cache.invalidate()
+    assert cache.pollutant_pk(db, "no2") == POLLUTANT_FIELDS.index("no2") + 1
+    assert db.queries == 2
+
+
+class StationRows:
+    def all(self) -> list:
+        return [SimpleNamespace(id=7, station_id="E1", station_name="Celje", latitude=46.2, longitude=15.2,
+                                d96_easting=None, d96_northing=None, elevation_meters=240)]
+
+
+class StationSession:
+    def __init__(self) -> None:
+        self.queries = 0
+
+    def execute(self, statement):
+        self.queries += 1
+        return StationRows()
+
+
+def test_unknown_stations_reload_once():
+    cache = IdentityCache(StationRegistry())
+    db = StationSession()
+
+    # never synced, e.g. its <postaja> failed validation
+    assert cache.station_pks(db, ["E1", "E2", "E3"]) == {"E1": 7}
+    assert cache.station_pks(db, ["E1", "E2", "E3"]) == {"E1": 7}
+    assert cache.station_pk(db, "E2") is None
+    assert db.queries == 1
+
+    cache.invalidate()
+    assert cache.station_pk(db, "E2") is None
+    assert db.queries == 2
@@ -0,0 +1,110 @@
+import pytest # testing framework
+from dataclasses import replace
+from flask import Flask
+from backend import ingest
+from backend.cache import cache, configure_cache
+from backend.database.bulk_writer import BulkWriteResult
+from backend.database.fencing import StaleFencingTokenError
+from backend.network.feed_fetcher import FeedPayload
+from backend.network.feeds import FeedConfig
+from backend.network.fetch_schedule import FetchPlanner
+from backend.network.fetch_state import get_fetch_state, reset_fetch_states
+from backend.utils.generation import get_latest_generation
+from backend.utils.latest_readings import LATEST_MERGED_DATA_KEY
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+An ingest cycle caches and publishes only data it was allowed to store,
+a rejected fencing token leaves the newer holder's cache and marker alone.
+Preparations another instance stored, per the generation marker, are
+neither parsed nor stored again, and rows that were all stored already
+with the published preparation publish no new generation.
+"""
+FEED = FeedConfig(name="test_feed", url="http://arso.test/ingest.xml")
+
+
+@pytest.fixture
+def app(monkeypatch: pytest.MonkeyPatch) -> Flask:
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.delenv("ARSO_ARCHIVE_DIR", raising=False)
+    monkeypatch.setattr(ingest, "fetch_all_feeds", lambda: [FeedPayload(FEED, True, generate_arso_xml(station_count=2, hours=2))])
+    monkeypatch.setattr(ingest, "get_fetch_planner", lambda planner=FetchPlanner(): planner)
+    reset_fetch_states()
+    app = Flask(__name__)
+    configure_cache(app)
+    with app.app_context():
+        cache.clear()
+    return app
+
+
+def test_stale_fencing_token_publishes_nothing(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    def rejected(*_args, **_kwargs):
+        raise StaleFencingTokenError("Fencing token 1 of ingest is older than the newest recorded one")
+    monkeypatch.setattr(ingest, "insert_measurement_batch", rejected)
+
+    with app.app_context():
+        assert ingest.update_data(fencing_token=1) is False
+        assert cache.get(LATEST_MERGED_DATA_KEY) is None
+        assert get_latest_generation(cache) is None
+    # not marked as ingested by this holder
+    assert get_fetch_state(FEED.url).preparation_timestamp is None
+
+
+
+def _stored(*_args, **_kwargs) -> BulkWriteResult:
+    return BulkWriteResult(inserted=4)
+
+
+def _other_instance(monkeypatch: pytest.MonkeyPatch) -> FetchPlanner:
+    """Fresh fetch states and planner, like a replica that never held the lease"""
+    reset_fetch_states()
+    planner = FetchPlanner()
+    monkeypatch.setattr(ingest, "get_fetch_planner", lambda: planner)
+    return planner
+
+
+def test_preparation_stored_by_another_instance_is_skipped(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ingest, "insert_measurement_batch", _stored)
+    with app.app_context():
+        assert ingest.update_data() is True
+        published = get_latest_generation(cache)
+    assert published.feed_preparations is not None and FEED.url in published.feed_preparations
+
+    _other_instance(monkeypatch)
+    stored = []
+    monkeypatch.setattr(ingest, "parse_feed", lambda *args, **kwargs: pytest.fail("parsed a stored preparation"))
+    monkeypatch.setattr(ingest, "insert_measurement_batch", lambda *args, **kwargs: stored.append(args))
+    with app.app_context():
+        assert ingest.update_data() is False
+        assert get_latest_generation(cache) == published
+    assert stored == []
+    assert get_fetch_state(FEED.url).preparation_timestamp.isoformat() == published.feed_preparations[FEED.url]
+
+
+def test_skipped_lease_adopts_the_published_generation(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ingest, "insert_measurement_batch", _stored)
+    with app.app_context():
+        assert ingest.update_data() is True
+        published = get_latest_generation(cache)
+
+    planner = _other_instance(monkeypatch)
+    with app.app_context():
+        ingest.adopt_published_generation()
+    assert planner.latest_preparation.isoformat() == published.preparation_timestamp
+    assert get_fetch_state(FEED.url).preparation_timestamp.isoformat() == published.feed_preparations[FEED.url]
+
+
+def test_no_new_rows_keeps_the_generation(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(ingest, "insert_measurement_batch", _stored)
+    with app.app_context():
+        assert ingest.update_data() is True
+        published = get_latest_generation(cache)
+
+    # same preparation served again after a restart, every row is stored already
+    _other_instance(monkeypatch)
+    monkeypatch.setattr(ingest, "get_latest_generation", lambda _cache: replace(published, feed_preparations=None))
+    monkeypatch.setattr(ingest, "insert_measurement_batch", lambda *args, **kwargs: BulkWriteResult(skipped=4))
+    with app.app_context():
+        assert ingest.update_data() is True
+        assert get_latest_generation(cache) == published
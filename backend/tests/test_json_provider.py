@@ -0,0 +1,63 @@
+import pytest # testing framework
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+import numpy as np
+from flask import Flask, jsonify
+from backend.utils import json_provider
+from backend.utils.json_provider import FastJSONProvider, dumps_bytes
+
+
+"""
+orjson and the stdlib fallback produce the same UTF-8 documents,
+responses are compact unless ?pretty=1 is asked for.
+"""
+@dataclass
+class Reading:
+    station_name: str
+    measured_at: datetime
+
+
+PAYLOAD = {
+    "reading": Reading("LJ Bežigrad", datetime(2025, 1, 1, 13, 0)),
+    "day": date(2025, 1, 1),
+    "values": np.array([1.5, 2.5]),
+    "count": np.int64(3),
+    "below_detection": frozenset({"so2"}),
+}
+
+EXPECTED = {
+    "reading": {"station_name": "LJ Bežigrad", "measured_at": "2025-01-01T13:00:00"},
+    "day": "2025-01-01",
+    "values": [1.5, 2.5],
+    "count": 3,
+    "below_detection": ["so2"],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "json":
+        monkeypatch.setattr(json_provider, "orjson", None)
+    elif json_provider.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_serializes_native_types_as_utf8(backend: str):
+    body = dumps_bytes(PAYLOAD)
+
+    assert json.loads(body) == EXPECTED
+    assert "Bežigrad".encode("utf-8") in body
+    assert b"\n" not in body
+    assert b'\n  "day"' in dumps_bytes(PAYLOAD, pretty=True)
+
+
+def test_jsonify_is_compact_unless_pretty(backend: str):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    with app.test_request_context("/"):
+        assert jsonify(EXPECTED).get_data() == dumps_bytes(EXPECTED)
+    with app.test_request_context("/?pretty=1"):
+        assert jsonify(EXPECTED).get_data() == dumps_bytes(EXPECTED, pretty=True)
@@ -0,0 +1,97 @@
+import pytest # testing framework
+import json
+from flask import Flask
+from flask.testing import FlaskClient
+from backend.cache import cache, configure_cache
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.stations_and_measurments_merger import merge_stations_and_measurements
+from backend.routes.readings_routes import readings_bp
+from backend.utils.generation import next_generation, publish_generation
+from backend.utils.latest_readings import LATEST_MERGED_DATA_KEY, publish_stored_data_change, store_rendered_readings
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Latest readings are rendered once per generation and served as bytes,
+conditional requests are answered with 304 from the generation marker.
+"""
+@pytest.fixture
+def merged_data():
+    feed = parse_arso_xml(generate_arso_xml(station_count=3, hours=2), columnar=True).data
+    return merge_stations_and_measurements(feed.stations, feed.measurements)
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> FlaskClient:
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    app = Flask(__name__)
+    configure_cache(app)
+    app.register_blueprint(readings_bp)
+    with app.app_context():
+        cache.clear()
+    return app.test_client()
+
+
+def _ingest(client: FlaskClient, merged_data, render: bool = True) -> None:
+    with client.application.app_context():
+        cache.set(LATEST_MERGED_DATA_KEY, merged_data, timeout=0)
+        generation = next_generation(cache)
+        if render:
+            store_rendered_readings(cache, merged_data, generation)
+        publish_generation(cache, generation=generation)
+
+
+def test_no_data_yet(client: FlaskClient):
+    assert client.get("/api/readings/latest").status_code == 503
+
+
+def test_latest_readings_and_304(client: FlaskClient, merged_data):
+    _ingest(client, merged_data)
+
+    response = client.get("/api/readings/latest")
+    document = json.loads(response.data)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"g1-all-compact"'
+    assert document["generation"] == 1
+    assert [station["station_id"] for station in document["stations"]] == ["E0000", "E0001", "E0002"]
+    assert len(document["stations"][0]["measurements"]) == 2
+    assert b"\n" not in response.data
+
+    not_modified = client.get("/api/readings/latest", headers={"If-None-Match": '"g1-all-compact"'})
+    assert not_modified.status_code == 304 and not_modified.data == b""
+
+    # a new generation changes the ETag
+    _ingest(client, merged_data)
+    assert client.get("/api/readings/latest", headers={"If-None-Match": '"g1-all-compact"'}).status_code == 200
+
+
+def test_station_readings(client: FlaskClient, merged_data):
+    _ingest(client, merged_data)
+
+    response = client.get("/api/readings/latest/E0001?pretty=1")
+    assert response.headers["ETag"] == '"g1-E0001-pretty"'
+    assert json.loads(response.data)["station"]["station_id"] == "E0001"
+    assert b'\n  "generation": 1' in response.data
+    assert client.get("/api/readings/latest/E9999").status_code == 404
+
+
+def test_missing_bytes_are_rendered_on_demand(client: FlaskClient, merged_data):
+    _ingest(client, merged_data, render=False)
+
+    response = client.get("/api/readings/latest/E0002")
+    assert response.status_code == 200
+    assert json.loads(response.data)["station"]["station_id"] == "E0002"
+
+
+def test_rows_stored_outside_an_ingest_publish_a_generation(client: FlaskClient, merged_data):
+    with client.application.app_context():
+        assert publish_stored_data_change(cache) is None
+    _ingest(client, merged_data)
+
+    with client.application.app_context():
+        generation = publish_stored_data_change(cache)
+    assert generation is not None and generation.number == 2
+
+    response = client.get("/api/readings/latest", headers={"If-None-Match": '"g1-all-compact"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"g2-all-compact"'
@@ -0,0 +1,54 @@
+import pytest # testing framework
+import pickle
+import numpy as np
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.models.measurement_batch import MeasurementBatch
+from backend.parsers.stations_and_measurments_merger import merge_stations_and_measurements
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Columnar MeasurementBatch must hold exactly what the
+per-row ParsedMeasurementModel path produces.
+"""
+@pytest.fixture
+def xml_content() -> str:
+    return generate_arso_xml(station_count=5, hours=4)
+
+
+def test_columnar_parse_matches_row_models(xml_content: str):
+    models = parse_arso_xml(xml_content).data.measurements
+    batch = parse_arso_xml(xml_content, columnar=True).data.measurements
+
+    assert isinstance(batch, MeasurementBatch)
+    assert len(batch) == len(models) == 20
+    assert list(batch.iter_rows()) == models
+    assert MeasurementBatch.from_models(models).station_ids == batch.station_ids
+
+
+def test_validity_masks_mark_missing_values():
+    xml_content = """<arsopodatki>
+    <postaja sifra="E1"><merilno_mesto>Celje</merilno_mesto>
+        <datum_od>2025-01-01 00:00</datum_od><datum_do>2025-01-01 01:00</datum_do>
+        <o3>20</o3></postaja>
+    </arsopodatki>"""
+    batch = parse_arso_xml(xml_content, columnar=True).data.measurements
+
+    assert batch.valid["o3"].tolist() == [True]
+    assert batch.valid["no2"].tolist() == [False]
+    assert np.isnan(batch.values["no2"][0])
+    assert batch.to_dicts()[0]["no2"] is None
+    assert [record[1] for record in batch.iter_pollutant_records()] == ["o3"]
+
+
+def test_merger_consumes_batch_with_row_views(xml_content: str):
+    feed = parse_arso_xml(xml_content, columnar=True).data
+    merged = merge_stations_and_measurements(feed.stations, feed.measurements)
+
+    rows = merged["E0001"]["measurements_list"]
+    assert len(rows) == 4
+    assert all(row.station_id == "E0001" for row in rows)
+    assert rows[:2] == [rows[0], rows[1]]
+
+    # merged data goes to the cache, it must survive pickling
+    assert len(pickle.loads(pickle.dumps(merged))["E0001"]["measurements_list"]) == 4
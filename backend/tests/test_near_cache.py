@@ -0,0 +1,120 @@
+import pytest # testing framework
+import time
+from typing import Any, Dict, List, Optional
+from backend.utils.generation import GENERATION_CHANNEL, LATEST_GENERATION_KEY
+from backend.utils.metrics import CACHE_REQUESTS
+from backend.utils.near_cache import NearCache, TieredCache
+
+
+"""
+The near cache is a bounded LRU with TTL in front of the shared cache,
+a new generation announced over pub/sub drops the entries of older ones.
+"""
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakePubSub:
+    def __init__(self, messages: List[Dict[str, Any]]) -> None:
+        self.messages = messages
+        self.channels: List[str] = []
+        self.polls = 0
+
+    def subscribe(self, channel: str) -> None:
+        self.channels.append(channel)
+
+    def get_message(self, timeout: float) -> Optional[Dict[str, Any]]:
+        self.polls += 1
+        if self.messages:
+            return self.messages.pop(0)
+        time.sleep(0.01)
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class FakeRedis:
+    def __init__(self, messages: List[Dict[str, Any]]) -> None:
+        self.pubsub_client = FakePubSub(messages)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> FakePubSub:
+        return self.pubsub_client
+
+
+def _requests(tier: str, result: str) -> float:
+    return CACHE_REQUESTS.labels(tier, result)._value.get()
+
+
+def test_lru_eviction_and_ttl():
+    clock = Clock()
+    near = NearCache(maxsize=2, ttl=60, clock=clock)
+    near.set("a", 1, generation=0)
+    near.set("b", 2, generation=0)
+    near.get("a")
+    near.set("c", 3, generation=0)
+
+    # b was the least recently used
+    assert (near.get("a"), near.get("b"), near.get("c")) == (1, None, 3)
+
+    near.set("marker", 4, generation=0, ttl=5)
+    clock.now = 10
+    assert near.get("marker") is None
+    assert near.get("c") == 3
+
+
+def test_new_generation_drops_older_entries():
+    near = NearCache(maxsize=10, ttl=60)
+    near.set("readings:1:all:compact", b"old", generation=1)
+    near.invalidate(2)
+
+    assert near.get("readings:1:all:compact") is None
+    # read before the invalidation arrived, may be stale
+    near.set(LATEST_GENERATION_KEY, {"number": 1}, generation=1)
+    assert len(near) == 0
+
+
+def test_tiered_reads_count_hits_and_misses():
+    shared = {"readings:1:all:compact": b"body", "latest_merged_data": {"E0001": {}}}
+    tiered = TieredCache(shared, near_ttls={"latest_merged_data": 0})
+    tiered.enable_near_cache(maxsize=10, ttl=60)
+    before = {(tier, result): _requests(tier, result) for tier in ("near", "shared") for result in ("hit", "miss")}
+
+    assert tiered.get("readings:1:all:compact") == b"body"
+    shared.clear()
+    assert tiered.get("readings:1:all:compact") == b"body"
+    assert tiered.get("missing") is None
+    assert tiered.get("latest_merged_data") is None
+
+    delta = {key: _requests(*key) - value for key, value in before.items()}
+    assert delta == {("near", "hit"): 1, ("near", "miss"): 2, ("shared", "hit"): 1, ("shared", "miss"): 2}
+
+
+def _wait_for(condition) -> None:
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_pubsub_message_invalidates():
+    shared = {"readings:1:all:compact": b"body"}
+    redis = FakeRedis([])
+    tiered = TieredCache(shared, redis_client_factory=lambda: redis)
+    tiered.enable_near_cache(maxsize=10, ttl=60)
+
+    # the first read starts the listener, it clears the near cache once subscribed
+    tiered.get("other")
+    _wait_for(lambda: redis.pubsub_client.polls > 0)
+    assert redis.pubsub_client.channels == [GENERATION_CHANNEL]
+    assert tiered.get("readings:1:all:compact") == b"body"
+    assert tiered.near.get("readings:1:all:compact") == b"body"
+
+    redis.pubsub_client.messages.append({"type": "message", "channel": GENERATION_CHANNEL, "data": b"2"})
+    _wait_for(lambda: tiered.near.generation == 2)
+
+    assert tiered.near.generation == 2
+    assert tiered.near.get("readings:1:all:compact") is None
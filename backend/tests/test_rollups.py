@@ -0,0 +1,33 @@
+import pytest # testing framework
+import math
+import statistics
+from datetime import date, datetime
+from backend.database.rollups import RollupStats, touched_buckets
+
+
+"""
+Only buckets touched by new rows are refreshed, and statistics
+from count, sum and sum of squares match the raw values.
+"""
+def test_touched_buckets_cover_days_and_months():
+    rows = [
+        (1, 2, 10.0, datetime(2025, 1, 31, 23, 0)),
+        (1, 2, 11.0, datetime(2025, 2, 1, 0, 0)),
+        (1, 3, 12.0, datetime(2025, 2, 1, 1, 0)),
+        (1, 3, 13.0, datetime(2025, 2, 1, 2, 0)),
+    ]
+    days, months = touched_buckets(rows)
+
+    assert days == {(1, 2, date(2025, 1, 31)), (1, 2, date(2025, 2, 1)), (1, 3, date(2025, 2, 1))}
+    assert months == {(1, 2, date(2025, 1, 1)), (1, 2, date(2025, 2, 1)), (1, 3, date(2025, 2, 1))}
+
+
+def test_stats_from_sums_match_raw_values():
+    values = [12.0, 15.5, 9.0, 30.25]
+    stats = RollupStats.from_sums(date(2025, 1, 1), len(values), sum(values), min(values), max(values),
+                                  sum(value * value for value in values))
+
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.stddev == pytest.approx(statistics.stdev(values))
+    assert RollupStats.from_sums(date(2025, 1, 1), 1, 5.0, 5.0, 5.0, 25.0).stddev is None
+    assert not math.isnan(RollupStats.from_sums(date(2025, 1, 1), 3, 0.3, 0.1, 0.1, 0.03).stddev)
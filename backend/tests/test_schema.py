@@ -0,0 +1,33 @@
+import pytest # testing framework
+from datetime import datetime
+from backend.database.schema import add_months, months_between, partition_month, partition_name
+from backend.database.db_models import DbModelMeasurement
+
+
+"""
+Monthly partition names and ranges, and the constraints the upserts rely on.
+"""
+def test_partition_names_round_trip():
+    month = datetime(2025, 1, 1)
+    assert partition_name(month) == "measurements_y2025m01"
+    assert partition_month(partition_name(month)) == month
+    assert partition_month("measurements_unpartitioned") is None
+
+
+def test_months_between_crosses_years():
+    months = months_between(datetime(2024, 11, 20, 13, 0), datetime(2025, 2, 1))
+    assert [partition_name(month) for month in months] == [
+        "measurements_y2024m11", "measurements_y2024m12", "measurements_y2025m01", "measurements_y2025m02"
+    ]
+    assert add_months(datetime(2025, 1, 1), -13) == datetime(2023, 12, 1)
+
+
+def test_measurements_table_is_partitioned_with_upsert_constraint():
+    table = DbModelMeasurement.__table__
+    assert table.dialect_options["postgresql"]["partition_by"] == "RANGE (measured_at)"
+    assert {"id", "measured_at"} == {column.name for column in table.primary_key}
+    unique_columns = [
+        [column.name for column in constraint.columns]
+        for constraint in table.constraints if constraint.name == "uq_measurements_station_pollutant_time"
+    ]
+    assert unique_columns == [["station_id", "pollutant_id", "measured_at"]]
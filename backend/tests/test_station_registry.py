@@ -0,0 +1,80 @@
+import pytest # testing framework
+from types import SimpleNamespace
+from typing import Dict, List
+from backend.database.station_registry import StationRegistry
+from backend.parsers.arso_parser import parse_arso_xml
+from backend.parsers.models.station_models import ParsedStationModel
+from backend.benchmarks.synthetic_feed import generate_arso_xml
+
+
+"""
+Unchanged stations are reused by the parser and never upserted again,
+the database is replaced by a session without rows and a recorded upsert.
+"""
+class EmptyResult:
+    def all(self) -> list:
+        return []
+
+
+class EmptySession:
+    def execute(self, statement):
+        return EmptyResult()
+
+
+@pytest.fixture
+def registry(monkeypatch) -> StationRegistry:
+    registry = StationRegistry()
+    registry.upserted = []  # type: ignore[attr-defined]
+
+    def upsert(db, stations: List[ParsedStationModel]) -> Dict[str, int]:
+        registry.upserted.append([station.station_id for station in stations])  # type: ignore[attr-defined]
+        return {station.station_id: 100 + len(registry) + i for i, station in enumerate(stations)}  # type: ignore[misc]
+
+    monkeypatch.setattr(registry, "_upsert_stations", upsert)
+    return registry
+
+
+def test_unchanged_stations_are_reused_and_not_upserted(registry: StationRegistry):
+    xml_content = generate_arso_xml(station_count=3, hours=1)
+
+    first = parse_arso_xml(xml_content, station_cache=registry).data
+    assert registry.sync(EmptySession(), first.stations) == 3
+    assert registry.resolve(first.stations[0].station_id) is not None
+
+    second = parse_arso_xml(xml_content, station_cache=registry).data
+    assert [a is b for a, b in zip(first.stations, second.stations)] == [True, True, True]
+    assert registry.sync(EmptySession(), second.stations) == 0
+    assert len(registry.upserted) == 1  # type: ignore[attr-defined]
+
+
+def test_changed_station_is_upserted_again(registry: StationRegistry):
+    xml_content = generate_arso_xml(station_count=2, hours=1)
+    registry.sync(EmptySession(), parse_arso_xml(xml_content, station_cache=registry).data.stations)
+    station_id = registry.upserted[0][0]  # type: ignore[attr-defined]
+
+    moved = xml_content.replace('nadm_visina="', 'nadm_visina="1', 1)
+    stations = parse_arso_xml(moved, station_cache=registry).data.stations
+
+    assert registry.sync(EmptySession(), stations) == 1
+    assert registry.upserted[-1] == [station_id]  # type: ignore[attr-defined]
+    assert registry.resolve(station_id) is not None
+
+
+def test_reload_keeps_parsed_models_of_unchanged_stations(registry: StationRegistry):
+    xml_content = generate_arso_xml(station_count=2, hours=1)
+    first = parse_arso_xml(xml_content, station_cache=registry).data.stations
+    registry.sync(EmptySession(), first)
+
+    rows = [SimpleNamespace(id=registry.resolve(station.station_id), **{
+        field: getattr(station, field) for field in
+        ("station_id", "station_name", "latitude", "longitude", "d96_easting", "d96_northing", "elevation_meters")
+    }) for station in first]
+
+    class StationSession:
+        def execute(self, statement):
+            return SimpleNamespace(all=lambda: rows)
+
+    registry.load(StationSession())
+
+    second = parse_arso_xml(xml_content, station_cache=registry).data.stations
+    assert [a is b for a, b in zip(first, second)] == [True, True]
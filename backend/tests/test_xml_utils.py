@@ -0,0 +1,24 @@
+import pytest # testing framework
+from backend.parsers.xml_utils import decode_unicode_escapes
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("LJ Be\\u017eigrad", "LJ Bežigrad"),
+    ("Murska Sobota Rakičan", "Murska Sobota Rakičan"),   # already UTF-8, must not be mangled
+    ("5 minut \\u010dez polno uro", "5 minut čez polno uro"),
+    ("", ""),
+])
+def test_decode_unicode_escapes(raw: str, expected: str):
+    assert decode_unicode_escapes(raw) == expected
+
+
+def test_decoded_names_are_shared_objects():
+    # two different string objects with the same content, like two parsed hours
+    first = decode_unicode_escapes("".join(["Celje ", "\\u017e"]))
+    second = decode_unicode_escapes("".join(["Celje ", "\\u017e"]))
+    assert first is second
+
+
+def test_decode_does_not_print(capsys: pytest.CaptureFixture[str]):
+    decode_unicode_escapes("Nova Gorica \\u0161")
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,77 @@
+"""
+Response compression
+====================
+Content-Encoding is negotiated from Accept-Encoding: brotli when the client
+accepts it and the brotli package is installed, gzip otherwise, identity
+when neither is accepted.
+
+Bodies that are rendered once per generation (latest readings) are stored
+with their compressed variants, a hit is a plain byte copy. Other JSON
+responses are gzipped on the fly when they are large enough to benefit.
+Every negotiated response carries Vary: Accept-Encoding, also when it is
+sent uncompressed, so shared caches keep the variants apart.
+"""
+import gzip
+from typing import Dict, Optional, Tuple
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None  # type: ignore[assignment]
+
+
+IDENTITY = 'identity'
+BROTLI_QUALITY = 11         # bodies are compressed once per generation, smallest output wins
+GZIP_LEVEL = 9
+ON_THE_FLY_GZIP_LEVEL = 5   # per response, CPU matters more than the last percent
+MIN_COMPRESS_SIZE = 1024    # bytes, smaller bodies gain less than the header costs
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Preferred first, used to break ties between equally accepted encodings"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = GZIP_LEVEL) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        # mtime=0 keeps the bytes identical for identical bodies
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    raise ValueError(f"Unsupported content encoding {encoding}")
+
+
+def compressed_variants(body: bytes) -> Dict[str, bytes]:
+    """Every available encoding of body, small bodies are not compressed"""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+    return {encoding: compress(body, encoding) for encoding in available_encodings()}
+
+
+def negotiate_encoding(encodings: Optional[Tuple[str, ...]] = None) -> str:
+    """Best encoding the request accepts, identity when none"""
+    return request.accept_encodings.best_match(encodings or available_encodings()) or IDENTITY
+
+
+def encoded_response(response: Response, body: bytes, encoding: str) -> Response:
+    """Set an already encoded body"""
+    response.set_data(body)
+    if encoding != IDENTITY:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: gzip JSON responses that were not encoded yet"""
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE or negotiate_encoding(('gzip',)) != 'gzip':
+        return response
+    return encoded_response(response, compress(body, 'gzip', ON_THE_FLY_GZIP_LEVEL), 'gzip')
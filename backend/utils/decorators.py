@@ -4,18 +4,17 @@ import logging
 from flask import jsonify
 from typing import Callable, Any, Tuple, Optional
 import requests
-from backend.network.config import REQUEST_TIMEOUT
+from backend.network.config import CONNECT_TIMEOUT, READ_TIMEOUT
 
 
 
 def add_timing(func):
-    """Decorator to add response time to the JSON response"""
+    """Decorator to log the duration of the call at debug level"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs) #this calls the decorated function
-        end_time = time.time()
-        print(f"{func.__name__} took {end_time -start_time} sec")
+        logging.debug(f"{func.__name__} took {time.perf_counter() - start_time:.3f} sec")
         return result
     return wrapper
 
@@ -68,7 +67,7 @@ def handle_http_request_exception(func):
             return func(*args, **kwargs)
         
         except requests.Timeout:
-            error_message = f"ARSO API request timeout after {REQUEST_TIMEOUT} seconds"
+            error_message = f"ARSO API request timeout (connect {CONNECT_TIMEOUT} s, read {READ_TIMEOUT} s)"
             logging.error(error_message)
             return False, None, error_message
         
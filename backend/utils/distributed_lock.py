@@ -0,0 +1,141 @@
+"""
+Distributed lock
+Per-run lock in Redis so that exactly one instance runs each scheduled
+ingest cycle, however many replicas have a scheduler.
+
+- acquire: SET key token NX PX ttl, only one instance gets it
+- every acquire also increments a fencing counter, the number travels with
+  the job down to the DB transaction, which rejects tokens older than the
+  newest one it has seen (backend.database.fencing)
+- a daemon thread renews the lease while the job runs, renewal stops at
+  max_duration so a hung job loses the lock instead of holding it forever
+- release and renew only touch the key when it still holds our token
+
+Without Redis a process-local lock is used, which is enough for one instance.
+"""
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Optional, TypeVar
+
+from backend.utils.metrics import JOB_LOCK_RUNS
+
+
+T = TypeVar("T")
+
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+    """One lease on a named lock"""
+
+    def __init__(self, redis_client: Any, name: str, ttl_seconds: float, max_duration_seconds: float) -> None:
+        self.redis = redis_client
+        self.key = f"lock:{name}"
+        self.fence_key = f"lock:{name}:fence"
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.max_duration = max_duration_seconds
+        self.token = uuid.uuid4().hex
+        self.fencing_token: Optional[int] = None
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+
+    def acquire(self) -> bool:
+        if not self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms):
+            return False
+        self.fencing_token = int(self.redis.incr(self.fence_key))
+        self._renewer = threading.Thread(target=self._renew_loop, name=f"lease-{self.key}", daemon=True)
+        self._renewer.start()
+        return True
+
+    def _renew_loop(self) -> None:
+        interval = self.ttl_ms / 1000 / 3
+        elapsed = 0.0
+        while not self._stop.wait(interval):
+            elapsed += interval
+            if elapsed >= self.max_duration:
+                logging.error(f"Job holding {self.key} exceeded {self.max_duration} s, lease is left to expire")
+                self.lost.set()
+                return
+            try:
+                renewed = self.redis.eval(_RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms)
+            except Exception:
+                logging.exception(f"Renewing {self.key} failed")
+                renewed = 0
+            if not renewed:
+                logging.error(f"Lease on {self.key} lost")
+                self.lost.set()
+                return
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._renewer is not None:
+            self._renewer.join()
+        try:
+            self.redis.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+        except Exception:
+            logging.exception(f"Releasing {self.key} failed, it expires in {self.ttl_ms} ms")
+
+
+_local_locks: dict = {}
+_local_locks_guard = threading.Lock()
+
+
+def run_exclusive(
+        name: str,
+        job: Callable[[Optional[int]], T],
+        redis_client: Optional[Any],
+        ttl_seconds: float,
+        max_duration_seconds: float
+) -> Optional[T]:
+    """
+    Run job(fencing_token) only if this instance gets the lock.
+
+    Returns:
+        the job result, None when another instance holds the lock
+    """
+    if redis_client is None:
+        with _local_locks_guard:
+            local_lock = _local_locks.setdefault(name, threading.Lock())
+        if not local_lock.acquire(blocking=False):
+            JOB_LOCK_RUNS.labels(job=name, outcome="skipped").inc()
+            return None
+        try:
+            JOB_LOCK_RUNS.labels(job=name, outcome="acquired").inc()
+            return job(None)
+        finally:
+            local_lock.release()
+
+    lease = RedisLease(redis_client, name, ttl_seconds, max_duration_seconds)
+    try:
+        acquired = lease.acquire()
+    except Exception:
+        logging.exception(f"Could not reach Redis for lock {name}, skipping this run")
+        JOB_LOCK_RUNS.labels(job=name, outcome="error").inc()
+        return None
+
+    if not acquired:
+        logging.info(f"Another instance runs {name}, skipping this run")
+        JOB_LOCK_RUNS.labels(job=name, outcome="skipped").inc()
+        return None
+
+    JOB_LOCK_RUNS.labels(job=name, outcome="acquired").inc()
+    try:
+        return job(lease.fencing_token)
+    finally:
+        if lease.lost.is_set():
+            JOB_LOCK_RUNS.labels(job=name, outcome="lost").inc()
+        lease.release()
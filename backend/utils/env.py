@@ -0,0 +1,12 @@
+"""
+Environment settings
+Flags read from environment variables, shared by the web app, the worker
+and the database session.
+"""
+import os
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """1, true, yes or on enable the flag, unset or empty keeps the default"""
+    value = os.environ.get(name)
+    return value.strip().lower() in ("1", "true", "yes", "on") if value else default
@@ -0,0 +1,116 @@
+"""
+Latest generation marker
+Every successful ingest publishes a new generation number to the shared
+cache after the data itself was stored and cached. Web processes never
+ingest, they read the marker to know which data is current, and can use
+the number to tag responses derived from that data.
+
+Numbers are allocated with Redis INCR, so ingest and gap fill publishing at
+the same time never get the same one. The counter key never expires; when
+it is missing (first start, flushed Redis) it starts at the current Unix
+time, above every number handed out before, so ETags of older generations
+are never reused.
+"""
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+LATEST_GENERATION_KEY = 'latest_generation'
+GENERATION_COUNTER_KEY = 'arso:generation_counter'
+
+# Redis pub/sub channel, the new generation number is published on every ingest
+GENERATION_CHANNEL = 'arso:generation'
+
+
+@dataclass(frozen=True)
+class Generation:
+    number: int
+    ingested_at: str                        # ISO timestamp of the ingest, with UTC offset
+    preparation_timestamp: Optional[str]    # newest <datum_priprave> of the ingested feeds
+    next_update: Optional[str] = None       # ISO time the next ARSO data is expected, sets HTTP max-age
+    # feed URL -> ISO <datum_priprave> of the newest data stored from it, lets other instances skip it
+    feed_preparations: Optional[Dict[str, str]] = None
+
+
+def get_latest_generation(cache: Any) -> Optional[Generation]:
+    """None before the first ingest or when the cache is unreachable"""
+    try:
+        marker = cache.get(LATEST_GENERATION_KEY)
+    except Exception:
+        logging.exception("Failed to read the latest generation marker")
+        return None
+    return Generation(**marker) if marker else None
+
+
+# without Redis the cache is in-process, so is the allocation
+_local_number_lock = threading.Lock()
+
+
+def allocate_generation_number(cache: Any, redis_client: Any = None) -> int:
+    """A number no other publisher gets, larger than the ones allocated before"""
+    if redis_client is None:
+        with _local_number_lock:
+            latest = get_latest_generation(cache)
+            return latest.number + 1 if latest else 1
+    redis_client.set(GENERATION_COUNTER_KEY, int(time.time()), nx=True)
+    return int(redis_client.incr(GENERATION_COUNTER_KEY))
+
+
+def next_generation(cache: Any, preparation_timestamp: Optional[datetime] = None,
+                    next_update: Optional[datetime] = None,
+                    feed_preparations: Optional[Dict[str, datetime]] = None,
+                    redis_client: Any = None) -> Generation:
+    """
+    The generation following the published one, not visible to readers yet
+
+    Args:
+        feed_preparations: feed URL -> <datum_priprave> stored by this ingest,
+                           merged into the ones of the published generation
+        redis_client: allocates the number, see allocate_generation_number()
+    """
+    latest = get_latest_generation(cache)
+    preparations = dict(latest.feed_preparations or {}) if latest else {}
+    preparations.update({url: timestamp.isoformat() for url, timestamp in (feed_preparations or {}).items()})
+    return Generation(
+        number=allocate_generation_number(cache, redis_client),
+        ingested_at=datetime.now().astimezone().isoformat(timespec='seconds'),
+        preparation_timestamp=preparation_timestamp.isoformat() if preparation_timestamp else None,
+        next_update=next_update.isoformat(timespec='seconds') if next_update else None,
+        feed_preparations=preparations or None,
+    )
+
+
+def published_preparation(generation: Optional[Generation], url: str) -> Optional[datetime]:
+    """<datum_priprave> of the newest data stored from the feed URL by any instance"""
+    timestamp = (generation.feed_preparations or {}).get(url) if generation else None
+    return datetime.fromisoformat(timestamp) if timestamp else None
+
+
+def publish_generation(cache: Any, preparation_timestamp: Optional[datetime] = None,
+                       generation: Optional[Generation] = None) -> Generation:
+    """
+    Increment the marker, only the ingesting process calls this
+
+    Args:
+        generation: from next_generation(), when data derived from it
+                    was stored before the marker
+    """
+    generation = generation or next_generation(cache, preparation_timestamp)
+    # never expires, data is re-published only when ARSO has something new
+    cache.set(LATEST_GENERATION_KEY, asdict(generation), timeout=0)
+    logging.info(f"Published data generation {generation.number}")
+    return generation
+
+
+def notify_generation(redis_client: Any, generation: Generation) -> None:
+    """Tell other instances that cached data of older generations is stale"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.publish(GENERATION_CHANNEL, generation.number)
+    except Exception:
+        logging.exception("Failed to publish the new generation")
@@ -0,0 +1,129 @@
+"""
+HTTP cache policy
+=================
+Data only changes when a new ingest generation is published, about once an
+hour, so data responses may be cached by browsers, CDNs and reverse proxies
+until the next expected ARSO update:
+
+    Cache-Control: public, max-age=N, s-maxage=N, stale-while-revalidate=120
+    ETag, Last-Modified (ingest time of the generation)
+
+N counts down to Generation.next_update. Conditional requests are answered
+with 304 before the view runs.
+
+Every route declares its policy: @generation_cached for data views, @no_store
+for dynamic ones. Responses without a Cache-Control header (undeclared routes,
+errors) get no-store in the app's after_request hook.
+"""
+import zlib
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from flask import Response, make_response, request
+
+from backend.cache import tiered_cache
+from backend.utils.generation import Generation, get_latest_generation
+
+
+DEFAULT_MAX_AGE = 300               # seconds, when the next update time is not known
+MIN_MAX_AGE = 30                    # seconds, the next update is due or overdue
+MAX_MAX_AGE = 3600                  # seconds
+STALE_WHILE_REVALIDATE = 120        # seconds a cache may serve stale data while it revalidates
+
+NO_STORE_HEADERS = {
+    'Cache-Control': 'no-cache, no-store, must-revalidate',
+    'Pragma': 'no-cache',
+    'Expires': '0',
+}
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """Aware datetime, naive values of older markers are local time"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.astimezone()
+
+
+def max_age(generation: Generation, now: Optional[datetime] = None) -> int:
+    """Seconds until the next expected ARSO update"""
+    next_update = _parse_iso(generation.next_update)
+    if next_update is None:
+        return DEFAULT_MAX_AGE
+    remaining = (next_update - (now or datetime.now(timezone.utc))).total_seconds()
+    return int(min(max(remaining, MIN_MAX_AGE), MAX_MAX_AGE))
+
+
+def last_modified(generation: Generation) -> Optional[datetime]:
+    ingested_at = _parse_iso(generation.ingested_at)
+    return ingested_at.astimezone(timezone.utc) if ingested_at else None
+
+
+def apply_no_store(response: Response) -> Response:
+    for header, value in NO_STORE_HEADERS.items():
+        response.headers[header] = value
+    return response
+
+
+def apply_data_cache_headers(response: Response, generation: Generation, etag: Optional[str] = None,
+                             weak: bool = False) -> Response:
+    seconds = max_age(generation)
+    response.headers['Cache-Control'] = (
+        f'public, max-age={seconds}, s-maxage={seconds}, stale-while-revalidate={STALE_WHILE_REVALIDATE}'
+    )
+    response.last_modified = last_modified(generation)
+    if etag is not None:
+        response.set_etag(etag, weak=weak)
+    return response
+
+
+def is_not_modified(generation: Generation, etag: str) -> bool:
+    """If-None-Match (weak comparison) wins over If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    modified = last_modified(generation)
+    if request.if_modified_since is not None and modified is not None:
+        return modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def not_modified_response(generation: Generation, etag: str, weak: bool = False) -> Response:
+    """304 with the same validators and caching headers as the full response"""
+    return apply_data_cache_headers(Response(status=304), generation, etag, weak)
+
+
+def generation_etag(generation: Generation) -> str:
+    """Weak ETag for views whose output only depends on the URL and the generation"""
+    return f'g{generation.number}-{zlib.crc32(request.full_path.encode("utf-8")):08x}'
+
+
+#=================================================================================
+# ROUTE POLICIES
+# ================================================================================
+
+def no_store(view: Callable[..., Any]) -> Callable[..., Any]:
+    """Dynamic routes, never cached"""
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Response:
+        return apply_no_store(make_response(view(*args, **kwargs)))
+    return wrapper
+
+
+def generation_cached(view: Callable[..., Any]) -> Callable[..., Any]:
+    """Data routes, cacheable until the next ARSO update and revalidated against the generation"""
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Response:
+        generation = get_latest_generation(tiered_cache)
+        if generation is None:
+            return apply_no_store(make_response(view(*args, **kwargs)))
+
+        etag = generation_etag(generation)
+        if is_not_modified(generation, etag):
+            return not_modified_response(generation, etag, weak=True)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200:
+            return apply_no_store(response)
+        return apply_data_cache_headers(response, generation, etag, weak=True)
+    return wrapper
@@ -0,0 +1,84 @@
+"""
+JSON serialization
+==================
+One serializer for jsonify() responses and pre-rendered bodies:
+
+- orjson when it is installed, the stdlib encoder otherwise
+- compact output, ?pretty=1 indents it for debugging
+- UTF-8 output, non-ASCII characters (station names) are not escaped
+- datetimes, dates, dataclasses, NumPy scalars and arrays and sets are
+  serialized natively, the stdlib fallback converts them in _default()
+"""
+import dataclasses
+import json
+from datetime import date, datetime
+from typing import Any, Union
+
+import numpy as np
+from flask import Flask, Response, has_request_context, request
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+
+PRETTY_VALUES = ('1', 'true', 'yes')
+
+
+def wants_pretty() -> bool:
+    """?pretty=1 on the current request"""
+    return has_request_context() and request.args.get('pretty', '').lower() in PRETTY_VALUES
+
+
+def _default(obj: Any) -> Any:
+    """Types the encoders do not handle themselves"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_stdlib(obj: Any, pretty: bool) -> bytes:
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, default=_default, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def _dumps_orjson(obj: Any, pretty: bool) -> bytes:
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+def dumps_bytes(obj: Any, pretty: bool = False) -> bytes:
+    """UTF-8 encoded JSON, compact unless pretty"""
+    return _dumps_orjson(obj, pretty) if orjson is not None else _dumps_stdlib(obj, pretty)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider on top of dumps_bytes(), bodies are never encoded twice"""
+
+    def __init__(self, app: Flask) -> None:
+        super().__init__(app)
+        self.backend = 'orjson' if orjson is not None else 'json'
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_bytes(obj, pretty=kwargs.get('indent') is not None).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s) if orjson is not None else json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """jsonify(), compact unless the request asks for ?pretty=1"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj, pretty=wants_pretty()), mimetype='application/json')
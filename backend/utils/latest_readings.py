@@ -0,0 +1,166 @@
+"""
+Latest readings responses
+=========================
+/api/readings/latest serves the data of the latest ingest generation. Its
+response bodies are rendered once per generation, for all stations and for
+every single station, compact and pretty, and stored in the shared cache
+as bytes, next to their gzip and brotli variants. A request only reads the
+bytes of its view and encoding, nothing is unpickled into dataclasses,
+serialized or compressed per hit.
+
+The ingester renders before it publishes the generation marker, so readers
+that see a generation also find its bytes. Bytes that expired or were never
+rendered (cache flushed) are rendered on demand from latest_merged_data.
+"""
+import logging
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from backend.parsers.models.measurement_model import ParsedMeasurementModel, POLLUTANT_FIELDS
+from backend.parsers.models.station_models import ParsedStationModel
+from backend.utils.compression import IDENTITY, compressed_variants
+from backend.utils.generation import (
+    Generation, allocate_generation_number, get_latest_generation, notify_generation, publish_generation,
+)
+from backend.utils.json_provider import dumps_bytes
+
+
+LATEST_MERGED_DATA_KEY = 'latest_merged_data'
+ALL_STATIONS_VIEW = 'all'
+FORMATS = ('compact', 'pretty')
+
+# rendered bytes outlive their generation, a newer one replaces them within hours
+RENDERED_TIMEOUT = 24 * 3600
+
+
+def rendered_key(generation: Generation, view: str, fmt: str, encoding: str = IDENTITY) -> str:
+    key = f'readings:{generation.number}:{view}:{fmt}'
+    return key if encoding == IDENTITY else f'{key}:{encoding}'
+
+
+def readings_etag(generation: Generation, view: str, fmt: str, encoding: str = IDENTITY) -> str:
+    """Strong ETag, bytes of a view, format and encoding never change within a generation"""
+    etag = f'g{generation.number}-{view}-{fmt}'
+    return etag if encoding == IDENTITY else f'{etag}-{encoding}'
+
+
+#=================================================================================
+# DOCUMENTS
+# ================================================================================
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def measurement_document(measurement: ParsedMeasurementModel) -> Dict[str, Any]:
+    document: Dict[str, Any] = {
+        "time_from": _isoformat(measurement.time_from),
+        "time_to": _isoformat(measurement.time_to),
+    }
+    for pollutant in POLLUTANT_FIELDS:
+        document[pollutant] = getattr(measurement, pollutant)
+    document["extra_pollutants"] = measurement.extra_pollutants
+    document["below_detection"] = sorted(measurement.below_detection)
+    return document
+
+
+def station_document(station: ParsedStationModel, measurements: Iterable[ParsedMeasurementModel]) -> Dict[str, Any]:
+    return {
+        "station_id": station.station_id,
+        "station_name": station.station_name,
+        "latitude": station.latitude,
+        "longitude": station.longitude,
+        "elevation_meters": station.elevation_meters,
+        "measurements": [measurement_document(measurement) for measurement in measurements],
+    }
+
+
+def _envelope(generation: Generation) -> Dict[str, Any]:
+    return {
+        "generation": generation.number,
+        "preparation_timestamp": generation.preparation_timestamp,
+        "ingested_at": generation.ingested_at,
+    }
+
+
+def render_readings(merged_data: Dict[str, Dict[str, Any]], generation: Generation) -> Dict[str, bytes]:
+    """Bodies of every view, format and encoding, keyed by rendered_key()"""
+    stations = {
+        station_id: station_document(entry["info"], entry["measurements_list"])
+        for station_id, entry in merged_data.items()
+    }
+    documents = {ALL_STATIONS_VIEW: {**_envelope(generation), "stations": list(stations.values())}}
+    for station_id, station in stations.items():
+        documents[station_id] = {**_envelope(generation), "station": station}
+
+    rendered: Dict[str, bytes] = {}
+    for view, document in documents.items():
+        for fmt in FORMATS:
+            body = dumps_bytes(document, pretty=fmt == 'pretty')
+            rendered[rendered_key(generation, view, fmt)] = body
+            for encoding, encoded_body in compressed_variants(body).items():
+                rendered[rendered_key(generation, view, fmt, encoding)] = encoded_body
+    return rendered
+
+
+#=================================================================================
+# SHARED CACHE
+# ================================================================================
+
+def store_rendered_readings(cache: Any, merged_data: Dict[str, Dict[str, Any]], generation: Generation) -> Dict[str, bytes]:
+    rendered = render_readings(merged_data, generation)
+    cache.set_many(rendered, timeout=RENDERED_TIMEOUT)
+    return rendered
+
+
+def get_rendered_readings(cache: Any, generation: Generation, view: str, fmt: str,
+                          encoding: str = IDENTITY) -> Tuple[Optional[bytes], str]:
+    """
+    Body of one view in the requested encoding, rendered from latest_merged_data when missing.
+    Small bodies have no compressed variants and are returned uncompressed
+
+    Returns:
+        Tuple[body, its encoding], body None when the station is unknown or nothing was ingested
+    """
+    for candidate in dict.fromkeys((encoding, IDENTITY)):
+        body = cache.get(rendered_key(generation, view, fmt, candidate))
+        if body is not None:
+            return body, candidate
+
+    # the generation was rendered, so the station is unknown; nothing to load or render
+    if view != ALL_STATIONS_VIEW and cache.get(rendered_key(generation, ALL_STATIONS_VIEW, fmt)) is not None:
+        return None, IDENTITY
+
+    merged_data = cache.get(LATEST_MERGED_DATA_KEY)
+    if not merged_data:
+        return None, IDENTITY
+    logging.info(f"Rendering latest readings of generation {generation.number}")
+    rendered = store_rendered_readings(cache, merged_data, generation)
+    for candidate in dict.fromkeys((encoding, IDENTITY)):
+        body = rendered.get(rendered_key(generation, view, fmt, candidate))
+        if body is not None:
+            return body, candidate
+    return None, IDENTITY
+
+
+def publish_stored_data_change(cache: Any, redis_client: Any = None) -> Optional[Generation]:
+    """
+    New generation after rows were stored outside an ingest (gap fill, backfill),
+    so responses validated against the generation, like the statistics, are not
+    answered 304 with stale data. ARSO timestamps are kept from the latest generation
+
+    Returns:
+        the published generation, None when nothing was ever published
+    """
+    latest = get_latest_generation(cache)
+    if latest is None:
+        return None
+    generation = replace(latest, number=allocate_generation_number(cache, redis_client),
+                         ingested_at=datetime.now().astimezone().isoformat(timespec='seconds'))
+    merged_data = cache.get(LATEST_MERGED_DATA_KEY)
+    if merged_data:
+        store_rendered_readings(cache, merged_data, generation)
+    publish_generation(cache, generation=generation)
+    notify_generation(redis_client, generation)
+    return generation
@@ -0,0 +1,108 @@
+"""
+Application metrics
+Metrics are registered in the default prometheus_client registry,
+so PrometheusMetrics(app) exports them on /metrics together with the
+Flask request metrics.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+
+#=================================================================================
+# ARSO FETCHING
+# ================================================================================
+
+# Poll cycles that stopped early because ARSO had nothing new,
+# reason: not_modified (HTTP 304), same_body (hash match), same_preparation_timestamp
+ARSO_FETCH_SKIPPED = Counter(
+    "arso_fetch_skipped_total",
+    "ARSO poll cycles skipped because the feed did not change",
+    ["reason"]
+)
+
+# Bytes that were not downloaded (304) or not parsed and stored (hash and timestamp match)
+ARSO_FETCH_BYTES_SAVED = Counter(
+    "arso_fetch_bytes_saved_total",
+    "Bytes of ARSO feed not downloaded or not processed thanks to change detection",
+    ["reason"]
+)
+
+
+# End-to-end freshness: from ARSO preparing the data (<datum_priprave>)
+# until it is stored and published as a new generation
+ARSO_FRESHNESS_LAG_SECONDS = Histogram(
+    "arso_freshness_lag_seconds",
+    "Seconds from ARSO preparing the data until it is published by the app",
+    buckets=(60, 120, 300, 600, 900, 1800, 3600, 7200, 14400)
+)
+
+# Typical delay after the period boundary before ARSO prepares new data, learned from recent feeds
+ARSO_PUBLICATION_LAG_SECONDS = Gauge(
+    "arso_publication_lag_seconds",
+    "Learned delay of ARSO publications after the period boundary"
+)
+
+
+#=================================================================================
+# HTTP CLIENT
+# ================================================================================
+
+# Latency of every single HTTP attempt, retries included,
+# outcome: HTTP status code, "error" for connection problems and timeouts
+HTTP_ATTEMPT_SECONDS = Histogram(
+    "arso_http_attempt_seconds",
+    "Latency of single HTTP attempts to ARSO",
+    ["host", "outcome"]
+)
+
+# Requests rejected without a network call because the host circuit is open
+HTTP_CIRCUIT_OPEN = Counter(
+    "arso_http_circuit_open_total",
+    "Requests rejected by an open circuit breaker",
+    ["host"]
+)
+
+
+#=================================================================================
+# SCHEDULED JOBS
+# ================================================================================
+
+# Runs of scheduled jobs guarded by the distributed lock,
+# outcome: acquired, skipped (another instance holds it), lost (lease expired while running), error
+JOB_LOCK_RUNS = Counter(
+    "scheduled_job_lock_runs_total",
+    "Scheduled job runs by distributed lock outcome",
+    ["job", "outcome"]
+)
+
+
+#=================================================================================
+# DATA COMPLETENESS
+# ================================================================================
+
+# Missing (pollutant, hour) rows per station in the last gap scan window
+MEASUREMENT_MISSING_HOURS = Gauge(
+    "measurement_missing_hours",
+    "Missing pollutant hours per station found by the last gap scan",
+    ["station"]
+)
+
+# Measurement rows stored by gap filling, rows that already existed are skipped by the insert,
+# source: archive (re-parsed snapshots), refetch
+GAP_FILL_ROWS = Counter(
+    "measurement_gap_fill_rows_total",
+    "Measurement rows submitted to fill gaps",
+    ["source"]
+)
+
+
+#=================================================================================
+# CACHE
+# ================================================================================
+
+# Reads of the two cache tiers, tier: near (in-process), shared (Redis or SimpleCache),
+# result: hit, miss; a near miss is followed by a shared read
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache reads by tier and result",
+    ["tier", "result"]
+)
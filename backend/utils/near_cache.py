@@ -0,0 +1,188 @@
+"""
+Near cache
+Bounded in-process LRU with TTL in front of the shared cache (Redis).
+A hit skips the network round trip and unpickling, which matters for the
+per-request reads: the generation marker and the rendered readings bytes.
+
+Entries are tagged with the ingest generation that was current when they
+were read. The ingester publishes every new generation on a Redis pub/sub
+channel, a listener thread in each process drops the entries of older
+generations as soon as it arrives. Keys that change in place (the marker)
+also get a short TTL, which bounds staleness when a message is missed;
+keys embedding the generation number never change and live for the
+default TTL.
+
+Hits and misses of both tiers are counted in CACHE_REQUESTS.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.utils.generation import GENERATION_CHANNEL
+from backend.utils.metrics import CACHE_REQUESTS
+
+
+LISTEN_POLL_SECONDS = 1.0       # pub/sub wait, shorter than the client's socket timeout
+LISTEN_RETRY_MAX = 60           # seconds between reconnects at most
+
+
+class NearCache:
+    """LRU with TTL, values of generations older than the latest seen one are never stored"""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._clock = clock
+        # key -> (generation, expires at, value), least recently used first
+        self._entries: "OrderedDict[str, Tuple[int, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: str, value: Any, generation: int, ttl: Optional[float] = None) -> None:
+        """
+        Args:
+            generation: near generation read before the value was fetched,
+                        a value fetched while a newer one was announced is dropped
+        """
+        with self._lock:
+            if generation < self.generation:
+                return
+            self._entries[key] = (generation, self._clock() + (ttl if ttl is not None else self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, generation: int) -> None:
+        """Drop the entries of generations older than generation"""
+        with self._lock:
+            if generation <= self.generation:
+                return
+            self.generation = generation
+            for key in [key for key, entry in self._entries.items() if entry[0] < generation]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """
+    Read-through cache: near cache first, then the shared Flask-Caching cache.
+    Writes go to the shared cache only. Without a near cache (no Redis,
+    the shared cache is in-process already) every read goes to the shared cache.
+
+    Args:
+        near_ttls: per key TTL in the near cache, 0 keeps a key out of it
+        redis_client_factory: client for the invalidation listener, started on first use
+    """
+
+    def __init__(self, shared: Any, near_ttls: Optional[Dict[str, float]] = None,
+                 redis_client_factory: Optional[Callable[[], Optional[Any]]] = None) -> None:
+        self.shared = shared
+        self.near: Optional[NearCache] = None
+        self.near_ttls = near_ttls or {}
+        self._redis_client_factory = redis_client_factory
+        self._listener: Optional[threading.Thread] = None
+        self._listener_lock = threading.Lock()
+
+    def enable_near_cache(self, maxsize: int, ttl: float) -> None:
+        self.near = NearCache(maxsize, ttl)
+
+    def disable_near_cache(self) -> None:
+        self.near = None
+
+    def get(self, key: str) -> Optional[Any]:
+        near = self.near
+        ttl = self.near_ttls.get(key)
+        if near is None or ttl == 0:
+            return self._get_shared(key)
+
+        self._ensure_listener()
+        value = near.get(key)
+        CACHE_REQUESTS.labels("near", "miss" if value is None else "hit").inc()
+        if value is not None:
+            return value
+
+        generation = near.generation
+        value = self._get_shared(key)
+        if value is not None:
+            near.set(key, value, generation, ttl)
+        return value
+
+    def _get_shared(self, key: str) -> Optional[Any]:
+        value = self.shared.get(key)
+        CACHE_REQUESTS.labels("shared", "miss" if value is None else "hit").inc()
+        return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> Any:
+        return self.shared.set(key, value, timeout=timeout)
+
+    def set_many(self, mapping: Dict[str, Any], timeout: Optional[int] = None) -> Any:
+        return self.shared.set_many(mapping, timeout=timeout)
+
+    def invalidate(self, generation: int) -> None:
+        """A new generation was published, older near entries are stale"""
+        near = self.near
+        if near is not None:
+            near.invalidate(generation)
+
+    #=================================================================================
+    # PUB/SUB INVALIDATION
+    # ================================================================================
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None or self._redis_client_factory is None:
+            return
+        with self._listener_lock:
+            if self._listener is not None:
+                return
+            redis_client = self._redis_client_factory()
+            if redis_client is None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, args=(redis_client,), name="near-cache-invalidation", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self, redis_client: Any) -> None:
+        delay = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(GENERATION_CHANNEL)
+                # messages published while we were not subscribed are lost
+                if self.near is not None:
+                    self.near.clear()
+                delay = 1.0
+                while True:
+                    message = pubsub.get_message(timeout=LISTEN_POLL_SECONDS)
+                    if message and message.get("type") == "message":
+                        self.invalidate(int(message["data"]))
+            except Exception:
+                logging.exception(f"Listening on {GENERATION_CHANNEL} failed, retrying in {delay:.0f} s")
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, LISTEN_RETRY_MAX)
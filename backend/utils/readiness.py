@@ -0,0 +1,48 @@
+"""
+Readiness state
+Startup does no blocking I/O, so the app is serving before the database
+is reached and before the first ingest finished. The readiness probe
+reports both, load balancers and compose health checks route traffic
+only once it returns 200.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class ReadinessState:
+    started_at: float = field(default_factory=time.monotonic)
+    first_ingest_finished_at: Optional[datetime] = None
+    last_ingest_ok: Optional[bool] = None
+    last_ingest_error: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_ingest(self, ok: bool, error: Optional[str] = None) -> None:
+        """
+        Called after every ingest attempt, ok only when data was stored and published.
+        The first ingest is done once one attempt was ok
+        """
+        with self._lock:
+            if ok and self.first_ingest_finished_at is None:
+                self.first_ingest_finished_at = datetime.now()
+            self.last_ingest_ok = ok
+            self.last_ingest_error = error
+
+    @property
+    def first_ingest_done(self) -> bool:
+        return self.first_ingest_finished_at is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "first_ingest_done": self.first_ingest_done,
+            "first_ingest_finished_at": self.first_ingest_finished_at.isoformat() if self.first_ingest_finished_at else None,
+            "last_ingest_ok": self.last_ingest_ok,
+            "last_ingest_error": self.last_ingest_error,
+        }
+
+
+readiness = ReadinessState()
@@ -0,0 +1,177 @@
+"""
+Ingestion worker
+================
+The one process that schedules and runs ingest: fetching, parsing, DB
+writes, partition maintenance, gap filling. Web processes (gunicorn workers, replicas)
+run with RUN_SCHEDULER=0 and only read from the cache and the database;
+they learn about new data through the latest generation marker.
+
+Several workers may run (replicas, a redeploy overlapping the old
+container): every job run takes a Redis lease first, so exactly one
+instance runs each cycle and the others skip it (backend.utils.distributed_lock).
+
+Ingest runs are not a fixed interval: each run schedules the next one at
+the expected ARSO publication time (backend.network.fetch_schedule).
+
+Run with:
+    python -m backend.worker
+
+Without a separate worker, create_app() starts the same scheduler in the
+web process (RUN_SCHEDULER defaults to on), which is fine for a single process.
+"""
+import logging
+import signal
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from flask import Flask
+
+from backend.cache import cache, configure_cache, get_redis_client
+from backend.database.schema import maintain_partitions
+from backend.database.session import SessionLocal
+from backend.gap_fill import fill_gaps, gap_scan_window
+from backend.ingest import adopt_published_generation, update_data
+from backend.network.fetch_schedule import get_fetch_planner
+from backend.parsers.insert_data import INGEST_JOB_NAME
+from backend.utils.distributed_lock import run_exclusive
+from backend.utils.latest_readings import publish_stored_data_change
+from backend.utils.readiness import readiness
+
+
+# Lease is renewed every TTL/3 while the job runs, a crashed holder frees it after the TTL
+JOB_LOCK_TTL = 60
+# A job still running after this loses the lease, the next cycle can start elsewhere
+INGEST_MAX_DURATION = 30 * 60
+PARTITION_MAINTENANCE_MAX_DURATION = 10 * 60
+GAP_FILL_MAX_DURATION = 30 * 60
+GAP_FILL_INTERVAL_HOURS = 6
+# A run delayed by more than this (process paused, scheduler busy) is skipped, not run late
+MISFIRE_GRACE_TIME = 15 * 60
+
+INGEST_JOB_ID = "ingest"
+
+_scheduler: Optional[Any] = None
+
+
+def _add_jobs(scheduler: Any, app: Flask) -> None:
+    # Ensure scheduled jobs run inside the Flask application context so DB/cache usage is valid
+    def _ingest(fencing_token: Optional[int]) -> bool:
+        with app.app_context():
+            return bool(update_data(fencing_token=fencing_token))
+
+    planner = get_fetch_planner()
+
+    def _schedule_ingest(run_date: datetime) -> None:
+        scheduler.add_job(func=_run_update_data_in_app_context, trigger='date', run_date=run_date,
+                          id=INGEST_JOB_ID, replace_existing=True, max_instances=1,
+                          misfire_grace_time=MISFIRE_GRACE_TIME)
+
+    def _run_update_data_in_app_context() -> None:
+        fresh = False
+        try:
+            stored = run_exclusive(INGEST_JOB_NAME, _ingest, get_redis_client(),
+                                   ttl_seconds=JOB_LOCK_TTL, max_duration_seconds=INGEST_MAX_DURATION)
+            # skipped runs leave readiness alone, the generation marker covers them,
+            # and wait for the next period, the lock holder polls this one
+            fresh = stored is None or stored
+            if stored is None:
+                # the holder's marker tells which period is stored, it is not polled again here
+                with app.app_context():
+                    adopt_published_generation()
+            else:
+                readiness.record_ingest(ok=bool(stored), error=None if stored else "No new data was stored")
+        except Exception as e:
+            readiness.record_ingest(ok=False, error=str(e))
+            logging.exception("Scheduled update_data failed")
+        finally:
+            # aligned to the next ARSO publication, or a backed-off re-poll when not fresh yet
+            run_date = planner.next_run(fresh)
+            logging.info(f"Next ARSO fetch at {run_date.isoformat(timespec='seconds')}")
+            _schedule_ingest(run_date)
+
+    # Monthly measurement partitions are created ahead and expired ones dropped
+    def _maintain(_fencing_token: Optional[int]) -> None:
+        with SessionLocal() as db:
+            maintain_partitions(db)
+            db.commit()
+
+    def _run_partition_maintenance() -> None:
+        try:
+            run_exclusive("partition_maintenance", _maintain, get_redis_client(),
+                          ttl_seconds=JOB_LOCK_TTL, max_duration_seconds=PARTITION_MAINTENANCE_MAX_DURATION)
+        except Exception:
+            logging.exception("Partition maintenance failed")
+
+    # Missing hours of the last days are refilled from archived payloads
+    def _fill(_fencing_token: Optional[int]) -> None:
+        stats = fill_gaps(*gap_scan_window())
+        if stats.rows_stored:
+            # rollups changed, statistics must not be revalidated against the old generation
+            with app.app_context():
+                publish_stored_data_change(cache, get_redis_client())
+
+    def _run_gap_fill() -> None:
+        try:
+            run_exclusive("gap_fill", _fill, get_redis_client(),
+                          ttl_seconds=JOB_LOCK_TTL, max_duration_seconds=GAP_FILL_MAX_DURATION)
+        except Exception:
+            logging.exception("Gap fill failed")
+
+    now = datetime.now()
+    # partitions first, the initial ingest may write into a new month
+    scheduler.add_job(func=_run_partition_maintenance, trigger='interval', days=1, next_run_time=now,
+                      max_instances=1, coalesce=True, misfire_grace_time=MISFIRE_GRACE_TIME)
+    scheduler.add_job(func=_run_gap_fill, trigger='interval', hours=GAP_FILL_INTERVAL_HOURS,
+                      next_run_time=now + timedelta(minutes=10), max_instances=1, coalesce=True,
+                      misfire_grace_time=MISFIRE_GRACE_TIME)
+    # every run schedules the next one, max_instances=1 covers overlap within
+    # this process, the lease covers other instances
+    _schedule_ingest((now + timedelta(seconds=1)).astimezone())
+
+
+def start_scheduler(app: Flask) -> Any:
+    """Start the background scheduler once per process, jobs start right away"""
+    global _scheduler
+    if _scheduler is not None:
+        return _scheduler
+
+    from apscheduler.schedulers.background import BackgroundScheduler  # type: ignore[reportMissingTypeStubs]
+    scheduler: Any = BackgroundScheduler()
+    _add_jobs(scheduler, app)
+    scheduler.start()
+    _scheduler = scheduler
+
+    logging.info("Background scheduler started for ARSO data updates")
+    return scheduler
+
+
+def create_worker_app() -> Flask:
+    """Minimal app for the worker: cache and app context, no routes"""
+    app = Flask(__name__)
+    configure_cache(app)
+    return app
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from apscheduler.schedulers.blocking import BlockingScheduler  # type: ignore[reportMissingTypeStubs]
+    scheduler: Any = BlockingScheduler()
+    _add_jobs(scheduler, create_worker_app())
+
+    # docker stop sends SIGTERM, let a running job finish
+    def _shutdown(signum: int, _frame: Any) -> None:
+        logging.info(f"Ingestion worker received signal {signum}, shutting down")
+        scheduler.shutdown(wait=True)
+
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    logging.info("Ingestion worker started")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+if __name__ == "__main__":
+    main()